@@ -1,6 +1,13 @@
 import streamlit as st
-import pandas as pd
 import os
+import time
+from modules.dataset import get_memory_report
+from modules.streaming import get_dataset
+from modules.query import PAGE_COLUMNS, EXPLORER_FILTER_COLUMNS
+from modules.page_loader import load_page, import_report
+from modules.perf import span, start_rerun, finish_rerun, perf_report
+from modules.jobs import JOB_POLL_SECONDS
+from modules.theme import page_css, render
 
 # ==============================
 # Page Config — أول سطر دايماً
@@ -12,60 +19,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# ==============================
-# Load CSS
-# ==============================
-with open('assets/style.css') as f:
-    st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
-
-# ==============================
-# Force Sidebar Always Visible
-# ==============================
-st.markdown("""
-<style>
-[data-testid="stSidebar"] {
-    display: block !important;
-    visibility: visible !important;
-    transform: none !important;
-    z-index: 99998 !important;
-    min-width: 240px !important;
-}
-
-[data-testid="collapsedControl"] {
-    display: flex !important;
-    visibility: visible !important;
-    opacity: 1 !important;
-    background: linear-gradient(135deg, #E91E8C, #9C27B0) !important;
-    border-radius: 0 12px 12px 0 !important;
-    border: none !important;
-    width: 30px !important;
-    height: 60px !important;
-    position: fixed !important;
-    left: 0 !important;
-    top: 50% !important;
-    transform: translateY(-50%) !important;
-    z-index: 999999 !important;
-    align-items: center !important;
-    justify-content: center !important;
-    box-shadow: 4px 0 20px rgba(233,30,140,0.6) !important;
-    cursor: pointer !important;
-}
-
-[data-testid="collapsedControl"] svg {
-    fill: white !important;
-    color: white !important;
-    display: block !important;
-    width: 16px !important;
-    height: 16px !important;
-}
-
-button[kind="header"] {
-    display: flex !important;
-    visibility: visible !important;
-    opacity: 1 !important;
-}
-</style>
-""", unsafe_allow_html=True)
+# timing spans and counters from here on belong to this rerun
+start_rerun()
 
 # ==============================
 # Session State
@@ -79,69 +34,9 @@ lang  = st.session_state['lang']
 theme = st.session_state['theme']
 
 # ==============================
-# Theme Colors
-# ==============================
-if theme == 'dark':
-    TEXT       = "#FFFFFF"
-    SUBTEXT    = "#9988BB"
-    BORDER     = "rgba(233,30,140,0.2)"
-    ACCENT     = "#E91E8C"
-    ACCENT2    = "#FF6B35"
-    ACCENT3    = "#9C27B0"
-    GLASS_CARD = "rgba(255,255,255,0.04)"
-else:
-    TEXT       = "#1A0A2E"
-    SUBTEXT    = "#6A4080"
-    BORDER     = "rgba(233,30,140,0.25)"
-    ACCENT     = "#C2185B"
-    ACCENT2    = "#E64A19"
-    ACCENT3    = "#7B1FA2"
-    GLASS_CARD = "rgba(255,255,255,0.55)"
-
-# ==============================
-# Dynamic Theme CSS
+# Page CSS — style.css + theme colors, compiled once per theme
 # ==============================
-st.markdown(f"""
-<style>
-.stApp {{
-    background: {"linear-gradient(135deg,#0D0520 0%,#12062A 60%,#0D0520 100%)"
-                 if theme == "dark" else
-                 "linear-gradient(135deg,#F5EEF8 0%,#EDE0F5 100%)"} !important;
-    color: {TEXT} !important;
-}}
-
-.block-container {{
-    background: {"rgba(18,6,42,0.55)"
-                 if theme == "dark" else
-                 "rgba(240,232,248,0.55)"} !important;
-}}
-
-[data-testid="stSidebar"] {{
-    background: {"rgba(10,3,24,0.75)"
-                 if theme == "dark" else
-                 "rgba(220,200,240,0.65)"} !important;
-}}
-
-[data-testid="stMetricValue"] {{
-    background: linear-gradient(135deg, {ACCENT2}, {ACCENT});
-    -webkit-background-clip: text !important;
-    -webkit-text-fill-color: transparent !important;
-    background-clip: text !important;
-}}
-
-[data-testid="stMetricLabel"] {{
-    color: {SUBTEXT} !important;
-}}
-
-[data-testid="collapsedControl"] {{
-    background: linear-gradient(135deg, {ACCENT}, {ACCENT3}) !important;
-}}
-
-.stButton > button {{
-    background: linear-gradient(135deg, {ACCENT} 0%, {ACCENT3} 100%) !important;
-}}
-</style>
-""", unsafe_allow_html=True)
+st.markdown(page_css(theme), unsafe_allow_html=True)
 
 # ==============================
 # Translations
@@ -178,6 +73,18 @@ TRANSLATIONS = {
         "active_clients":       "Active Clients",
         "owner":                "Project Engineer",
         "follow_us":            "Follow Us",
+        "memory_usage":         "Memory Usage",
+        "memory_mapped":        "Memory-mapped, shared by all sessions",
+        "import_times":         "Import Times",
+        "explorer":             "Campaign Explorer",
+        "all_clients":          "All Clients",
+        "sort_by":              "Sort By",
+        "rows_per_page":        "Rows per Page",
+        "page":                 "Page",
+        "no_rows":              "No campaigns match these filters",
+        "diagnostics":          "Diagnostics",
+        "last_rerun":           "Last rerun",
+        "out_of_core":          "Streamed from Parquet — aggregates only, no rows in memory",
     },
     "ar": {
         "dashboard_title":      "منصة التنبؤ الذكي للتسويق",
@@ -210,6 +117,18 @@ TRANSLATIONS = {
         "active_clients":       "العملاء النشطين",
         "owner":                "مهندسة المشروع",
         "follow_us":            "تابعنا",
+        "memory_usage":         "استهلاك الذاكرة",
+        "memory_mapped":        "نسخة واحدة في الذاكرة مشتركة بين كل الجلسات",
+        "import_times":         "أزمنة التحميل",
+        "explorer":             "مستكشف الحملات",
+        "all_clients":          "كل العملاء",
+        "sort_by":              "ترتيب حسب",
+        "rows_per_page":        "عدد الصفوف في الصفحة",
+        "page":                 "صفحة",
+        "no_rows":              "مفيش حملات مطابقة للفلاتر دي",
+        "diagnostics":          "التشخيص",
+        "last_rerun":           "آخر تحديث",
+        "out_of_core":          "مقروءة على دفعات من Parquet — الإجماليات بس، من غير صفوف في الذاكرة",
     }
 }
 
@@ -219,17 +138,11 @@ def t(key):
 # ==============================
 # Load Data
 # ==============================
-@st.cache_data
-def load_data():
-    df = pd.read_parquet('data/campaigns_clean.parquet')
-    if 'CTR' not in df.columns:
-        df['CTR'] = (df['Clicks'] / df['Impressions'] * 100).round(2)
-    if 'Month' not in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'])
-        df['Month'] = df['Date'].dt.month
-    return df
-
-df = load_data()
+# one memory-mapped copy per process, rebuilt when an upload lands in the
+# store; pages get zero-copy views of it. Datasets above OUT_OF_CORE_MB are
+# streamed instead: pages get their aggregates, and one client's rows.
+with span('data.load'):
+    base = get_dataset()
 
 # ==============================
 # Sidebar
@@ -240,22 +153,12 @@ with st.sidebar:
     if os.path.exists('assets/logo.png'):
         st.image('assets/logo.png', width=155)
     else:
-        st.markdown(f"""
-        <div style='text-align:center; padding:16px 0;'>
-            <span style='font-family:Syne,sans-serif; font-size:1.3rem;
-                         font-weight:800;
-                         background:linear-gradient(135deg,{ACCENT2},{ACCENT});
-                         -webkit-background-clip:text;
-                         -webkit-text-fill-color:transparent;'>AI-Marketing</span>
-            <span style='font-family:Syne,sans-serif; font-size:0.9rem; color:{SUBTEXT};
-                         display:block; letter-spacing:5px;'>PREDICTOR</span>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(render('sidebar.logo', theme, lang), unsafe_allow_html=True)
 
     st.markdown("<hr>", unsafe_allow_html=True)
 
     # ── Language ──
-    st.markdown(f"<p style='color:{SUBTEXT}; font-size:0.70rem; text-transform:uppercase; letter-spacing:2px; margin:0 0 6px 0;'>&#127760; {t('language')}</p>", unsafe_allow_html=True)
+    st.markdown(render('sidebar.label', theme, lang, icon="&#127760;", label=t('language'), gap=6), unsafe_allow_html=True)
     c1, c2 = st.columns(2)
     with c1:
         if st.button("EN", use_container_width=True, key="btn_en"):
@@ -269,7 +172,7 @@ with st.sidebar:
     st.markdown("<div style='height:10px'></div>", unsafe_allow_html=True)
 
     # ── Theme ──
-    st.markdown(f"<p style='color:{SUBTEXT}; font-size:0.70rem; text-transform:uppercase; letter-spacing:2px; margin:0 0 6px 0;'>&#127912; {t('theme')}</p>", unsafe_allow_html=True)
+    st.markdown(render('sidebar.label', theme, lang, icon="&#127912;", label=t('theme'), gap=6), unsafe_allow_html=True)
     c3, c4 = st.columns(2)
     with c3:
         if st.button(t("dark_mode"), use_container_width=True, key="btn_dark"):
@@ -283,13 +186,14 @@ with st.sidebar:
     st.markdown("<hr>", unsafe_allow_html=True)
 
     # ── Navigation ──
-    st.markdown(f"<p style='color:{SUBTEXT}; font-size:0.70rem; text-transform:uppercase; letter-spacing:2px; margin:0 0 8px 0;'>&#128204; Navigation</p>", unsafe_allow_html=True)
+    st.markdown(render('sidebar.label', theme, lang, icon="&#128204;", label="Navigation", gap=8), unsafe_allow_html=True)
 
     pages = {
         f"&#128202;  {t('overview')}":    "overview",
         f"&#128100;  {t('client_view')}": "client",
         f"&#129302;  {t('ai_insights')}": "ai",
         f"&#128193;  {t('upload_data')}": "upload",
+        f"&#128269;  {t('explorer')}":    "explorer",
     }
 
     page         = st.radio("", list(pages.keys()), label_visibility="collapsed")
@@ -298,125 +202,113 @@ with st.sidebar:
     st.markdown("<hr>", unsafe_allow_html=True)
 
     # ── Live Stats ──
-    st.markdown(f"""
-    <div style='background:{GLASS_CARD}; backdrop-filter:blur(12px);
-                border:1px solid {BORDER}; border-radius:14px;
-                padding:16px; margin-bottom:12px;'>
-        <p style='color:{SUBTEXT}; font-size:0.68rem; text-transform:uppercase;
-                  letter-spacing:2px; margin:0 0 10px 0;'>
-            &#128225; {t('live_stats')}
-        </p>
-        <p style='font-size:1.4rem; font-weight:800; font-family:Syne,sans-serif;
-                  margin:0; line-height:1;
-                  background:linear-gradient(135deg,{ACCENT2},{ACCENT});
-                  -webkit-background-clip:text; -webkit-text-fill-color:transparent;'>
-            {df.shape[0]:,}
-        </p>
-        <p style='color:{SUBTEXT}; font-size:0.70rem; margin:2px 0 12px 0;'>
-            {t('total_records')}
-        </p>
-        <p style='font-size:1.4rem; font-weight:800; font-family:Syne,sans-serif;
-                  margin:0; line-height:1;
-                  background:linear-gradient(135deg,{ACCENT},{ACCENT3});
-                  -webkit-background-clip:text; -webkit-text-fill-color:transparent;'>
-            {df['Company'].nunique()}
-        </p>
-        <p style='color:{SUBTEXT}; font-size:0.70rem; margin:2px 0 0 0;'>
-            {t('active_clients')}
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(render('sidebar.stats', theme, lang, rows=base.num_rows, clients=len(base.clients)),
+                unsafe_allow_html=True)
+
+    # ── Page Data: only the columns / rows the current page shows ──
+    handle   = st.session_state.get('uploaded_dataset')
+    uploaded = handle.df if handle is not None else None
+    if handle is not None and uploaded is None:
+        # neither in memory nor spilled any more; back to the base dataset
+        del st.session_state['uploaded_dataset']
+    clients  = base.clients
+
+    def load_client(company):
+        return base.view(PAGE_COLUMNS['client'], company)
+
+    # the explorer's rows, with its date range / channels pushed down;
+    # out of core they are the explored client's only
+    explored = None
+    if base.out_of_core:
+        explored = st.session_state.get('explorer_client')
+        if explored not in clients:
+            explored = clients[0] if clients else None
+
+    def load_rows(date_range=None, channel=None):
+        return base.view(PAGE_COLUMNS['explorer'], explored, date_range, channel)
+
+    with span('data.view'):
+        if uploaded is not None:
+            page_df = uploaded
+        elif current_page == "client":
+            selected = st.session_state.get('client_selector')
+            if selected not in clients:
+                selected = clients[0] if clients else None
+            page_df = load_client(selected)
+        elif current_page == "explorer" and base.out_of_core:
+            page_df = base.view(EXPLORER_FILTER_COLUMNS, explored)
+        elif current_page in PAGE_COLUMNS:
+            page_df = base.view(PAGE_COLUMNS[current_page])
+        else:
+            page_df = None
+
+    # ── Memory Report ──
+    if page_df is not None:
+        mem        = get_memory_report(page_df)
+        mem_total  = mem['MB'].sum()
+        mem_before = page_df.attrs.get('memory_before', 0) / 1024 ** 2
+        with st.expander(f"🧠 {t('memory_usage')} — {mem_total:,.1f} MB"):
+            if page_df.attrs.get('memory_mapped'):
+                st.caption(t('memory_mapped'))
+            elif page_df.attrs.get('out_of_core'):
+                st.caption(t('out_of_core'))
+            elif mem_before:
+                st.caption(f"{mem_before:,.1f} MB → {mem_total:,.1f} MB "
+                           f"({mem_before / max(mem_total, 0.01):.1f}× smaller)")
+            st.dataframe(mem, hide_index=True, use_container_width=True)
+
+    # ── Import Times: the current page module is imported on first use ──
+    show_page = load_page(current_page)
+    imports   = import_report()
+    with st.expander(f"⏱ {t('import_times')} — {imports['Seconds'].sum():,.2f} s"):
+        st.dataframe(imports, hide_index=True, use_container_width=True)
+
+    # ── Diagnostics: p50 / p95 per span across all sessions, opt-in ──
+    if st.toggle(f"🩺 {t('diagnostics')}", key='diagnostics'):
+        last = st.session_state.get('perf_last')
+        with st.expander(f"🩺 {t('diagnostics')}", expanded=True):
+            if last is not None:
+                st.caption(f"{t('last_rerun')} ({last['page']}): {last['ms']:,.0f} ms · "
+                           f"{last['counters'].get('rows_scanned', 0):,} rows scanned · "
+                           f"{last['counters'].get('bytes_sent', 0) / 1024:,.1f} KB sent")
+            st.dataframe(perf_report(), hide_index=True, use_container_width=True)
 
     # ── Owner Card ──
-    st.markdown(f"""
-    <div style='background:{GLASS_CARD}; backdrop-filter:blur(12px);
-                border:1px solid {BORDER}; border-top:2px solid {ACCENT};
-                border-radius:14px; padding:14px; margin-bottom:12px;'>
-        <p style='color:{SUBTEXT}; font-size:0.66rem; text-transform:uppercase;
-                  letter-spacing:2px; margin:0 0 6px 0;'>
-            &#128100; {t('owner')}
-        </p>
-        <p style='font-size:0.92rem; font-weight:700;
-                  font-family:Syne,sans-serif; margin:0;
-                  background:linear-gradient(135deg,{ACCENT2},{ACCENT});
-                  -webkit-background-clip:text; -webkit-text-fill-color:transparent;'>
-            ENG. Shadya Dief
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(render('sidebar.owner', theme, lang), unsafe_allow_html=True)
 
     # ── Social Links ──
-    st.markdown(f"""
-    <div style='background:{GLASS_CARD}; backdrop-filter:blur(12px);
-                border:1px solid {BORDER}; border-radius:14px; padding:14px;'>
-        <p style='color:{SUBTEXT}; font-size:0.66rem; text-transform:uppercase;
-                  letter-spacing:2px; margin:0 0 10px 0;'>
-            &#128279; {t('follow_us')}
-        </p>
-        <a href='https://www.linkedin.com/in/shadya-dief-ml/'
-           target='_blank'
-           style='display:flex; align-items:center; gap:10px;
-                  text-decoration:none; padding:8px 10px;
-                  border-radius:10px; margin-bottom:8px;
-                  background:rgba(233,30,140,0.06);
-                  border:1px solid rgba(233,30,140,0.2);'>
-            <span style='font-size:1.2rem;'>&#128101;</span>
-            <div>
-                <p style='margin:0; font-size:0.80rem; font-weight:700;
-                          color:{TEXT};'>Shadya Dief</p>
-                <p style='margin:0; font-size:0.68rem; color:{SUBTEXT};'>LinkedIn</p>
-            </div>
-        </a>
-        <a href='https://github.com/Shadyadief/AI-Marketing-Predictor/tree/main'
-           target='_blank'
-           style='display:flex; align-items:center; gap:10px;
-                  text-decoration:none; padding:8px 10px;
-                  border-radius:10px;
-                  background:rgba(156,39,176,0.08);
-                  border:1px solid rgba(156,39,176,0.25);'>
-            <span style='font-size:1.2rem;'>&#128736;</span>
-            <div>
-                <p style='margin:0; font-size:0.80rem; font-weight:700;
-                          color:{ACCENT3};'>AI-Marketing-Predictor</p>
-                <p style='margin:0; font-size:0.68rem; color:{SUBTEXT};'>GitHub</p>
-            </div>
-        </a>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(render('sidebar.social', theme, lang), unsafe_allow_html=True)
 
     st.markdown("<div style='height:14px'></div>", unsafe_allow_html=True)
-    st.markdown(f"""
-    <div style='text-align:center; padding:8px 0;'>
-        <p style='color:{SUBTEXT}; font-size:0.62rem; margin:0; letter-spacing:1px;'>
-            BUILT WITH &#10024; BY SHADYA DIEF
-        </p>
-        <p style='font-size:0.72rem; font-weight:700;
-                  font-family:Syne,sans-serif; margin:3px 0 0 0;
-                  background:linear-gradient(135deg,{ACCENT2},{ACCENT},{ACCENT3});
-                  -webkit-background-clip:text; -webkit-text-fill-color:transparent;'>
-            AI-Marketing-Predictor
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(render('sidebar.footer', theme, lang), unsafe_allow_html=True)
 
 # ==============================
 # Active Data
 # ==============================
-active_df = st.session_state.get('uploaded_df', df)
+active_df = page_df
 
 # ==============================
 # Render Page
 # ==============================
-from modules.overview    import show_overview
-from modules.client_view import show_client_view
-from modules.ai_insights import show_ai_insights
-from modules.data_upload import show_data_upload
-
-if current_page == "overview":
-    show_overview(active_df, lang, theme)
-elif current_page == "client":
-    show_client_view(active_df, lang, theme)
-elif current_page == "ai":
-    show_ai_insights(active_df, lang, theme)
+if current_page == "client" and uploaded is None:
+    show_page(None, lang, theme, clients=clients, load_client=load_client)
 elif current_page == "upload":
-    show_data_upload(lang, theme)
+    show_page(lang, theme)
+elif current_page == "explorer" and uploaded is None:
+    show_page(active_df, lang, theme, clients=clients if base.out_of_core else None, load_rows=load_rows)
+else:
+    show_page(active_df, lang, theme)
+
+record = finish_rerun(current_page)
+if record is not None:
+    st.session_state['perf_last'] = record
+
+# ==============================
+# Poll Background Jobs
+# ==============================
+# A page showing an unfinished job (a PDF report) asked to be drawn again.
+# The wait comes after finish_rerun, so it is not part of this rerun's
+# timing, and a widget interaction in the meantime takes the rerun's place.
+if st.session_state.pop('poll_jobs', False):
+    time.sleep(JOB_POLL_SECONDS)
+    st.rerun()
@@ -0,0 +1,155 @@
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ==============================
+# Synthetic Campaign Data
+# ==============================
+# Deterministic generator for the schema of data/campaigns_clean.parquet,
+# at any size. The same (rows, seed, clients) always gives the same file, so
+# benchmark runs on different commits read identical data:
+#
+#   python -m benchmarks.generate --rows 2M --out /tmp/bench/campaigns_2M.parquet
+CHUNK_ROWS = 1_000_000
+ROW_GROUP  = 64_000
+
+COMPANIES = ['Alpha Innovations', 'DataTech Solutions', 'Innovate Industries',
+             'NexGen Systems', 'Tech Titans']
+AUDIENCES = ['All Ages', 'Men 18-24', 'Men 25-34', 'Men 35-44', 'Men 45-60',
+             'Women 18-24', 'Women 25-34', 'Women 35-44', 'Women 45-60']
+GOALS     = ['Brand Awareness', 'Increase Sales', 'Market Expansion', 'Product Launch']
+DURATIONS = ['15 Days', '30 Days', '45 Days', '60 Days']
+CHANNELS  = ['Facebook', 'Instagram', 'Pinterest', 'Twitter']
+LOCATIONS = ['Austin', 'Las Vegas', 'Los Angeles', 'Miami', 'New York']
+LANGUAGES = ['English', 'French', 'Spanish']
+SEGMENTS  = ['Technology']
+MONTHS    = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+             'August', 'September', 'October', 'November', 'December']
+
+FIRST_DAY = np.datetime64('2022-01-01')
+DAYS      = 365
+
+# "200k" / "2M" / "20M" → rows
+SIZES = {'k': 1_000, 'M': 1_000_000}
+
+
+def parse_rows(text):
+    text = str(text).strip()
+    if text[-1:] in SIZES:
+        return int(float(text[:-1]) * SIZES[text[-1]])
+    return int(text)
+
+
+def size_label(rows):
+    for suffix, unit in sorted(SIZES.items(), key=lambda s: -s[1]):
+        if rows >= unit and rows % unit == 0:
+            return f"{rows // unit}{suffix}"
+    return str(rows)
+
+
+# one client per 40k rows, at least the 5 of the bundled data (200k rows)
+def default_clients(rows):
+    return max(len(COMPANIES), rows // 40_000)
+
+
+def company_names(clients):
+    extra = [f"Client {i:04d}" for i in range(len(COMPANIES) + 1, clients + 1)]
+    return (COMPANIES + extra)[:clients]
+
+
+def _choice(rng, values, n):
+    return pd.Categorical.from_codes(rng.integers(0, len(values), n), categories=values)
+
+
+def generate_chunk(start, rows, seed=0, clients=5):
+    rng = np.random.default_rng([seed, start])
+
+    clicks      = rng.integers(298, 40_000, rows)
+    ctr         = rng.uniform(22.0, 38.0, rows)
+    impressions = np.maximum(clicks, np.rint(clicks * 100 / ctr)).astype(np.int64)
+    days        = rng.integers(0, DAYS, rows)
+    dates       = pd.to_datetime(FIRST_DAY + days.astype('timedelta64[D]'))
+    # ROI: right-skewed, like the bundled data (mean ≈ 3.2, max < 10)
+    roi         = np.minimum(rng.gamma(1.6, 2.0, rows), 9.6)
+
+    return pd.DataFrame({
+        'Campaign_ID':      np.arange(start, start + rows, dtype=np.int64) + 100_000,
+        'Target_Audience':  _choice(rng, AUDIENCES, rows),
+        'Campaign_Goal':    _choice(rng, GOALS, rows),
+        'Duration':         _choice(rng, DURATIONS, rows),
+        'Channel_Used':     _choice(rng, CHANNELS, rows),
+        'Conversion_Rate':  rng.integers(1, 16, rows) / 100,
+        'Acquisition_Cost': np.round(rng.uniform(500.0, 15_000.0, rows), 2),
+        'ROI':              roi,
+        'Location':         _choice(rng, LOCATIONS, rows),
+        'Language':         _choice(rng, LANGUAGES, rows),
+        'Clicks':           clicks,
+        'Impressions':      impressions,
+        'Engagement_Score': rng.integers(1, 11, rows),
+        'Customer_Segment': _choice(rng, SEGMENTS, rows),
+        'Date':             dates,
+        'Company':          _choice(rng, company_names(clients), rows),
+        'Month':            dates.month.astype(np.int32),
+        'Year':             dates.year.astype(np.int32),
+        'Month_Name':       pd.Categorical.from_codes(dates.month - 1, categories=MONTHS),
+        'CTR':              np.round(clicks / impressions * 100, 2),
+    })
+
+
+# ── Chunks of CHUNK_ROWS, seeded by their first row ──
+def generate_campaigns(rows, seed=0, clients=None):
+    clients = clients or default_clients(rows)
+    for start in range(0, rows, CHUNK_ROWS):
+        yield generate_chunk(start, min(CHUNK_ROWS, rows - start), seed, clients)
+
+
+def _plain(df):
+    # plain strings on disk, like the cleaned dataset
+    for name in df.columns:
+        if isinstance(df[name].dtype, pd.CategoricalDtype):
+            df[name] = df[name].astype(str)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def write_campaigns(path, rows, seed=0, clients=None):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp = f"{path}.tmp"
+    writer = None
+    try:
+        for chunk in generate_campaigns(rows, seed, clients):
+            table = _plain(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table, row_group_size=ROW_GROUP)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.generate',
+        description='Write a deterministic synthetic campaign dataset.',
+    )
+    parser.add_argument('--rows', default='200k', help='row count, e.g. 200k, 2M, 20M')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clients', type=int, default=None, help='companies (default: 5, +1 per 40k rows)')
+    parser.add_argument('--out', required=True, help='output .parquet file')
+    args = parser.parse_args(argv)
+
+    rows = parse_rows(args.rows)
+    write_campaigns(args.out, rows, args.seed, args.clients)
+    print(f"{rows:,} rows → {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,320 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import warnings
+from datetime import datetime, timezone
+import numpy as np
+from benchmarks.generate import parse_rows, size_label, generate_chunk
+from benchmarks.run import ROOT, LINKED, prepare_workdir, _peak_rss_mb, _git, _environment
+
+# ==============================
+# Concurrent-session Load Test
+# ==============================
+# Drives app.py headlessly with Streamlit's AppTest, one simulated user per
+# thread — the way one server process runs its sessions. Every user opens
+# the app, then switches pages, picks clients, flips language and theme,
+# uploads a file once and asks for PDF reports, at random but reproducibly
+# (seeded per user). Each step is one rerun (plus the reruns it triggers);
+# its latency is recorded against the page it lands on.
+#
+#   python -m benchmarks.loadtest --sessions 1 --sessions 4 --sessions 16
+#   python -m benchmarks.loadtest --rows 2M --actions 30 --out load.json
+#
+# Levels run in increasing order in one process, so peak RSS is the peak
+# up to and including that level. The run works in a scratch directory:
+# uploads land in its store, never in data/store.
+APP       = os.path.join(ROOT, 'app.py')
+PAGES     = ['overview', 'client', 'ai', 'upload', 'explorer']   # sidebar order
+BROWSED   = ['overview', 'client', 'ai', 'explorer']
+LEVELS    = [1, 2, 4, 8]
+TIMEOUT   = 300
+PCTS      = [50, 90, 95, 99]
+
+# action → weight; an upload happens at most once per user
+ACTIONS = {
+    'page':   40,
+    'client': 20,
+    'lang':    8,
+    'theme':   8,
+    'pdf':    16,
+    'upload':  8,
+}
+UPLOAD_ROWS = 5_000
+
+
+# ── AppTest cannot drive st.file_uploader: the file the driver put in
+#    session state stands in for the widget ──
+class _UploadedFile(io.BytesIO):
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name    = name
+        self.size    = len(data)
+        self.file_id = name
+
+
+def _file_uploader(*args, **kwargs):
+    import streamlit as st
+    upload = st.session_state.get('loadtest_upload')
+    return _UploadedFile(*upload) if upload else None
+
+
+# AppTest installs a mock Runtime for each run and clears it when the run
+# ends, under the feet of any other session still running. A server process
+# has one runtime for all of its sessions, and so does the load test.
+def _share_runtime():
+    from unittest.mock import MagicMock
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr        = MediaFileManager(MemoryMediaFileStorage('/mock/media'))
+    shared.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: shared)
+    Runtime.exists   = classmethod(lambda cls: True)
+
+
+def _upload_bytes(user, seed):
+    # new Campaign_IDs, well clear of the base rows
+    df = generate_chunk(10 ** 8 + user * UPLOAD_ROWS, UPLOAD_ROWS, seed)
+    return f"loadtest-{seed}-{user}.csv", df.to_csv(index=False).encode()
+
+
+class User:
+
+    def __init__(self, index, seed):
+        from streamlit.testing.v1 import AppTest
+        self.index    = index
+        self.seed     = seed
+        self.rng      = random.Random(seed * 1_000_003 + index)
+        self.at       = AppTest.from_file(APP, default_timeout=TIMEOUT)
+        self.page     = 'overview'
+        self.lang     = 'en'
+        self.theme    = 'dark'
+        self.uploaded = False
+        self.samples  = []   # (action, page, seconds)
+        self.errors   = []
+        self.misses   = 0
+
+    def _run(self, action):
+        started = time.perf_counter()
+        self.at.run()
+        self.samples.append((action, self.page, time.perf_counter() - started))
+        for e in self.at.exception:
+            self.errors.append(f"{action}@{self.page}: {e.value}")
+
+    def _goto(self, page):
+        radio = self.at.sidebar.radio[0]
+        radio.set_value(radio.options[PAGES.index(page)])
+        self.page = page
+        self._run('page')
+
+    def open(self):
+        self._run('open')
+
+    # a page that failed (or an AppTest tree cut short) has no widgets to
+    # drive: count it, rerun, carry on
+    def act(self, action):
+        try:
+            getattr(self, f"_{action}")()
+        except (KeyError, IndexError):
+            self.misses += 1
+            self._run('recover')
+
+    def _page(self):
+        self._goto(self.rng.choice([p for p in BROWSED if p != self.page]))
+
+    def _client(self):
+        if self.page != 'client':
+            self._goto('client')
+        select = self.at.selectbox(key='client_selector')
+        select.select(self.rng.choice(select.options))
+        self._run('client')
+
+    # the sidebar buttons set the choice and call st.rerun(); AppTest replays
+    # the click on that rerun, forever, so the driver sets the choice itself
+    def _lang(self):
+        self.lang = 'ar' if self.lang == 'en' else 'en'
+        self.at.session_state['lang'] = self.lang
+        self._run('lang')
+
+    def _theme(self):
+        self.theme = 'light' if self.theme == 'dark' else 'dark'
+        self.at.session_state['theme'] = self.theme
+        self._run('theme')
+
+    # the page polls the report job with st.rerun(), which AppTest follows:
+    # the step ends once the report is ready to download
+    def _pdf(self):
+        if self.page != 'client':
+            self._goto('client')
+        buttons = [b for b in self.at.button if 'PDF' in str(b.label)]
+        if not buttons:
+            return self._page()
+        buttons[0].click()
+        self._run('pdf')
+
+    def _upload(self):
+        if self.uploaded:
+            return self._page()
+        self.uploaded = True
+        self.at.session_state['loadtest_upload'] = _upload_bytes(self.index, self.seed)
+        self._goto('upload')
+        self.samples[-1] = ('upload',) + self.samples[-1][1:]
+
+    def run(self, actions, start):
+        start.wait()
+        self.open()
+        names, weights = zip(*ACTIONS.items())
+        for _ in range(actions):
+            self.act(self.rng.choices(names, weights)[0])
+
+
+def _percentiles(seconds):
+    values = np.array(seconds) * 1000
+    stats = {'n': len(values)}
+    stats.update({f"p{p}_ms": round(float(np.percentile(values, p)), 2) for p in PCTS})
+    stats['max_ms'] = round(float(values.max()), 2)
+    return stats
+
+
+def _summarise(samples, key):
+    groups = {}
+    for sample in samples:
+        groups.setdefault(sample[key], []).append(sample[2])
+    return {name: _percentiles(values) for name, values in sorted(groups.items())}
+
+
+def run_level(sessions, actions, seed):
+    users = [User(i, seed) for i in range(sessions)]
+    start = threading.Barrier(sessions + 1)
+    threads = [threading.Thread(target=u.run, args=(actions, start), daemon=True) for u in users]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    samples = [s for u in users for s in u.samples]
+    errors  = [e for u in users for e in u.errors]
+    return {
+        'sessions':        sessions,
+        'steps':           len(samples),
+        'wall_seconds':    round(wall, 3),
+        'steps_per_sec':   round(len(samples) / wall, 2) if wall else None,
+        'peak_rss_mb':     round(_peak_rss_mb(), 1),
+        'errors':          len(errors),
+        'error_samples':   errors[:5],
+        'widget_misses':   sum(u.misses for u in users),
+        'pages':           _summarise(samples, 1),
+        'actions':         _summarise(samples, 0),
+    }
+
+
+# ── Scratch directory: the bundled dataset, or a synthetic one of --rows ──
+def _workdir(rows, seed):
+    if rows is not None:
+        workdir, _ = prepare_workdir(size_label(rows), rows, seed)
+        return workdir
+    workdir = tempfile.mkdtemp(prefix='loadtest-')
+    os.makedirs(os.path.join(workdir, 'data'))
+    os.symlink(os.path.join(ROOT, 'data', 'campaigns_clean.parquet'),
+               os.path.join(workdir, 'data', 'campaigns_clean.parquet'))
+    for name in LINKED:
+        if os.path.exists(os.path.join(ROOT, name)):
+            os.symlink(os.path.join(ROOT, name), os.path.join(workdir, name))
+    return workdir
+
+
+# app exceptions are collected per step; the log would only repeat them
+def _quiet():
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    warnings.filterwarnings('ignore')
+    # the config is parsed lazily and resets the level when it is
+    config.set_option('logger.level', 'critical')
+    set_log_level('critical')
+
+
+def _warm_up(seed):
+    # one user visits every page first, so level 1 is not the cold start
+    user = User(-1, seed)
+    user.open()
+    for page in BROWSED:
+        user._goto(page)
+
+
+def run(levels, actions, rows=None, seed=0, log=print):
+    workdir = _workdir(rows, seed)
+    # relative data paths and the env-configured dirs resolve in the scratch dir
+    for name in ('ARROW_CACHE_DIR', 'DATA_STORE_DIR', 'SESSION_SPILL_DIR'):
+        os.environ.pop(name, None)
+    os.chdir(workdir)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    _quiet()
+
+    import streamlit as st
+    st.file_uploader = _file_uploader
+    _share_runtime()
+
+    _warm_up(seed)
+    report = {
+        'commit':  _git('rev-parse', 'HEAD'),
+        'dirty':   bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        **_environment(),
+        'dataset': 'bundled' if rows is None else size_label(rows),
+        'actions_per_session': actions,
+        'seed':    seed,
+        'levels':  [],
+    }
+    for sessions in levels:
+        level = run_level(sessions, actions, seed)
+        report['levels'].append(level)
+        log(f"── {sessions} sessions: {level['steps']} steps in {level['wall_seconds']:.1f} s "
+            f"({level['steps_per_sec']:.1f}/s), peak RSS {level['peak_rss_mb']:,.0f} MB, "
+            f"{level['errors']} errors, {level['widget_misses']} widget misses")
+        for page, stats in level['pages'].items():
+            log(f"  {page:<10} n={stats['n']:<4} p50 {stats['p50_ms']:8.1f}  "
+                f"p95 {stats['p95_ms']:8.1f}  p99 {stats['p99_ms']:8.1f}  max {stats['max_ms']:8.1f} ms")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.loadtest',
+        description='Simulate concurrent users of app.py and report latency, memory and throughput.',
+    )
+    parser.add_argument('--sessions', action='append', type=int, dest='levels',
+                        help=f"concurrent sessions, repeatable (default: {' '.join(map(str, LEVELS))})")
+    parser.add_argument('--actions', type=int, default=20, help='steps per session after opening the app')
+    parser.add_argument('--rows', default=None, help='synthetic dataset size (default: the bundled data)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help='JSON file (default: benchmarks/results/load-<commit>.json)')
+    args = parser.parse_args(argv)
+
+    # resolved before the run moves into its scratch directory
+    out  = os.path.abspath(args.out) if args.out else None
+    rows = parse_rows(args.rows) if args.rows else None
+    report = run(sorted(args.levels or LEVELS), args.actions, rows, args.seed)
+    out = out or os.path.join(ROOT, 'benchmarks', 'results', f"load-{(report['commit'] or 'local')[:10]}.json")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"→ {out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
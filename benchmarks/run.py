@@ -0,0 +1,280 @@
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import resource
+import warnings
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from benchmarks.generate import parse_rows, size_label, default_clients, write_campaigns
+
+# ==============================
+# Benchmark Runner
+# ==============================
+# Times the data path of the app on synthetic datasets of growing size and
+# writes one JSON file per run, so two commits can be compared:
+#
+#   python -m benchmarks.run                               # 200k, 2M, 20M
+#   python -m benchmarks.run --rows 200k --rows 2M --out before.json
+#   python -m benchmarks.run --compare before.json after.json
+#
+# Each size runs in its own process, in a scratch directory holding the
+# generated data/campaigns_clean.parquet (plus links to models/, assets/ and
+# locales/), so caches, the Arrow copy and peak RSS start from zero. Pages
+# are called without `streamlit run`: widgets are inert there, and what is
+# timed is the page's data work — views, cube, forecasts, scores, figures.
+ROOT      = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR  = os.path.join(ROOT, 'benchmarks', '.data')
+SIZES     = ['200k', '2M', '20M']
+LINKED    = ['models', 'assets', 'locales']
+REGRESSED = 1.10
+
+
+# ── Timing helpers ──
+def _timed(fn):
+    started = time.perf_counter()
+    result  = fn()
+    return result, time.perf_counter() - started
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+# ==============================
+# Child: one dataset size, run inside its scratch directory
+# ==============================
+def _quiet():
+    warnings.filterwarnings('ignore')
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith('streamlit'):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+
+def run_child(repeat):
+    _quiet()
+    from modules import base_dataset
+    from modules.base_dataset import get_base_dataset
+    from modules.model_registry import get_model_bundle
+    from modules.page_loader import load_page
+    from modules.pdf_report import generate_pdf, render_pdf
+    from modules.query import PAGE_COLUMNS
+    from modules.row_index import query_rows, page_rows, column_values, column_range
+    from modules.scoring import score_campaigns
+
+    timings = {}
+
+    def record(name, fn):
+        result, seconds = _timed(fn)
+        timings[name] = seconds
+        return result
+
+    def record_warm(name, fn):
+        timings[name] = statistics.median(_timed(fn)[1] for _ in range(repeat))
+
+    # ── Load: prepare + write the shared Arrow copy, then map an existing one ──
+    base = record('load.cold', get_base_dataset)
+    base_dataset._current = None
+    base_dataset._VIEWS.clear()
+    base = record('load.mapped', get_base_dataset)
+    bundle = record('model.load', get_model_bundle)
+
+    # the busiest client, as in a report run
+    sizes  = {c: stop - start for c, (start, stop) in base.index.offsets.items()}
+    client = max(sizes, key=sizes.get)
+
+    # ── Pages: first call (cold caches), then reruns ──
+    def load_client(company):
+        return base.view(PAGE_COLUMNS['client'], company)
+
+    # the explorer keeps its page number in session state, which needs the
+    # runtime; its data work is the filter choices plus a sorted page
+    def explorer():
+        df = base.view(PAGE_COLUMNS['explorer'])
+        for column in ('Channel_Used', 'Campaign_Goal', 'Customer_Segment'):
+            column_values(df, column)
+        column_range(df, 'Date'), column_range(df, 'ROI')
+        positions = query_rows(df, (('Company', 'in', (client,)),), 'ROI', True)
+        return page_rows(df, positions, 0, 50)
+
+    pages = {
+        'overview': lambda: load_page('overview')(base.view(PAGE_COLUMNS['overview']), 'en', 'dark'),
+        'client':   lambda: load_page('client')(load_client(client), 'en', 'dark',
+                                                base.clients, load_client),
+        'ai':       lambda: load_page('ai')(base.view(PAGE_COLUMNS['ai']), 'en', 'dark'),
+        'explorer': explorer,
+    }
+    for name, show in pages.items():
+        record(f'page.{name}.cold', show)
+        record_warm(f'page.{name}.warm', show)
+
+    # ── Scoring: every campaign, without the score cache ──
+    scored = base.view(PAGE_COLUMNS['ai'])
+    record('scoring.all', lambda: score_campaigns(scored, bundle))
+
+    # ── PDF report of the busiest client ──
+    client_df = load_client(client)
+    record('pdf.generate', lambda: generate_pdf(client_df, client, 'en'))
+    record_warm('pdf.render', lambda: render_pdf(client_df, client, 'en'))
+
+    return {
+        'rows':        base.num_rows,
+        'clients':     len(base.clients),
+        'pdf_client':  {'name': client, 'rows': sizes[client]},
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'timings':     {name: round(seconds, 6) for name, seconds in timings.items()},
+    }
+
+
+# ==============================
+# Parent: generate, run each size in a fresh process, collect
+# ==============================
+def prepare_workdir(label, rows, seed):
+    workdir = os.path.join(DATA_DIR, f"{label}-seed{seed}")
+    data    = os.path.join(workdir, 'data')
+    path    = os.path.join(data, 'campaigns_clean.parquet')
+    generated = None
+    if not os.path.exists(path):
+        _, generated = _timed(lambda: write_campaigns(path, rows, seed, default_clients(rows)))
+    for name in LINKED:
+        link = os.path.join(workdir, name)
+        if not os.path.lexists(link) and os.path.exists(os.path.join(ROOT, name)):
+            os.symlink(os.path.join(ROOT, name), link)
+    # start without the Arrow copy or any stored uploads
+    for name in ('.arrow', 'store'):
+        shutil.rmtree(os.path.join(data, name), ignore_errors=True)
+    return workdir, generated
+
+
+def run_size(text, seed, repeat):
+    rows  = parse_rows(text)
+    label = size_label(rows)
+    workdir, generated = prepare_workdir(label, rows, seed)
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT, env.get('PYTHONPATH')]))
+    for name in ('ARROW_CACHE_DIR', 'DATA_STORE_DIR', 'SESSION_SPILL_DIR'):
+        env.pop(name, None)
+
+    out = os.path.join(workdir, 'result.json')
+    cmd = [sys.executable, '-m', 'benchmarks.run', '--child', '--repeat', str(repeat), '--out', out]
+    proc = subprocess.run(cmd, cwd=workdir, env=env, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{label}: benchmark failed\n{proc.stderr[-4000:]}")
+
+    with open(out) as f:
+        result = json.load(f)
+    result['seed'] = seed
+    if generated is not None:
+        result['generate_seconds'] = round(generated, 3)
+    return label, result
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment():
+    import numpy, pandas, pyarrow, sklearn, streamlit
+    return {
+        'python':   platform.python_version(),
+        'platform': platform.platform(),
+        'cpus':     os.cpu_count(),
+        'packages': {m.__name__: m.__version__ for m in (numpy, pandas, pyarrow, sklearn, streamlit)},
+    }
+
+
+def run(sizes, seed=0, repeat=3, log=print):
+    report = {
+        'commit':  _git('rev-parse', 'HEAD'),
+        'dirty':   bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        **_environment(),
+        'sizes':   {},
+    }
+    for text in sizes:
+        label, result = run_size(text, seed, repeat)
+        report['sizes'][label] = result
+        log(f"── {label}: {result['rows']:,} rows, {result['clients']} clients, "
+            f"peak RSS {result['peak_rss_mb']:,.0f} MB")
+        for name, seconds in result['timings'].items():
+            log(f"  {name:<24} {seconds * 1000:10.1f} ms")
+    return report
+
+
+# ── Side by side: new / old per timing, slower than REGRESSED flagged ──
+def compare(old_path, new_path, threshold=REGRESSED, log=print):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    log(f"{(old.get('commit') or '?')[:10]} → {(new.get('commit') or '?')[:10]}")
+
+    regressions = 0
+    for label, result in new['sizes'].items():
+        before = old['sizes'].get(label)
+        if before is None:
+            continue
+        log(f"── {label}")
+        for name, seconds in result['timings'].items():
+            if name not in before['timings']:
+                continue
+            ratio = seconds / before['timings'][name] if before['timings'][name] else float('inf')
+            flag  = '  ✗ slower' if ratio > threshold else ''
+            regressions += ratio > threshold
+            log(f"  {name:<24} {before['timings'][name] * 1000:10.1f} → {seconds * 1000:10.1f} ms"
+                f"  {ratio:5.2f}×{flag}")
+        log(f"  {'peak_rss_mb':<24} {before['peak_rss_mb']:10.1f} → {result['peak_rss_mb']:10.1f} MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.run',
+        description='Benchmark loading, pages, scoring and PDF reports on synthetic data.',
+    )
+    parser.add_argument('--rows', action='append', dest='sizes',
+                        help=f"dataset size, repeatable (default: {', '.join(SIZES)})")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='reruns per warm timing (median)')
+    parser.add_argument('--out', default=None, help='JSON file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files')
+    parser.add_argument('--threshold', type=float, default=REGRESSED, help='ratio flagged as slower')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare, threshold=args.threshold) else 0
+
+    if args.child:
+        result = run_child(args.repeat)
+        with open(args.out, 'w') as f:
+            json.dump(result, f, indent=2)
+        return 0
+
+    report = run(args.sizes or SIZES, args.seed, args.repeat)
+    out = args.out or os.path.join(ROOT, 'benchmarks', 'results', f"{(report['commit'] or 'local')[:10]}.json")
+    folder = os.path.dirname(out)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"→ {out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from modules.cache import LRUCache
+from modules.dataset import dataset_fingerprint
+from modules.perf import count
+from modules.groupby_engine import (Spec, group_reduce, combine_codes, decode_codes,
+                                    metric_weights, is_integer_metric)
+
+# ==============================
+# Aggregate Cube
+# ==============================
+# One pre-aggregated table shared by Overview, Client View, AI Insights and
+# the PDF report. Every cell is a unique combination of the dimensions below
+# and holds the row count plus, per metric, the sum and the non-null count.
+# Any KPI or chart on the pages is a roll-up of these cells, so the raw rows
+# are scanned once per dataset instead of once per chart per rerun.
+CUBE_DIMS    = ['Company', 'Channel_Used', 'Campaign_Goal', 'Customer_Segment', 'Month']
+SUM_METRICS  = ['Clicks', 'Impressions']
+MEAN_METRICS = ['ROI', 'CTR', 'Conversion_Rate', 'Acquisition_Cost']
+
+_CUBES = LRUCache(maxsize=8)
+
+
+class AggregateCube:
+
+    # partials: the same cells split per YearMonth (modules/cube_ledger.py),
+    # for forecasts; None when the rows have no Date
+    def __init__(self, cells, dims, metrics, partials=None):
+        self.cells    = cells
+        self.dims     = dims
+        self.metrics  = metrics
+        self.partials = partials
+
+    def _select(self, company=None):
+        if company is None:
+            return self.cells
+        return self.cells[self.cells['Company'] == company]
+
+    # ── Totals: sums for counters, means for rates ──
+    def kpis(self, company=None):
+        cells = self._select(company)
+        out = {'rows': int(cells['rows'].sum())}
+        for m in self.metrics:
+            total = cells[f'{m}_sum'].sum()
+            if m in SUM_METRICS:
+                out[m] = total
+            else:
+                n = cells[f'{m}_n'].sum()
+                out[m] = total / n if n else np.nan
+        if 'Company' in self.dims:
+            out['companies'] = self.nunique('Company', company)
+        return out
+
+    # ── Roll-up by one dimension (same shape as groupby(dim).agg().reset_index()) ──
+    def by(self, dim, company=None):
+        specs = [Spec(dim, None, 'count')] + [
+            Spec(dim, m, 'sum' if m in SUM_METRICS else 'mean') for m in self.metrics
+        ]
+        counted, *metrics = group_reduce(self._select(company), specs)
+        observed = counted.counts > 0
+
+        out = pd.DataFrame({dim: counted.labels[observed]})
+        out['rows'] = counted.values[observed]
+        for result in metrics:
+            out[result.spec.metric] = result.values[observed]
+        return out
+
+    # ── Several best/worst questions answered in one pass over the cells ──
+    def rank(self, specs, company=None):
+        return group_reduce(self._select(company), specs)
+
+    def nunique(self, dim, company=None):
+        cells = self._select(company)
+        return int(cells[dim].nunique())
+
+    def labels(self, dim):
+        return sorted(self.cells[dim].dropna().unique().tolist())
+
+
+# ── Cube cells over the given dims; works on raw rows and on other cells
+#    alike, so partial cells of disjoint row sets merge into the totals ──
+def build_cells(df, dims, metrics):
+    count('rows_scanned', len(df))
+    combined, labels = combine_codes(df, dims)
+    cell_codes, inverse = np.unique(combined, return_inverse=True)
+    k = len(cell_codes)
+
+    cells = dict(zip(dims, decode_codes(cell_codes, labels)))
+    if 'rows' in df.columns:
+        cells['rows'] = np.rint(np.bincount(inverse, weights=df['rows'], minlength=k)).astype(np.int64)
+    else:
+        cells['rows'] = np.bincount(inverse, minlength=k)
+    for m in metrics:
+        sums, present = metric_weights(df, m)
+        total = np.bincount(inverse, weights=sums, minlength=k)
+        if is_integer_metric(df, m):
+            total = np.rint(total).astype(np.int64)
+        cells[f'{m}_sum'] = total
+        cells[f'{m}_n']   = np.rint(np.bincount(inverse, weights=present, minlength=k)).astype(np.int64)
+    return pd.DataFrame(cells)
+
+
+def merge_cells(partials, dims, metrics):
+    return build_cells(pd.concat(partials, ignore_index=True), dims, metrics)
+
+
+def build_cube(df):
+    dims    = [d for d in CUBE_DIMS if d in df.columns]
+    metrics = [m for m in SUM_METRICS + MEAN_METRICS if m in df.columns]
+    if 'Date' not in df.columns:
+        return AggregateCube(build_cells(df, dims, metrics), dims, metrics)
+    # one pass over the rows gives the per-month partials and, merged, the cells
+    from modules.cube_ledger import partition_cells
+    partials = partition_cells(df, dims, metrics)
+    return AggregateCube(merge_cells([partials], dims, metrics), dims, metrics, partials)
+
+
+def get_cube(df):
+    key = dataset_fingerprint(df)
+    return _CUBES.get_or_build(key, lambda: build_cube(df))
+
+
+# ── A cube maintained elsewhere (e.g. incrementally) for a given frame ──
+def put_cube(df, cube):
+    return _CUBES.put(dataset_fingerprint(df), cube)
@@ -2,55 +2,48 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-import pickle
-import joblib
 import numpy as np
 from modules.translator import get_text
+from modules.model_registry import get_model_bundle
+from modules.scoring import get_scores, success_by
+from modules.aggregates import get_cube
+from modules.groupby_engine import Spec
+from modules.dataset import dataset_fingerprint
+from modules.figures import cached_figure
+from modules.theme import theme_vars, render
+from modules.forecast import get_forecasts
+from modules.streaming import streamed_success
+from modules.perf import Sections
 
 def show_ai_insights(df, lang="en", theme="dark"):
 
     # ── Theme Settings ──
-    template   = "plotly_dark"   if theme == "dark" else "plotly_white"
-    bg_color   = "rgba(0,0,0,0)" if theme == "dark" else "rgba(255,255,255,0.6)"
-    accent     = "#E91E8C"       if theme == "dark" else "#C2185B"
-    accent2    = "#FF6B35"       if theme == "dark" else "#E64A19"
-    accent3    = "#9C27B0"       if theme == "dark" else "#7B1FA2"
-    text_color = "#FFFFFF"       if theme == "dark" else "#1A0A2E"
-    subtext    = "#9988BB"       if theme == "dark" else "#6A4080"
-    card_bg    = "rgba(233,30,140,0.06)"  if theme == "dark" else "rgba(194,24,91,0.05)"
-    border     = "rgba(233,30,140,0.2)"   if theme == "dark" else "rgba(194,24,91,0.2)"
+    (template, bg_color, accent, accent2, accent3,
+     text_color, subtext, card_bg, border) = theme_vars(theme)
 
     CHART_COLORS = ['#E91E8C', '#FF6B35', '#9C27B0', '#FF9800']
 
     t = lambda key: get_text(key, lang)
+    section = Sections('ai')
+
+    section('cube')
+    cube = get_cube(df)
+    # charts are built once per dataset and theme; a theme switch only restyles them
+    source = dataset_fingerprint(df)
+    kpis = cube.kpis()
 
     # ── Page Banner ──
-    st.markdown(f"""
-    <div style='background:linear-gradient(135deg, rgba(233,30,140,0.08), rgba(156,39,176,0.06));
-                border:1px solid {border};
-                border-radius:16px; padding:22px 28px; margin-bottom:24px;
-                backdrop-filter:blur(12px);'>
-        <h1 style='font-family:Syne,sans-serif; font-size:1.8rem; font-weight:800;
-                   background:linear-gradient(135deg, {accent2}, {accent}, {accent3});
-                   -webkit-background-clip:text; -webkit-text-fill-color:transparent;
-                   background-clip:text; margin:0;'>
-            🤖 {t("ai_insights")}
-        </h1>
-        <p style='color:{accent}; font-size:0.78rem; letter-spacing:2px;
-                  text-transform:uppercase; margin:4px 0 0 0;'>
-            AI-Powered Recommendations & Predictions
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(render('banner', theme, lang, icon="🤖", title=t("ai_insights"),
+                       subtitle="AI-Powered Recommendations & Predictions"), unsafe_allow_html=True)
 
     # ── Load Model ──
+    section('model')
     model_loaded = False
     try:
-        model    = joblib.load('models/campaign_model.pkl')
-        with open('models/features.pkl', 'rb') as f:
-            features = pickle.load(f)
-        with open('models/encoders.pkl', 'rb') as f:
-            encoders = pickle.load(f)
+        bundle   = get_model_bundle()
+        model    = bundle.model
+        features = bundle.features
+        encoders = bundle.encoders
         model_loaded = True
     except Exception as e:
         st.warning(f"⚠️ Model not loaded: {e}")
@@ -58,19 +51,22 @@ def show_ai_insights(df, lang="en", theme="dark"):
     # ══════════════════════════════════════
     # SECTION 1 — AI Recommendations
     # ══════════════════════════════════════
-    st.markdown(f"""
-    <p style='color:{accent}; font-size:0.75rem; text-transform:uppercase;
-              letter-spacing:2px; font-weight:700; margin-bottom:12px;'>
-        💡 {t("ai_recommendation")}
-    </p>
-    """, unsafe_allow_html=True)
-
-    best_platform  = df.groupby('Channel_Used')['ROI'].mean().idxmax()
-    best_roi_val   = df.groupby('Channel_Used')['ROI'].mean().max()
-    best_goal      = df.groupby('Campaign_Goal')['ROI'].mean().idxmax()
-    best_month     = df.groupby('Month')['ROI'].mean().idxmax()
-    best_segment   = df.groupby('Customer_Segment')['Conversion_Rate'].mean().idxmax()
-    worst_platform = df.groupby('Channel_Used')['ROI'].mean().idxmin()
+    section('recommendations')
+    st.markdown(render('section.block', theme, lang, label=f"💡 {t('ai_recommendation')}", margin="margin-bottom:12px"),
+                unsafe_allow_html=True)
+
+    platform, goal, month, segment = cube.rank([
+        Spec('Channel_Used',     'ROI',             'mean'),
+        Spec('Campaign_Goal',    'ROI',             'mean'),
+        Spec('Month',            'ROI',             'mean'),
+        Spec('Customer_Segment', 'Conversion_Rate', 'mean'),
+    ])
+    best_platform  = platform.best
+    best_roi_val   = platform.best_value
+    best_goal      = goal.best
+    best_month     = month.best
+    best_segment   = segment.best
+    worst_platform = platform.worst
 
     recs = [
         {
@@ -108,284 +104,302 @@ def show_ai_insights(df, lang="en", theme="dark"):
     col1, col2 = st.columns(2)
     for i, rec in enumerate(recs):
         with (col1 if i % 2 == 0 else col2):
-            st.markdown(f"""
-            <div style='background:{card_bg}; border:1px solid {border};
-                        border-left:4px solid {rec["color"]};
-                        border-radius:14px; padding:16px 18px; margin-bottom:12px;
-                        backdrop-filter:blur(10px);'>
-                <div style='display:flex; align-items:flex-start; gap:12px;'>
-                    <span style='font-size:1.4rem; line-height:1.2;'>{rec["icon"]}</span>
-                    <div>
-                        <p style='color:{text_color}; font-size:0.88rem; font-weight:700;
-                                  font-family:Syne,sans-serif; margin:0 0 4px 0;'>
-                            {rec["title"]}
-                        </p>
-                        <p style='color:{subtext}; font-size:0.76rem;
-                                  margin:0; line-height:1.5;'>
-                            {rec["desc"]}
-                        </p>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(render('ai.recommendation', theme, lang, **rec), unsafe_allow_html=True)
 
     st.markdown("<div style='height:8px'></div>", unsafe_allow_html=True)
 
     # ══════════════════════════════════════
     # SECTION 2 — ROI Trend + Prediction
     # ══════════════════════════════════════
-    st.markdown(f"<hr style='border-color:{border}; opacity:0.5;'>", unsafe_allow_html=True)
-    st.markdown(f"""
-    <p style='color:{accent}; font-size:0.75rem; text-transform:uppercase;
-              letter-spacing:2px; font-weight:700; margin-bottom:12px;'>
-        📈 {t("prediction")}
-    </p>
-    """, unsafe_allow_html=True)
-
-    monthly = df.groupby('Month')['ROI'].mean().reset_index()
-
-    last_month  = int(monthly['Month'].max())
+    section('forecast')
+    st.markdown(render('divider', theme), unsafe_allow_html=True)
+    st.markdown(render('section.block', theme, lang, label=f"📈 {t('prediction')}", margin="margin-bottom:12px"),
+                unsafe_allow_html=True)
+
+    # every Company × Channel series is fitted together, once per dataset
+    forecasts   = get_forecasts(df, cube)
+    trend_fit   = forecasts.params()
+    # the whole dataset's ROI per calendar month, in time order
+    monthly     = forecasts.history()
+
+    last_month  = monthly['YearMonth'].iloc[-1]
     last_roi    = float(monthly['ROI'].iloc[-1])
-    growth_rate = 0.05
 
     # حساب التوقعات
-    pred_months = [last_month + 1, last_month + 2, last_month + 3]
-    pred_rois   = [
-        round(last_roi * (1 + growth_rate),      2),
-        round(last_roi * (1 + growth_rate) ** 2, 2),
-        round(last_roi * (1 + growth_rate) ** 3, 2),
-    ]
-    
-    # أرقام الشهور للعرض (1,2,3 بدل 13,14,15)
-    display_months = [1, 2, 3]
+    pred_months = forecasts.next_months(3)
+    pred_rois   = [round(float(roi), 2) for roi in forecasts.predict(horizon=3)]
 
     col_chart, col_info = st.columns([3, 1])
 
     with col_chart:
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatter(
-            x=monthly['Month'], y=monthly['ROI'],
-            mode='lines+markers',
-            name='Actual ROI',
-            line=dict(color=accent, width=3),
-            marker=dict(size=8, color=accent,
-                       line=dict(width=2, color='white')),
-            fill='tozeroy',
-            fillcolor='rgba(233,30,140,0.08)'
-        ))
-
-        fig.add_trace(go.Scatter(
-            x=[last_month] + pred_months,
-            y=[last_roi]   + pred_rois,
-            mode='lines+markers',
-            name='Predicted ROI',
-            line=dict(color=accent2, width=3, dash='dot'),
-            marker=dict(size=10, color=accent2, symbol='star',
-                       line=dict(width=2, color='white'))
-        ))
-
-        fig.add_vrect(
-            x0=last_month, x1=last_month + 3,
-            fillcolor=f"rgba(255,107,53,0.05)",
-            line_width=0,
-            annotation_text="Predicted",
-            annotation_position="top left",
-            annotation_font_color=accent2
-        )
-
-        fig.update_layout(
-            template=template,
-            plot_bgcolor=bg_color,
-            paper_bgcolor=bg_color,
-            margin=dict(t=30, b=20, l=10, r=10),
-            xaxis_title="Month",
-            yaxis_title="Average ROI",
-            legend=dict(
-                orientation="h",
-                yanchor="bottom", y=1.02,
-                xanchor="right",  x=1
+        def patch_forecast(fig):
+            fig.data[0].update(line_color=accent, marker_color=accent)
+            fig.data[1].update(line_color=accent2, marker_color=accent2)
+            fig.layout.annotations[0].font.color = accent2
+
+        def build_forecast():
+            fig = go.Figure()
+
+            fig.add_trace(go.Scatter(
+                x=monthly['YearMonth'], y=monthly['ROI'],
+                mode='lines+markers',
+                name='Actual ROI',
+                line=dict(color=accent, width=3),
+                marker=dict(size=8, color=accent,
+                           line=dict(width=2, color='white')),
+                fill='tozeroy',
+                fillcolor='rgba(233,30,140,0.08)'
+            ))
+
+            fig.add_trace(go.Scatter(
+                x=[last_month] + pred_months,
+                y=[last_roi]   + pred_rois,
+                mode='lines+markers',
+                name='Predicted ROI',
+                line=dict(color=accent2, width=3, dash='dot'),
+                marker=dict(size=10, color=accent2, symbol='star',
+                           line=dict(width=2, color='white'))
+            ))
+
+            fig.add_vrect(
+                x0=last_month, x1=pred_months[-1],
+                fillcolor=f"rgba(255,107,53,0.05)",
+                line_width=0,
+                annotation_text="Predicted",
+                annotation_position="top left",
+                annotation_font_color=accent2
             )
-        )
+
+            fig.update_layout(
+                template=template,
+                plot_bgcolor=bg_color,
+                paper_bgcolor=bg_color,
+                margin=dict(t=30, b=20, l=10, r=10),
+                xaxis_title="Month",
+                yaxis_title="Average ROI",
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom", y=1.02,
+                    xanchor="right",  x=1
+                )
+            )
+            return fig
+
+        fig = cached_figure(source, 'ai.forecast', theme, build_forecast,
+                            patch=patch_forecast)
         st.plotly_chart(fig, use_container_width=True)
 
     with col_info:
-        # ✅ الطريقة المباشرة (زي المشروع التاني الشغال)
-        st.markdown(f"""
-        <div style="background:{card_bg}; border:1px solid {border};
-                    border-radius:14px; padding:18px;">
-            <p style="color:{subtext}; font-size:0.68rem; text-transform:uppercase;
-                      letter-spacing:1.5px; margin:0 0 14px 0;">
-                📊 Forecast
-            </p>
-            <p style="color:{subtext}; font-size:0.70rem; margin:0 0 4px 0;">
-                Month {display_months[0]}
-            </p>
-            <p style="color:{accent}; font-size:1.2rem; font-weight:800;
-                      font-family:Syne,sans-serif; margin:0 0 12px 0;">
-                {pred_rois[0]}x
-            </p>
-            <p style="color:{subtext}; font-size:0.70rem; margin:0 0 4px 0;">
-                Month {display_months[1]}
-            </p>
-            <p style="color:{accent}; font-size:1.2rem; font-weight:800;
-                      font-family:Syne,sans-serif; margin:0 0 12px 0;">
-                {pred_rois[1]}x
-            </p>
-            <p style="color:{subtext}; font-size:0.70rem; margin:0 0 4px 0;">
-                Month {display_months[2]}
-            </p>
-            <p style="color:{accent}; font-size:1.2rem; font-weight:800;
-                      font-family:Syne,sans-serif; margin:0 0 16px 0;">
-                {pred_rois[2]}x
-            </p>
-            <div style="background:rgba(233,30,140,0.08);
-                        border-radius:8px; padding:10px;">
-                <p style="color:{accent}; font-size:0.70rem;
-                          margin:0; text-align:center;">
-                    +5% growth/month
-                </p>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(render('ai.forecast', theme, lang, months=pred_months, rois=pred_rois,
+                           phi=trend_fit['phi']), unsafe_allow_html=True)
 
     # ══════════════════════════════════════
     # SECTION 3 — Feature Importance
     # ══════════════════════════════════════
+    section('importance')
     if model_loaded:
-        st.markdown(f"<hr style='border-color:{border}; opacity:0.5;'>", unsafe_allow_html=True)
-        st.markdown(f"""
-        <p style='color:{accent}; font-size:0.75rem; text-transform:uppercase;
-                  letter-spacing:2px; font-weight:700; margin-bottom:12px;'>
-            🔑 Key Success Factors
-        </p>
-        """, unsafe_allow_html=True)
-
-        importance_df = pd.DataFrame({
-            'Feature':    features,
-            'Importance': model.feature_importances_
-        }).sort_values('Importance', ascending=True).tail(10)
-
-        fig2 = px.bar(
-            importance_df,
-            x='Importance', y='Feature',
-            orientation='h',
-            color='Importance',
-            color_continuous_scale=[[0,'#2D0A1E'],[1,'#E91E8C']],
-            template=template,
-            text='Importance'
-        )
-        fig2.update_traces(texttemplate='%{text:.3f}', textposition='outside')
-        fig2.update_layout(
-            plot_bgcolor=bg_color,
-            paper_bgcolor=bg_color,
-            margin=dict(t=20, b=20, l=10, r=60),
-            showlegend=False,
-            coloraxis_showscale=False,
-            xaxis_title="Importance Score",
-            yaxis_title=""
-        )
+        st.markdown(render('divider', theme), unsafe_allow_html=True)
+        st.markdown(render('section.block', theme, lang, label="🔑 Key Success Factors", margin="margin-bottom:12px"),
+                    unsafe_allow_html=True)
+
+        def build_importance():
+            importance_df = pd.DataFrame({
+                'Feature':    features,
+                'Importance': model.feature_importances_
+            }).sort_values('Importance', ascending=True).tail(10)
+
+            fig2 = px.bar(
+                importance_df,
+                x='Importance', y='Feature',
+                orientation='h',
+                color='Importance',
+                color_continuous_scale=[[0,'#2D0A1E'],[1,'#E91E8C']],
+                template=template,
+                text='Importance'
+            )
+            fig2.update_traces(texttemplate='%{text:.3f}', textposition='outside')
+            fig2.update_layout(
+                plot_bgcolor=bg_color,
+                paper_bgcolor=bg_color,
+                margin=dict(t=20, b=20, l=10, r=60),
+                showlegend=False,
+                coloraxis_showscale=False,
+                xaxis_title="Importance Score",
+                yaxis_title=""
+            )
+            return fig2
+
+        fig2 = cached_figure(bundle.version, 'ai.importance', theme, build_importance)
         st.plotly_chart(fig2, use_container_width=True)
+        st.caption(f"Model v{bundle.version} · loaded in {bundle.load_seconds * 1000:,.0f} ms · "
+                   f"~{bundle.size_bytes / 1024 ** 2:,.1f} MB in memory · shared across sessions")
+
+        # ── Success Probability (every campaign scored once per dataset) ──
+        section('scores')
+        st.markdown(render('section.block', theme, lang, label=f"🎯 {t('success_probability')}", margin="margin:18px 0 12px 0"),
+                    unsafe_allow_html=True)
+
+        try:
+            if df.attrs.get('out_of_core'):
+                # no rows in memory: scored batch by batch as the dataset streams by
+                streamed = streamed_success(bundle)
+                success  = lambda dim: streamed[dim].copy()
+            else:
+                scores  = get_scores(df, bundle)
+                success = lambda dim: success_by(df, scores, dim)
+        except KeyError as e:
+            st.info(f"ℹ️ {e.args[0]}")
+            success = None
+
+        if success is not None:
+            col1, col2 = st.columns(2)
+
+            with col1:
+                def build_success_platform():
+                    channel_success = success('Channel_Used')
+                    channel_success['Success_Probability'] = (channel_success['Success_Probability'] * 100).round(1)
+
+                    fig_sp = px.bar(
+                        channel_success,
+                        x='Channel_Used', y='Success_Probability',
+                        color='Channel_Used',
+                        color_discrete_sequence=CHART_COLORS,
+                        template=template,
+                        text='Success_Probability',
+                        title="By Platform"
+                    )
+                    fig_sp.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+                    fig_sp.update_layout(
+                        plot_bgcolor=bg_color,
+                        paper_bgcolor=bg_color,
+                        margin=dict(t=40, b=20, l=10, r=10),
+                        showlegend=False,
+                        xaxis_title="",
+                        yaxis_title="Success Probability %"
+                    )
+                    return fig_sp
+
+                fig_sp = cached_figure((source, bundle.version), 'ai.success_platform', theme, build_success_platform)
+                st.plotly_chart(fig_sp, use_container_width=True)
+
+            with col2:
+                def build_success_clients():
+                    client_success = success('Company')\
+                                        .sort_values('Success_Probability', ascending=True).tail(10)
+                    client_success['Success_Probability'] = (client_success['Success_Probability'] * 100).round(1)
+
+                    fig_sc = px.bar(
+                        client_success,
+                        x='Success_Probability', y='Company',
+                        orientation='h',
+                        color='Success_Probability',
+                        color_continuous_scale=[[0,'#2D0A1E'],[1,'#E91E8C']],
+                        template=template,
+                        text='Success_Probability',
+                        title="Top 10 Clients"
+                    )
+                    fig_sc.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+                    fig_sc.update_layout(
+                        plot_bgcolor=bg_color,
+                        paper_bgcolor=bg_color,
+                        margin=dict(t=40, b=20, l=10, r=60),
+                        showlegend=False,
+                        coloraxis_showscale=False,
+                        xaxis_title="Success Probability %",
+                        yaxis_title=""
+                    )
+                    return fig_sc
+
+                fig_sc = cached_figure((source, bundle.version), 'ai.success_clients', theme, build_success_clients)
+                st.plotly_chart(fig_sc, use_container_width=True)
 
     # ══════════════════════════════════════
     # SECTION 4 — Platform Deep Dive
     # ══════════════════════════════════════
-    st.markdown(f"<hr style='border-color:{border}; opacity:0.5;'>", unsafe_allow_html=True)
-    st.markdown(f"""
-    <p style='color:{accent}; font-size:0.75rem; text-transform:uppercase;
-              letter-spacing:2px; font-weight:700; margin-bottom:12px;'>
-        📱 Platform Deep Dive
-    </p>
-    """, unsafe_allow_html=True)
+    section('platforms')
+    st.markdown(render('divider', theme), unsafe_allow_html=True)
+    st.markdown(render('section.block', theme, lang, label="📱 Platform Deep Dive", margin="margin-bottom:12px"),
+                unsafe_allow_html=True)
 
     col1, col2 = st.columns(2)
 
     with col1:
-        platform_scatter = df.groupby('Channel_Used').agg(
-            ROI=('ROI','mean'),
-            CTR=('CTR','mean'),
-            Clicks=('Clicks','sum'),
-        ).reset_index()
-
-        fig3 = px.scatter(
-            platform_scatter,
-            x='CTR', y='ROI',
-            size='Clicks',
-            color='Channel_Used',
-            text='Channel_Used',
-            color_discrete_sequence=CHART_COLORS,
-            template=template,
-            title="ROI vs CTR by Platform"
-        )
-        fig3.update_traces(textposition='top center')
-        fig3.update_layout(
-            plot_bgcolor=bg_color,
-            paper_bgcolor=bg_color,
-            margin=dict(t=40, b=20, l=10, r=10),
-            showlegend=False
-        )
+        def build_platform_scatter():
+            platform_scatter = cube.by('Channel_Used')[['Channel_Used', 'ROI', 'CTR', 'Clicks']]
+
+            fig3 = px.scatter(
+                platform_scatter,
+                x='CTR', y='ROI',
+                size='Clicks',
+                color='Channel_Used',
+                text='Channel_Used',
+                color_discrete_sequence=CHART_COLORS,
+                template=template,
+                title="ROI vs CTR by Platform"
+            )
+            fig3.update_traces(textposition='top center')
+            fig3.update_layout(
+                plot_bgcolor=bg_color,
+                paper_bgcolor=bg_color,
+                margin=dict(t=40, b=20, l=10, r=10),
+                showlegend=False
+            )
+            return fig3
+
+        fig3 = cached_figure(source, 'ai.platform_scatter', theme, build_platform_scatter)
         st.plotly_chart(fig3, use_container_width=True)
 
     with col2:
-        goal_conv = df.groupby('Campaign_Goal').agg(
-            Conversion=('Conversion_Rate','mean'),
-            ROI=('ROI','mean')
-        ).reset_index()
-        goal_conv['Conversion'] = (goal_conv['Conversion'] * 100).round(2)
-
-        fig4 = px.bar(
-            goal_conv,
-            x='Campaign_Goal', y='Conversion',
-            color='ROI',
-            color_continuous_scale=[[0,'#2D0A1E'],[1,'#E91E8C']],
-            template=template,
-            text='Conversion',
-            title="Conversion Rate by Campaign Goal"
-        )
-        fig4.update_traces(texttemplate='%{text:.2f}%', textposition='outside')
-        fig4.update_layout(
-            plot_bgcolor=bg_color,
-            paper_bgcolor=bg_color,
-            margin=dict(t=40, b=20, l=10, r=10),
-            showlegend=False,
-            coloraxis_showscale=False,
-            xaxis_title="",
-            yaxis_title="Conversion Rate %"
-        )
+        def build_goal_conversion():
+            goal_conv = cube.by('Campaign_Goal')\
+                            .rename(columns={'Conversion_Rate': 'Conversion'})[['Campaign_Goal', 'Conversion', 'ROI']]
+            goal_conv['Conversion'] = (goal_conv['Conversion'] * 100).round(2)
+
+            fig4 = px.bar(
+                goal_conv,
+                x='Campaign_Goal', y='Conversion',
+                color='ROI',
+                color_continuous_scale=[[0,'#2D0A1E'],[1,'#E91E8C']],
+                template=template,
+                text='Conversion',
+                title="Conversion Rate by Campaign Goal"
+            )
+            fig4.update_traces(texttemplate='%{text:.2f}%', textposition='outside')
+            fig4.update_layout(
+                plot_bgcolor=bg_color,
+                paper_bgcolor=bg_color,
+                margin=dict(t=40, b=20, l=10, r=10),
+                showlegend=False,
+                coloraxis_showscale=False,
+                xaxis_title="",
+                yaxis_title="Conversion Rate %"
+            )
+            return fig4
+
+        fig4 = cached_figure(source, 'ai.goal_conversion', theme, build_goal_conversion)
         st.plotly_chart(fig4, use_container_width=True)
 
     # ══════════════════════════════════════
     # SECTION 5 — Summary Stats
     # ══════════════════════════════════════
-    st.markdown(f"<hr style='border-color:{border}; opacity:0.5;'>", unsafe_allow_html=True)
-    st.markdown(f"""
-    <p style='color:{accent}; font-size:0.75rem; text-transform:uppercase;
-              letter-spacing:2px; font-weight:700; margin-bottom:16px;'>
-        📊 Overall Performance Summary
-    </p>
-    """, unsafe_allow_html=True)
+    section('summary')
+    st.markdown(render('divider', theme), unsafe_allow_html=True)
+    st.markdown(render('section.block', theme, lang, label="📊 Overall Performance Summary", margin="margin-bottom:16px"),
+                unsafe_allow_html=True)
 
     stats = [
-        ("🏢", "Total Clients",   f"{df['Company'].nunique()}",         accent),
-        ("📢", "Total Campaigns", f"{df.shape[0]:,}",                   accent2),
-        ("💰", "Avg ROI",         f"{df['ROI'].mean():.2f}x",           accent),
-        ("👆", "Avg CTR",         f"{df['CTR'].mean():.2f}%",           accent3),
-        ("🎯", "Avg Conversion",  f"{df['Conversion_Rate'].mean():.2%}", accent2),
-        ("💸", "Avg Cost",        f"${df['Acquisition_Cost'].mean():,.0f}", accent3),
+        ("🏢", "Total Clients",   f"{kpis['companies']}",                  accent),
+        ("📢", "Total Campaigns", f"{kpis['rows']:,}",                     accent2),
+        ("💰", "Avg ROI",         f"{kpis['ROI']:.2f}x",                   accent),
+        ("👆", "Avg CTR",         f"{kpis['CTR']:.2f}%",                   accent3),
+        ("🎯", "Avg Conversion",  f"{kpis['Conversion_Rate']:.2%}",        accent2),
+        ("💸", "Avg Cost",        f"${kpis['Acquisition_Cost']:,.0f}",     accent3),
     ]
 
     cols = st.columns(6)
     for col, (icon, label, val, color) in zip(cols, stats):
         with col:
-            st.markdown(f"""
-            <div style='background:{card_bg}; border:1px solid {border};
-                        border-top:3px solid {color};
-                        border-radius:12px; padding:14px; text-align:center;
-                        backdrop-filter:blur(8px);'>
-                <p style='font-size:1.4rem; margin:0 0 4px 0;'>{icon}</p>
-                <p style='color:{color}; font-size:1rem; font-weight:800;
-                          font-family:Syne,sans-serif; margin:0;'>{val}</p>
-                <p style='color:{subtext}; font-size:0.65rem; text-transform:uppercase;
-                          letter-spacing:1px; margin:3px 0 0 0;'>{label}</p>
-            </div>
-            """, unsafe_allow_html=True)
\ No newline at end of file
+            st.markdown(render('stat.summary', theme, lang, icon=icon, label=label, value=val, color=color),
+                        unsafe_allow_html=True)
+
+    section.done()
\ No newline at end of file
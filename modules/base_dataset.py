@@ -0,0 +1,276 @@
+import os
+import glob
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+from modules.cache import LRUCache
+from modules.aggregates import put_cube
+from modules.cube_ledger import build_ledger, refresh_ledger, ledger_columns, changed_partitions
+from modules.dataset import prepare_dataset, build_company_index, dataset_fingerprint
+from modules.query import query_campaigns, row_filter, BASE_PATH
+from modules.store import store_version, partition_files, reading, STORE_DIR
+
+# ==============================
+# Shared Memory-mapped Base Dataset
+# ==============================
+# The prepared base dataset (base file + stored uploads) is written once as
+# an uncompressed Arrow IPC file and memory-mapped, so every session of the
+# process reads the same pages of the OS page cache. Page frames are
+# zero-copy, read-only pandas views of that table, and the same view object
+# is handed to every session asking for the same columns / client.
+#
+# A date range or channel is applied to the mapped table with the same
+# filter expressions query_campaigns() pushes down to Parquet; those views
+# hold their matching rows only.
+#
+# Each dataset also carries the cube ledger (modules/cube_ledger.py): views
+# holding the cube columns are handed their cube from it. When only the
+# store changed, the new file is the previous rows with the changed store
+# partitions spliced in, and the ledger only refreshes those partitions;
+# the base file is not queried or prepared again.
+ARROW_DIR = os.environ.get('ARROW_CACHE_DIR', 'data/.arrow')
+
+_VIEWS = LRUCache(maxsize=16)
+_lock  = threading.Lock()
+_current = None
+
+
+class SharedDataset:
+
+    out_of_core = False
+
+    def __init__(self, table, token, path, files=None):
+        meta = table.schema.metadata or {}
+        self.table         = table
+        self.token         = token
+        self.path          = path
+        self.files         = files or {}
+        self.fingerprint   = meta.get(b'fingerprint', b'').decode()
+        self.memory_before = int(meta.get(b'memory_before', b'0'))
+        self.ledger        = None
+        self._ledger_lock  = threading.Lock()
+
+        companies = self._to_pandas(table.select(['Company']))
+        companies.attrs['sorted_by'] = 'Company'
+        self.index = build_company_index(companies)
+
+    @property
+    def clients(self):
+        return self.index.clients
+
+    @property
+    def num_rows(self):
+        return self.table.num_rows
+
+    def cube(self, company=None):
+        if self.ledger is None:
+            with self._ledger_lock:
+                if self.ledger is None:
+                    self.ledger = build_ledger(self)
+        return self.ledger.cube(company) if self.ledger is not None else None
+
+    # split_blocks keeps every column its own block, so nothing is consolidated
+    # (copied); numeric, datetime and dictionary columns stay on the mapped pages
+    @staticmethod
+    def _to_pandas(table):
+        return table.to_pandas(split_blocks=True)
+
+    def view(self, columns=None, company=None, date_range=None, channel=None):
+        key = (self.token, None if columns is None else tuple(columns), company, date_range, channel)
+        return _VIEWS.get_or_build(key, lambda: self._build_view(columns, company, date_range, channel))
+
+    def _build_view(self, columns, company, date_range=None, channel=None):
+        table = self.table
+        names = table.column_names
+        if company is not None:
+            start, stop = self.index.offsets.get(company, (0, 0))
+            table = table.slice(start, stop - start)
+        selected = None if columns is None else [c for c in dict.fromkeys(columns) if c in names]
+        filtered = date_range is not None or channel is not None
+        missing  = (date_range is not None and 'Date' not in names) or \
+                   (channel is not None and 'Channel_Used' not in names)
+        if filtered:
+            if missing:
+                # nothing can match a filter on a column the data lacks
+                table = table.slice(0, 0)
+            else:
+                table = ds.dataset(table).to_table(columns=selected, filter=row_filter(None, date_range, channel))
+        if selected is not None:
+            table = table.select(selected)
+
+        df = self._to_pandas(table)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr((self.fingerprint, list(df.columns), company, date_range, channel)).encode())
+        df.attrs['fingerprint']       = h.hexdigest()
+        df.attrs['fingerprint_shape'] = df.shape
+        df.attrs['sorted_by']         = 'Company'
+        df.attrs['memory_mapped']     = not filtered
+
+        # the cube of a view comes from the ledger, never from its rows
+        needed = ledger_columns(self.table)
+        if not filtered and needed is not None and all(c in df.columns for c in needed):
+            put_cube(df, self.cube(company))
+        return df
+
+
+def source_token():
+    stat = os.stat(BASE_PATH)
+    return (os.path.abspath(BASE_PATH), os.path.abspath(STORE_DIR),
+            stat.st_mtime_ns, stat.st_size, store_version())
+
+
+# ── Frames as uncompressed Arrow IPC files, read back memory-mapped ──
+def write_frame(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[b'fingerprint']   = dataset_fingerprint(df).encode()
+    meta[b'memory_before'] = str(df.attrs.get('memory_before', 0)).encode()
+    meta[b'sorted_by']     = str(df.attrs.get('sorted_by', '')).encode()
+    table = table.replace_schema_metadata(meta)
+
+    # dot-prefixed while it is written, renamed once complete
+    folder, name = os.path.split(path)
+    tmp = os.path.join(folder, f".{name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    with ipc.new_file(tmp, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def map_table(path):
+    return ipc.open_file(pa.memory_map(path)).read_all()
+
+
+def read_frame(path):
+    table = map_table(path)
+    meta  = table.schema.metadata or {}
+    df = SharedDataset._to_pandas(table)
+    df.attrs['fingerprint']       = meta.get(b'fingerprint', b'').decode()
+    df.attrs['fingerprint_shape'] = df.shape
+    df.attrs['memory_before']     = int(meta.get(b'memory_before', b'0'))
+    if meta.get(b'sorted_by'):
+        df.attrs['sorted_by'] = meta[b'sorted_by'].decode()
+    df.attrs['memory_mapped'] = True
+    return df
+
+
+# ==============================
+# Splicing Uploads In
+# ==============================
+# Stored uploads replace base rows by Campaign_ID, so the new rows are the
+# previous ones minus every Campaign_ID the changed partition files hold,
+# plus those files' rows: a row moved out of a partition always reappears,
+# with its ID, in one of the changed files. Only those files are read and
+# prepared; the rest is a filter, an append and a stable sort by Company.
+# None means a full rebuild (no Campaign_ID, new columns, mixed types).
+def _append_rows(df, rows):
+    out = {}
+    for name in df.columns:
+        col = df[name]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            new = rows[name] if name in rows.columns else pd.Series(None, index=rows.index, dtype=object)
+            if not isinstance(new.dtype, pd.CategoricalDtype):
+                new = new.astype(object).astype('category')
+            out[name] = pd.Series(union_categoricals([col, new], sort_categories=True))
+        else:
+            new = rows[name] if name in rows.columns else pd.Series(np.nan, index=rows.index)
+            if isinstance(new.dtype, pd.CategoricalDtype):
+                new = new.astype(new.cat.categories.dtype)
+            out[name] = pd.concat([col, new], ignore_index=True)
+    return pd.DataFrame(out)
+
+
+def _splice(previous, files):
+    changed = changed_partitions(previous.files, files)
+    paths = [path for path, (key, *_) in files.items() if key in changed]
+    if not paths or 'Campaign_ID' not in previous.table.column_names:
+        return None
+
+    with reading():
+        parts = []
+        for path in paths:
+            if not os.path.exists(path):
+                return None
+            part = pq.read_table(path).to_pandas()
+            part['Company'] = files[path][0][0]
+            parts.append(part)
+    fresh = pd.concat(parts, ignore_index=True)
+    if 'Campaign_ID' not in fresh.columns or fresh['Campaign_ID'].isna().any():
+        return None
+    fresh = prepare_dataset(fresh)
+    if not set(fresh.columns) <= set(previous.table.column_names):
+        return None
+
+    df = previous._to_pandas(previous.table)
+    kept = df[~df['Campaign_ID'].isin(fresh['Campaign_ID'].to_numpy())]
+    try:
+        df = _append_rows(kept, fresh)
+    except TypeError:
+        # categories of different types (e.g. numbers vs strings)
+        return None
+    df = df.sort_values('Company', kind='stable', ignore_index=True)
+    df.attrs['sorted_by'] = 'Company'
+    # the pre-compaction size, scaled to the new row count
+    df.attrs['memory_before'] = previous.memory_before * len(df) // max(previous.num_rows, 1)
+    return df
+
+
+def _remove_stale(keep):
+    # mapped files can be unlinked safely; readers keep their mapping
+    for path in glob.glob(os.path.join(ARROW_DIR, 'base-*.arrow')):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# ── The process-wide dataset, rebuilt when the base file or store changes ──
+def get_base_dataset():
+    global _current
+    token = source_token()
+    if _current is not None and _current.token == token:
+        return _current
+
+    with _lock:
+        if _current is not None and _current.token == token:
+            return _current
+
+        os.makedirs(ARROW_DIR, exist_ok=True)
+        previous = _current
+        while True:
+            # the store files the dataset is built from, for the ledger,
+            # taken before the token so a later upload changes the token too
+            files = partition_files()
+            token = source_token()
+            name = hashlib.blake2b(repr(token).encode(), digest_size=8).hexdigest()
+            path = os.path.join(ARROW_DIR, f"base-{name}.arrow")
+            # only the store changed: splice the changed partitions into the previous rows
+            store_only = previous is not None and previous.token[:4] == token[:4]
+            if os.path.exists(path):
+                break
+            df = _splice(previous, files) if store_only else None
+            df = df if df is not None else prepare_dataset(query_campaigns())
+            # an upload landed while the rows were read: the snapshot no longer
+            # matches them, so read again under the new token
+            if partition_files() == files:
+                write_frame(df, path)
+                break
+
+        table = map_table(path)
+        _current = SharedDataset(table, token, path, files)
+        # ... and carry the ledger over, refreshing what the upload touched
+        if store_only and previous.ledger is not None:
+            _current.ledger = refresh_ledger(previous.ledger, previous, _current)
+        _VIEWS.clear()
+        _remove_stale(path)
+        return _current
+
+
+def base_view(columns=None, company=None):
+    return get_base_dataset().view(columns, company)
@@ -0,0 +1,105 @@
+import os
+import re
+import sys
+import time
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from modules.base_dataset import get_base_dataset, map_table, SharedDataset
+from modules.pdf_report import render_pdf
+from modules.query import CUBE_COLUMNS
+
+# ==============================
+# Batch Report Generator (headless)
+# ==============================
+# Renders the client PDF for every Company without Streamlit:
+#
+#   python -m modules.batch_reports --out reports/batch/2024-06
+#   python -m modules.batch_reports --out reports/batch/all.zip --lang ar --workers 4
+#
+# The dataset is partitioned by Company once (the shared Arrow file is
+# sorted by Company, so a client is a row range); each worker maps the same
+# file and renders the clients it is handed.
+_table = None
+
+
+def _init_worker(path):
+    global _table
+    _table = map_table(path)
+
+
+def _render(client, start, stop, lang):
+    started = time.perf_counter()
+    # Date gives the cube its per-month partials, for the ROI forecast
+    table = _table.select([c for c in CUBE_COLUMNS + ['Date'] if c in _table.column_names])
+    client_df = SharedDataset._to_pandas(table.slice(start, stop - start))
+    pdf = render_pdf(client_df, client, lang)
+    return client, pdf, time.perf_counter() - started
+
+
+def report_filename(client):
+    safe = re.sub(r'[^\w\- .]', '_', str(client)).strip() or 'client'
+    return f"{safe}_AI-Marketing-Predictor_Report.pdf"
+
+
+def _writer(out):
+    if out.lower().endswith('.zip'):
+        folder = os.path.dirname(out)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        archive = zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_DEFLATED)
+        return archive.writestr, archive.close
+
+    os.makedirs(out, exist_ok=True)
+
+    def write(name, data):
+        with open(os.path.join(out, name), 'wb') as f:
+            f.write(data)
+    return write, lambda: None
+
+
+def generate_all(out, lang="en", workers=None, clients=None, log=print):
+    dataset = get_base_dataset()
+    wanted  = dataset.clients if not clients else [c for c in dataset.clients if c in clients]
+    jobs    = [(c, *dataset.index.offsets[c]) for c in wanted]
+    for name in sorted(set(clients or []) - set(wanted)):
+        log(f"  skipped {name!r}: no such client")
+
+    write, close = _writer(out)
+    timings = {}
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(dataset.path,)) as pool:
+            futures = [pool.submit(_render, c, start, stop, lang) for c, start, stop in jobs]
+            for future in as_completed(futures):
+                client, pdf, seconds = future.result()
+                write(report_filename(client), pdf)
+                timings[client] = seconds
+                log(f"  {client:<30} {seconds * 1000:8.1f} ms  {len(pdf) / 1024:7.1f} KB")
+    finally:
+        close()
+
+    elapsed = time.perf_counter() - started
+    rate = len(timings) / elapsed if elapsed else 0.0
+    log(f"{len(timings)} reports in {elapsed:.2f} s — {rate:.1f} reports/sec → {out}")
+    return timings, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m modules.batch_reports',
+        description='Render the PDF report of every client.',
+    )
+    parser.add_argument('--out', default='reports/batch', help='output directory, or a .zip file')
+    parser.add_argument('--lang', default='en', choices=['en', 'ar'])
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--client', action='append', dest='clients', help='only this client (repeatable)')
+    args = parser.parse_args(argv)
+
+    timings, _ = generate_all(args.out, args.lang, args.workers, args.clients)
+    return 0 if timings else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+
+
+# ==============================
+# Thread-safe LRU cache
+# ==============================
+# Streamlit runs every session in its own thread, so anything cached at
+# process level is guarded by a lock. Optionally bounded by total size too:
+# pass maxbytes and a sizeof(value) function. on_evict(key, value) is called
+# for every entry pushed out, after the lock is released, so a slow one (e.g.
+# writing a spill file) holds up no other lookup. Until it returns, get()
+# still finds the entry: whatever it saves exists by the time a get() misses.
+class LRUCache:
+
+    def __init__(self, maxsize=8, maxbytes=None, sizeof=None, on_evict=None):
+        self.maxsize  = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof   = sizeof
+        self.on_evict = on_evict
+        self.nbytes   = 0
+        self._data    = OrderedDict()
+        self._sizes   = {}
+        self._evicted = {}
+        self._lock    = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                # pushed out, but on_evict has not returned yet
+                return self._evicted.get(key, default)
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        size = self.sizeof(value) if self.sizeof else 0
+        evicted = []
+        with self._lock:
+            self.nbytes -= self._sizes.pop(key, 0)
+            self._data[key]  = value
+            self._sizes[key] = size
+            self.nbytes += size
+            self._data.move_to_end(key)
+            # the newest entry always stays, even if it alone is over budget
+            while len(self._data) > 1 and (
+                len(self._data) > self.maxsize
+                or (self.maxbytes is not None and self.nbytes > self.maxbytes)
+            ):
+                old, old_value = self._data.popitem(last=False)
+                self.nbytes -= self._sizes.pop(old, 0)
+                if self.on_evict is not None:
+                    self._evicted[old] = old_value
+                    evicted.append((old, old_value))
+
+        try:
+            for old, old_value in evicted:
+                self.on_evict(old, old_value)
+        finally:
+            with self._lock:
+                for old, old_value in evicted:
+                    if self._evicted.get(old) is old_value:
+                        del self._evicted[old]
+        return value
+
+    def get_or_build(self, key, build):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, build())
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            self.nbytes -= self._sizes.pop(key, 0)
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
@@ -0,0 +1,159 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from modules.aggregates import AggregateCube, CUBE_DIMS, SUM_METRICS, MEAN_METRICS, build_cells, merge_cells
+from modules.store import reading
+
+# ==============================
+# Incremental Aggregate Maintenance
+# ==============================
+# The cube behind Overview, Client View, AI Insights and the PDF report is
+# kept as partial cells per partition (Company, YearMonth) — the same
+# partitions the upload store is laid out in. Partials hold sums and counts
+# only, so they merge by addition: the totals are a merge of the partials,
+# never a scan of the rows.
+#
+# When uploads land in the store, the partitions whose files changed, plus
+# the partitions of any rows they replace by Campaign_ID, are reduced again
+# from the new base dataset; their old partials are retracted and the new
+# ones folded in. Everything else is reused, so a refresh costs the touched
+# clients' rows, not the dataset.
+PARTITION_DIM = 'YearMonth'
+
+
+class CubeLedger:
+
+    def __init__(self, fingerprint, partials, dims, metrics, files):
+        self.fingerprint = fingerprint
+        self.partials    = partials
+        self.dims        = dims
+        self.metrics     = metrics
+        self.files       = files
+        self.total       = AggregateCube(merge_cells([partials], dims, metrics), dims, metrics, partials)
+        self._clients    = {}
+
+    @property
+    def rows(self):
+        return int(self.partials['rows'].sum())
+
+    def cube(self, company=None):
+        if company is None:
+            return self.total
+        cube = self._clients.get(company)
+        if cube is None:
+            cells = self.total.cells
+            cells = cells[cells['Company'] == company].reset_index(drop=True)
+            partials = self.partials[self.partials['Company'] == company].reset_index(drop=True)
+            cube = self._clients[company] = AggregateCube(cells, self.dims, self.metrics, partials)
+        return cube
+
+
+# YYYYMM as an int (the store's 'YYYY-MM' / 'unknown' → -1)
+def _year_month(dates):
+    dates = pd.to_datetime(dates)
+    return (dates.dt.year * 100 + dates.dt.month).fillna(-1).astype(np.int64).to_numpy()
+
+
+def _partition_key(year_month):
+    return -1 if year_month == 'unknown' else int(year_month.replace('-', ''))
+
+
+def _layout(table):
+    names   = table.column_names
+    dims    = [d for d in CUBE_DIMS if d in names]
+    metrics = [m for m in SUM_METRICS + MEAN_METRICS if m in names]
+    return dims, metrics
+
+
+# columns a view needs for its cube to be the ledger's (None: no ledger)
+def ledger_columns(table):
+    if 'Date' not in table.column_names or 'Company' not in table.column_names:
+        return None
+    dims, metrics = _layout(table)
+    return dims + metrics
+
+
+def partition_cells(df, dims, metrics):
+    frame = pd.DataFrame({c: df[c] for c in dims + metrics})
+    frame[PARTITION_DIM] = _year_month(df['Date'])
+    return build_cells(frame, dims + [PARTITION_DIM], metrics)
+
+
+# ── Full build: one pass over the rows, same cost as a plain cube ──
+def build_ledger(dataset):
+    table = dataset.table
+    if ledger_columns(table) is None:
+        return None
+    dims, metrics = _layout(table)
+    df = dataset._to_pandas(table.select(dims + metrics + ['Date']))
+    return CubeLedger(dataset.fingerprint, partition_cells(df, dims, metrics),
+                      dims, metrics, dataset.files)
+
+
+# ── Partitions touched between two snapshots of the store ──
+def changed_partitions(before, after):
+    changed = {key for path, (key, *stamp) in after.items() if before.get(path) != (key, *stamp)}
+    changed |= {key for path, (key, *_) in before.items() if path not in after}
+    return changed
+
+
+# ── Partitions of the old rows that the changed files replace by Campaign_ID.
+#    None when a file is gone or was rewritten since the snapshot ──
+def _replaced_partitions(old, files, paths):
+    if 'Campaign_ID' not in old.table.column_names:
+        return set()
+    ids = []
+    with reading():
+        for path in paths:
+            if not os.path.exists(path):
+                return None
+            stat = os.stat(path)
+            if (stat.st_mtime_ns, stat.st_size) != tuple(files[path][1:]):
+                return None
+            ids.append(pq.read_table(path, columns=['Campaign_ID']).column(0))
+    ids = [chunk for chunk in ids if chunk.num_chunks]
+    if not ids:
+        return set()
+    column = old.table.column('Campaign_ID')
+    values = pa.chunked_array(ids).combine_chunks().cast(column.type, safe=False)
+    hit = pc.is_in(column, value_set=values)
+    replaced = old._to_pandas(old.table.filter(hit).select(['Company', 'Date']))
+    return set(zip(replaced['Company'].astype(object), _year_month(replaced['Date']).tolist()))
+
+
+def refresh_ledger(ledger, old, new):
+    files = new.files
+    changed = changed_partitions(ledger.files, files)
+    if not changed:
+        return CubeLedger(new.fingerprint, ledger.partials, ledger.dims, ledger.metrics, files)
+
+    affected = {(company, _partition_key(ym)) for company, ym in changed}
+    replaced = _replaced_partitions(old, files, [p for p, (key, *_) in files.items() if key in changed])
+    if replaced is None:
+        return build_ledger(new)
+    affected |= replaced
+
+    # reduce only the affected partitions again, from the new rows
+    fresh = []
+    columns = ledger.dims + ledger.metrics + ['Date']
+    for company in {c for c, _ in affected}:
+        start, stop = new.index.offsets.get(company, (0, 0))
+        if stop <= start:
+            continue
+        rows = new._to_pandas(new.table.select(columns).slice(start, stop - start))
+        months = [ym for c, ym in affected if c == company]
+        rows = rows[np.isin(_year_month(rows['Date']), months)]
+        fresh.append(partition_cells(rows, ledger.dims, ledger.metrics))
+
+    partials = ledger.partials
+    stale = pd.MultiIndex.from_arrays([partials['Company'], partials[PARTITION_DIM]]).isin(list(affected))
+    partials = pd.concat([partials[~stale]] + fresh, ignore_index=True)
+
+    refreshed = CubeLedger(new.fingerprint, partials, ledger.dims, ledger.metrics, files)
+    # anything not accounted for (e.g. rows without a Company) → full rebuild
+    if refreshed.rows != new.num_rows:
+        return build_ledger(new)
+    return refreshed
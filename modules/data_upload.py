@@ -1,59 +1,22 @@
 import streamlit as st
-import pandas as pd
 from modules.translator import get_text
+from modules.dataset import get_memory_report
+from modules.ingest import (load_upload, content_hash, MissingColumnsError, MemoryLimitError,
+                            ColumnTypeError, AmbiguousDatesError)
+from modules.store import append_upload, store_partitions, MissingCompanyError
+from modules.session_store import DatasetHandle
+from modules.theme import render
 
 def show_data_upload(lang="en", theme="dark"):
     t = lambda key: get_text(key, lang)
 
-    accent  = "#E91E8C" if theme == "dark" else "#C2185B"
-    accent2 = "#FF6B35" if theme == "dark" else "#E64A19"
-    accent3 = "#9C27B0" if theme == "dark" else "#7B1FA2"
-    subtext = "#9988BB" if theme == "dark" else "#6A4080"
-    border  = "rgba(233,30,140,0.2)"  if theme == "dark" else "rgba(194,24,91,0.2)"
-    card_bg = "rgba(233,30,140,0.06)" if theme == "dark" else "rgba(194,24,91,0.05)"
-    text_color = "#FFFFFF" if theme == "dark" else "#1A0A2E"
-
-    # ── Mobile CSS ──
-    st.markdown("""
-    <style>
-    @media screen and (max-width: 768px) {
-        [data-testid="stFileUploader"] {
-            padding: 16px 12px !important;
-        }
-        [data-testid="stFileUploader"] > div {
-            font-size: 0.82rem !important;
-        }
-    }
-    </style>
-    """, unsafe_allow_html=True)
 
     # ── Page Banner ──
-    st.markdown(f"""
-    <div style='background:linear-gradient(135deg, rgba(233,30,140,0.08), rgba(156,39,176,0.06));
-                border:1px solid {border};
-                border-radius:16px; padding:22px 28px; margin-bottom:24px;
-                backdrop-filter:blur(12px);'>
-        <h1 style='font-family:Syne,sans-serif; font-size:1.8rem; font-weight:800;
-                   background:linear-gradient(135deg, {accent2}, {accent}, {accent3});
-                   -webkit-background-clip:text; -webkit-text-fill-color:transparent;
-                   background-clip:text; margin:0;'>
-            📁 {t('upload_data')}
-        </h1>
-        <p style='color:{accent}; font-size:0.78rem; letter-spacing:2px;
-                  text-transform:uppercase; margin:4px 0 0 0;'>
-            Import New Client Data
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(render('banner', theme, lang, icon="📁", title=t('upload_data'),
+                       subtitle="Import New Client Data"), unsafe_allow_html=True)
 
-    st.markdown(f"""
-    <div style='background:{card_bg}; border:1px solid {border};
-                border-radius:12px; padding:14px 18px; margin-bottom:20px;'>
-        <p style='color:{subtext}; font-size:0.82rem; margin:0;'>
-            📌 ارفع ملف CSV لعميل جديد وهيظهر في الداشبورد فوراً
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(render('note', theme, lang, text="📌 ارفع ملف CSV لعميل جديد وهيظهر في الداشبورد فوراً"),
+                unsafe_allow_html=True)
 
     uploaded_file = st.file_uploader(
         t("upload_csv"),
@@ -62,36 +25,56 @@ def show_data_upload(lang="en", theme="dark"):
 
     if uploaded_file:
         try:
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_parquet(uploaded_file)
+            # hash each uploaded file once per session; the parsed frame is
+            # then shared by every session that uploads the same bytes
+            hashes  = st.session_state.setdefault('upload_hashes', {})
+            file_id = getattr(uploaded_file, 'file_id', uploaded_file.name)
+            if file_id not in hashes:
+                hashes[file_id] = content_hash(uploaded_file.getvalue())
+
+            bar = st.progress(0.0, text="Reading file...")
+            df = load_upload(
+                uploaded_file, uploaded_file.name, hashes[file_id],
+                size=uploaded_file.size,
+                progress=lambda done, rows: bar.progress(done, text=f"Reading file... {rows:,} rows"),
+            )
+            bar.empty()
+
+            st.markdown(render('upload.loaded', theme, lang, rows=df.shape[0]), unsafe_allow_html=True)
 
-            required_cols = ['Clicks', 'Impressions', 'ROI',
-                             'Channel_Used', 'Campaign_Goal', 'Company']
-            missing = [c for c in required_cols if c not in df.columns]
+            st.dataframe(df.head(), use_container_width=True)
 
-            if missing:
-                st.error(f"❌ أعمدة ناقصة: {missing}")
-            else:
-                if 'CTR' not in df.columns:
-                    df['CTR'] = (df['Clicks'] / df['Impressions'] * 100).round(2)
-                if 'Date' in df.columns:
-                    df['Date'] = pd.to_datetime(df['Date'])
-                    df['Month'] = df['Date'].dt.month
+            mem = get_memory_report(df)
+            with st.expander(f"🧠 {t('memory_usage')} — {mem['MB'].sum():,.1f} MB"):
+                st.dataframe(mem, hide_index=True, use_container_width=True)
 
-                st.markdown(f"""
-                <div style='background:rgba(233,30,140,0.08); border:1px solid {border};
-                            border-radius:10px; padding:12px 16px; margin-bottom:12px;'>
-                    <p style='color:{accent}; font-size:0.88rem; font-weight:700; margin:0;'>
-                        ✅ الملف اتحمل! &nbsp; <span style='color:{subtext}'>{df.shape[0]:,} صف</span>
-                    </p>
-                </div>
-                """, unsafe_allow_html=True)
+            # only a handle: the frame itself may be spilled to disk
+            st.session_state['uploaded_dataset'] = DatasetHandle(
+                hashes[file_id], uploaded_file.name, len(df)
+            )
 
-                st.dataframe(df.head(), use_container_width=True)
-                st.session_state['uploaded_df']   = df
-                st.session_state['uploaded_name'] = uploaded_file.name
+            # ── Persist into the partitioned dataset, once per uploaded file:
+            #    the uploader keeps the file across reruns, and appending it
+            #    again after another upload would make its rows the newest.
+            #    The stored-rows captions are counted then, not on every rerun ──
+            stored   = st.session_state.setdefault('stored_uploads', set())
+            captions = st.session_state.setdefault('stored_captions', {})
+            if file_id not in stored:
+                added = append_upload(df, key=hashes[file_id])
+                stored.add(file_id)
+                captions[file_id] = []
+                for company in df['Company'].dropna().unique().tolist():
+                    parts = store_partitions(company)
+                    captions[file_id].append(
+                        f"💾 {company}: {sum(p[2] for p in parts):,} stored rows across "
+                        f"{len(parts)} months" + (f" (+{added:,} from this file)" if added else "")
+                    )
+            for caption in captions.get(file_id, []):
+                st.caption(caption)
 
+        except MissingColumnsError as e:
+            st.error(f"❌ أعمدة ناقصة: {e.missing}")
+        except (MemoryLimitError, ColumnTypeError, AmbiguousDatesError, MissingCompanyError) as e:
+            st.error(f"❌ {e}")
         except Exception as e:
             st.error(f"❌ Error: {e}")
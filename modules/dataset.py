@@ -0,0 +1,166 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+from modules.cache import LRUCache
+
+_INDEXES = LRUCache(maxsize=8)
+_REPORTS = LRUCache(maxsize=32)
+
+# Compact schema: dictionary-encoded strings, downcast numerics.
+# Set COMPACT_SCHEMA=0 to keep the raw pandas dtypes.
+COMPACT_SCHEMA = os.environ.get('COMPACT_SCHEMA', '1') != '0'
+
+# Strings with more distinct values than this share of rows stay as strings
+CATEGORY_MAX_RATIO = 0.5
+
+
+# ==============================
+# Dataset Fingerprint
+# ==============================
+# Content hash of a frame, used as the cache key for everything derived from
+# it (aggregates, indexes, reports). It is computed once and kept in
+# df.attrs; the shape check stops a filtered slice, which inherits its
+# parent's attrs, from reusing the parent's fingerprint.
+def dataset_fingerprint(df):
+    cached = df.attrs.get('fingerprint')
+    if cached and df.attrs.get('fingerprint_shape') == df.shape:
+        return cached
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(list(df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    fingerprint = h.hexdigest()
+
+    df.attrs['fingerprint']       = fingerprint
+    df.attrs['fingerprint_shape'] = df.shape
+    return fingerprint
+
+
+# ==============================
+# Prepare a loaded / uploaded frame
+# ==============================
+def prepare_dataset(df, compact=None):
+    if compact is None:
+        compact = COMPACT_SCHEMA
+    if compact:
+        df = compact_dataset(df)
+    _sort_categories(df)
+
+    if 'CTR' not in df.columns and 'Clicks' in df.columns and 'Impressions' in df.columns:
+        df['CTR'] = (df['Clicks'] / df['Impressions'] * 100).round(2)
+        if compact:
+            # the derived CTR is a 2-decimal percentage, well inside float32
+            # precision; a CTR read from the file keeps compact_dataset's type
+            df['CTR'] = df['CTR'].astype(np.float32)
+    if 'Month' not in df.columns and 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date'])
+        df['Month'] = df['Date'].dt.month
+        if compact:
+            df['Month'] = df['Month'].astype(np.int8)
+    if 'Company' in df.columns:
+        df = df.sort_values('Company', kind='stable', ignore_index=True)
+        df.attrs['sorted_by'] = 'Company'
+    df.attrs.pop('fingerprint', None)
+    dataset_fingerprint(df)
+    return df
+
+
+# ==============================
+# Compact Columnar Layout
+# ==============================
+# Low-cardinality strings become categoricals, integers shrink to the
+# narrowest type that holds their range, and floats go to float32 only when
+# that round-trips every value exactly.
+def compact_dataset(df):
+    before = int(df.memory_usage(index=True, deep=True).sum())
+    out = {}
+    for name in df.columns:
+        col = df[name]
+        if pd.api.types.is_object_dtype(col.dtype) or pd.api.types.is_string_dtype(col.dtype):
+            if col.nunique(dropna=True) <= max(1, len(col) * CATEGORY_MAX_RATIO):
+                col = col.astype('category')
+        elif pd.api.types.is_bool_dtype(col.dtype):
+            pass
+        elif pd.api.types.is_integer_dtype(col.dtype):
+            col = pd.to_numeric(col, downcast='integer')
+        elif pd.api.types.is_float_dtype(col.dtype) and col.dtype != np.float32:
+            narrow = col.astype(np.float32)
+            if np.array_equal(narrow.to_numpy(dtype=np.float64), col.to_numpy(), equal_nan=True):
+                col = narrow
+        out[name] = col
+
+    compact = pd.DataFrame(out, index=df.index)
+    compact.attrs.update(df.attrs)
+    compact.attrs['memory_before'] = before
+    return compact
+
+
+# Categoricals coming from Arrow keep first-seen order; sort them so codes,
+# selectors and chart axes follow the same order as plain strings.
+def _sort_categories(df):
+    for name in df.columns:
+        col = df[name]
+        if isinstance(col.dtype, pd.CategoricalDtype) and not col.cat.ordered:
+            categories = col.cat.categories
+            if not categories.is_monotonic_increasing:
+                df[name] = col.cat.reorder_categories(categories.sort_values())
+
+
+def memory_report(df):
+    usage = df.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'Column': usage.index,
+        'Dtype':  [str(df[c].dtype) for c in usage.index],
+        'MB':     (usage.to_numpy() / 1024 ** 2).round(2),
+    })
+    return report.sort_values('MB', ascending=False, ignore_index=True)
+
+
+# ── The deep memory scan runs once per dataset, not once per rerun ──
+def get_memory_report(df):
+    key = dataset_fingerprint(df)
+    return _REPORTS.get_or_build(key, lambda: memory_report(df))
+
+
+# ==============================
+# Company Partition Index
+# ==============================
+# Row offsets of every Company in a frame sorted by Company, plus the sorted
+# client list for the selector. Selecting a client is then df.iloc[start:stop]
+# — a view whose cost depends on that client's rows, not the dataset size.
+# Frames that were not sorted by prepare_dataset() go through a stable
+# argsort instead, and a slice becomes a take() of that client's rows.
+class CompanyIndex:
+
+    def __init__(self, clients, offsets, order=None):
+        self.clients = clients
+        self.offsets = offsets
+        self.order   = order
+
+    def slice(self, df, company):
+        start, stop = self.offsets.get(company, (0, 0))
+        if self.order is None:
+            return df.iloc[start:stop]
+        return df.take(self.order[start:stop])
+
+
+def build_company_index(df):
+    codes, labels = pd.factorize(df['Company'], sort=True)
+    counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+    stops  = np.cumsum(counts)
+    starts = stops - counts
+
+    order = None
+    if df.attrs.get('sorted_by') != 'Company':
+        # missing companies sort last, as sort_values() would put them
+        order = np.argsort(np.where(codes < 0, len(labels), codes), kind='stable')
+
+    clients = pd.Index(labels).tolist()
+    offsets = dict(zip(clients, zip(starts.tolist(), stops.tolist())))
+    return CompanyIndex(clients, offsets, order)
+
+
+def get_company_index(df):
+    key = dataset_fingerprint(df)
+    return _INDEXES.get_or_build(key, lambda: build_company_index(df))
@@ -0,0 +1,124 @@
+import time
+import math
+import streamlit as st
+import pandas as pd
+from modules.translator import get_text
+from modules.dataset import get_company_index, dataset_fingerprint
+from modules.row_index import query_rows, page_rows, column_values, column_range
+from modules.theme import render
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+# multiselect filters: column → label
+CHOICE_FILTERS = {
+    'Channel_Used':     "Platform",
+    'Campaign_Goal':    "Campaign Goal",
+    'Customer_Segment': "Customer Segment",
+}
+
+
+# filters load_rows() pushes down to the data: column → its keyword
+PUSHDOWN_FILTERS = {'Date': 'date_range', 'Channel_Used': 'channel'}
+
+
+def show_explorer(df, lang="en", theme="dark", clients=None, load_rows=None):
+    # df gives the filter choices; with load_rows(date_range=, channel=) the
+    # rows come from it, already filtered by date and channel
+    t = lambda key: get_text(key, lang)
+
+    # ── Page Banner ──
+    st.markdown(render('banner', theme, lang, icon="🔎", title=t('explorer'),
+                       subtitle="Browse, Sort & Filter Every Campaign"), unsafe_allow_html=True)
+
+    # ── Filters ──
+    filters = []
+    col_client, col_date, col_roi = st.columns([2, 2, 2])
+    with col_client:
+        if clients is None:
+            all_clients = t('all_clients')
+            client = st.selectbox(t('select_client'), [all_clients] + get_company_index(df).clients,
+                                  key="explorer_client")
+            if client != all_clients:
+                filters.append(('Company', 'in', (client,)))
+        else:
+            # out of core: df holds the selected client's rows only
+            st.selectbox(t('select_client'), clients, key="explorer_client")
+    with col_date:
+        if 'Date' in df.columns:
+            first, last = column_range(df, 'Date')
+            dates = st.date_input("Date", (first.date(), last.date()),
+                                  min_value=first.date(), max_value=last.date(),
+                                  key="explorer_dates")
+            if len(dates) == 2 and (dates[0] > first.date() or dates[1] < last.date()):
+                filters.append(('Date', 'between', tuple(pd.Timestamp(d) for d in dates)))
+    with col_roi:
+        low, high = (float(v) for v in column_range(df, 'ROI'))
+        if low < high:
+            roi = st.slider("ROI", low, high, (low, high), key="explorer_roi")
+            if roi != (low, high):
+                filters.append(('ROI', 'between', roi))
+
+    cols = st.columns(len(CHOICE_FILTERS))
+    for col, (column, label) in zip(cols, CHOICE_FILTERS.items()):
+        if column not in df.columns:
+            continue
+        with col:
+            picked = st.multiselect(label, column_values(df, column), key=f"explorer_{column}")
+            if picked:
+                filters.append((column, 'in', tuple(picked)))
+
+    # ── Date / channel: pushed down to the loader, the rest on the row index ──
+    rows_df = df
+    if load_rows is not None:
+        pushed = {PUSHDOWN_FILTERS[column]: value for column, _, value in filters
+                  if column in PUSHDOWN_FILTERS}
+        filters = [f for f in filters if f[0] not in PUSHDOWN_FILTERS]
+        rows_df = load_rows(**pushed)
+
+    # ── Sorting & Page Size ──
+    col_sort, col_dir, col_size = st.columns([3, 1, 1])
+    with col_sort:
+        none = "—"
+        sort = st.selectbox(t('sort_by'), [none] + list(rows_df.columns), key="explorer_sort")
+        sort = None if sort == none else sort
+    with col_dir:
+        descending = st.radio("Order", ["↑", "↓"], horizontal=True, key="explorer_dir",
+                              label_visibility="hidden") == "↓"
+    with col_size:
+        page_size = st.selectbox(t('rows_per_page'), PAGE_SIZES, key="explorer_page_size")
+
+    # ── Matching rows: resolved once per filters + sort, then only sliced ──
+    started   = time.perf_counter()
+    positions = query_rows(rows_df, tuple(filters), sort, descending)
+    total     = len(positions)
+    pages     = max(1, math.ceil(total / page_size))
+
+    # a new query starts again from its first page
+    query = (dataset_fingerprint(rows_df), tuple(filters), sort, descending, page_size)
+    if st.session_state.get('explorer_query') != query:
+        st.session_state['explorer_query'] = query
+        st.session_state['explorer_page']  = 1
+    st.session_state['explorer_page'] = min(st.session_state.get('explorer_page', 1), pages)
+
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("◀", use_container_width=True, key="explorer_prev",
+                     disabled=st.session_state['explorer_page'] <= 1):
+            st.session_state['explorer_page'] -= 1
+    with col_next:
+        if st.button("▶", use_container_width=True, key="explorer_next",
+                     disabled=st.session_state['explorer_page'] >= pages):
+            st.session_state['explorer_page'] += 1
+    with col_page:
+        page = st.number_input(t('page'), min_value=1, max_value=pages, key="explorer_page")
+
+    rows = page_rows(rows_df, positions, page - 1, page_size)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if total:
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        first = (page - 1) * page_size + 1
+        st.caption(f"Rows {first:,}–{first + len(rows) - 1:,} of {total:,} "
+                   f"(of {len(df):,} campaigns) · page {page:,} / {pages:,} · {elapsed:,.1f} ms")
+    else:
+        st.info(f"ℹ️ {t('no_rows')}")
@@ -0,0 +1,46 @@
+import plotly.graph_objects as go
+from modules.cache import LRUCache
+from modules.perf import span
+from modules.theme import get_palette
+
+# ==============================
+# Figure Cache
+# ==============================
+# Built charts are kept per (aggregate fingerprint, chart id, theme) and the
+# same Figure object is handed to every rerun and session; nothing mutates
+# it after it is cached. When only the theme differs from a cached variant,
+# that variant is copied and restyled (template, backgrounds, accent
+# colors) instead of rebuilding its traces from the data.
+_FIGURES = LRUCache(maxsize=128)
+
+
+# ── Theme-only patch: template and backgrounds, plus the chart's own
+#    theme colors (patch(fig) for accent-colored lines and markers) ──
+def restyle(fig, theme, patch=None):
+    target = get_palette(theme)
+    fig.update_layout(
+        template=target['template'],
+        plot_bgcolor=target['bg_color'],
+        paper_bgcolor=target['bg_color'],
+    )
+    if patch is not None:
+        patch(fig)
+    return fig
+
+
+def cached_figure(source, chart_id, theme, build, patch=None):
+    key = (source, chart_id)
+    fig = _FIGURES.get((key, theme))
+    if fig is not None:
+        return fig
+
+    other = _FIGURES.get((key, 'light' if theme == 'dark' else 'dark'))
+    if other is not None:
+        # go.Figure(other) briefly mutates other, which other sessions may be
+        # serialising right now; to_dict() only reads it
+        with span('figure.restyle'):
+            fig = restyle(go.Figure(other.to_dict()), theme, patch)
+    else:
+        with span('figure.build'):
+            fig = build()
+    return _FIGURES.put((key, theme), fig)
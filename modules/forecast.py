@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+from modules.cache import LRUCache
+from modules.dataset import dataset_fingerprint
+from modules.aggregates import get_cube
+from modules.cube_ledger import PARTITION_DIM
+from modules.groupby_engine import combine_codes, decode_codes
+
+# ==============================
+# ROI Forecasts (damped-trend exponential smoothing)
+# ==============================
+# Every monthly ROI series — each Company × Channel, each Company, and the
+# whole dataset — is fitted at once: the series are the rows of one matrix
+# and each smoothing step updates all of them, for every candidate
+# (alpha, beta, phi) on the grid, in one NumPy operation. Per series the
+# parameters with the smallest one-step-ahead squared error win. Series run
+# over calendar months (YearMonth, YYYYMM) in time order, from the first
+# month with data to the last; months without data are gaps. They are built
+# from the aggregate cube's per-month partials, and fitted models are cached
+# per dataset fingerprint, so any page or report reads a forecast without
+# refitting.
+#
+#   level_t = level + phi * trend + alpha * error
+#   trend_t = phi * trend + alpha * beta * error
+#   ŷ_{T+h} = level_T + (phi + phi² + … + phi^h) * trend_T
+HORIZON = 3
+
+ALPHAS = np.linspace(0.1, 0.9, 9)
+BETAS  = np.array([0.0, 0.05, 0.1, 0.2, 0.3])
+PHIS   = np.array([0.8, 0.9, 0.98])
+
+_FORECASTS = LRUCache(maxsize=8)
+
+
+# YYYYMM ↔ months since year 0, so consecutive months are consecutive ints
+def _month_index(year_months):
+    year_months = np.asarray(year_months, dtype=np.int64)
+    return (year_months // 100) * 12 + year_months % 100 - 1
+
+
+def _year_month(index):
+    return (index // 12) * 100 + index % 12 + 1
+
+
+def month_label(year_month):
+    return f"{int(year_month) // 100:04d}-{int(year_month) % 100:02d}"
+
+
+class Forecasts:
+
+    def __init__(self, keys, months, actual, level, trend, alpha, beta, phi):
+        self.keys   = keys
+        self.months = months
+        self.actual = actual
+        self.level  = level
+        self.trend  = trend
+        self.alpha  = alpha
+        self.beta   = beta
+        self.phi    = phi
+        self._index = {key: i for i, key in enumerate(keys)}
+
+    # company=None / channel=None is the total over that dimension
+    def _row(self, company=None, channel=None):
+        return self._index.get((company, channel))
+
+    def predict(self, company=None, channel=None, horizon=HORIZON):
+        i = self._row(company, channel)
+        if i is None:
+            return None
+        steps = np.cumsum(self.phi[i] ** np.arange(1, horizon + 1))
+        return self.level[i] + steps * self.trend[i]
+
+    def params(self, company=None, channel=None):
+        i = self._row(company, channel)
+        if i is None:
+            return None
+        return {'alpha': self.alpha[i], 'beta': self.beta[i], 'phi': self.phi[i]}
+
+    # ── The fitted series, one row per month in time order ──
+    def history(self, company=None, channel=None):
+        i = self._row(company, channel)
+        if i is None:
+            return None
+        return pd.DataFrame({
+            'YearMonth': [month_label(ym) for ym in self.months],
+            'ROI':       self.actual[i],
+        })
+
+    # ── The calendar months predict() forecasts, as 'YYYY-MM' ──
+    def next_months(self, horizon=HORIZON):
+        if not len(self.months):
+            return []
+        last = _month_index(self.months[-1])
+        return [month_label(_year_month(last + h)) for h in range(1, horizon + 1)]
+
+    # ── Next-month (or horizon-h) forecast of every series, one row each ──
+    def table(self, horizon=1):
+        steps = (self.phi[:, None] ** np.arange(1, horizon + 1)).sum(axis=1)
+        return pd.DataFrame({
+            'Company':  [k[0] for k in self.keys],
+            'Channel':  [k[1] for k in self.keys],
+            'Forecast': self.level + steps * self.trend,
+            'alpha':    self.alpha,
+            'beta':     self.beta,
+            'phi':      self.phi,
+        })
+
+
+# ── Batched fit: Y is (series, months) with NaN for months without data ──
+def fit_damped_trend(Y):
+    S, T = Y.shape
+    alpha, beta, phi = (g.reshape(-1, 1) for g in np.meshgrid(ALPHAS, BETAS, PHIS, indexing='ij'))
+    G = len(alpha)
+
+    observed = ~np.isnan(Y)
+    first    = np.where(observed.any(axis=1), observed.argmax(axis=1), T)
+    start    = Y[np.arange(S), np.minimum(first, T - 1)]
+
+    level = np.broadcast_to(np.nan_to_num(start), (G, S)).copy()
+    trend = np.zeros((G, S))
+    sse   = np.zeros((G, S))
+    for t in range(T):
+        predicted = level + phi * trend
+        # the first observation only starts the level; gaps just roll forward
+        fitted = observed[:, t] & (t > first)
+        error  = np.where(fitted, Y[:, t] - predicted, 0.0)
+        sse   += error ** 2
+        level  = predicted + alpha * error
+        trend  = phi * trend + alpha * beta * error
+
+    best = sse.argmin(axis=0)
+    cols = np.arange(S)
+    # a series without a single observation has nothing to forecast
+    empty = first == T
+    return (np.where(empty, np.nan, level[best, cols]), trend[best, cols],
+            alpha[best, 0], beta[best, 0], phi[best, 0])
+
+
+# ── Monthly mean ROI per series, from ROI sums and counts per YearMonth ──
+def _monthly_roi(cells, dims, months):
+    if dims:
+        combined, labels = combine_codes(cells, dims)
+        series, inverse = np.unique(combined, return_inverse=True)
+        keys = list(zip(*decode_codes(series, labels)))
+    else:
+        inverse = np.zeros(len(cells), dtype=np.int64)
+        keys = [()]
+    month = _month_index(cells[PARTITION_DIM].to_numpy()) - _month_index(months[0])
+
+    sums   = np.zeros((len(keys), len(months)))
+    counts = np.zeros((len(keys), len(months)))
+    np.add.at(sums,   (inverse, month), cells['ROI_sum'].to_numpy(dtype=float))
+    np.add.at(counts, (inverse, month), cells['ROI_n'].to_numpy(dtype=float))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return keys, np.where(counts > 0, sums / counts, np.nan)
+
+
+def build_forecasts(cube):
+    cells = cube.partials
+    # rows without a Date (YearMonth -1) belong to no month
+    if cells is not None:
+        cells = cells[cells[PARTITION_DIM] >= 0]
+    if cells is None or 'ROI' not in cube.metrics or not len(cells):
+        empty = np.array([])
+        return Forecasts([], empty, np.empty((0, 0)), empty, empty, empty, empty, empty)
+    observed = _month_index(cells[PARTITION_DIM].to_numpy())
+    months = _year_month(np.arange(observed.min(), observed.max() + 1))
+
+    levels = [
+        (['Company', 'Channel_Used'], lambda k: (k[0], k[1])),
+        (['Company'],                 lambda k: (k[0], None)),
+        ([],                          lambda k: (None, None)),
+    ]
+    keys, blocks = [], []
+    for dims, as_key in levels:
+        if not all(d in cells.columns for d in dims):
+            continue
+        series, Y = _monthly_roi(cells, dims, months)
+        keys   += [as_key(k) for k in series]
+        blocks.append(Y)
+    actual = np.vstack(blocks)
+
+    level, trend, alpha, beta, phi = fit_damped_trend(actual)
+    return Forecasts(keys, months, actual, level, trend, alpha, beta, phi)
+
+
+def get_forecasts(df, cube=None):
+    key = dataset_fingerprint(df)
+    return _FORECASTS.get_or_build(key, lambda: build_forecasts(cube if cube is not None else get_cube(df)))
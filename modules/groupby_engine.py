@@ -0,0 +1,174 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+# ==============================
+# Multi-metric Group-by Engine
+# ==============================
+# Takes a list of Spec(dim, metric, reducer) and answers all of them with
+# one encoding per dimension and np.bincount kernels per metric, instead of
+# one pandas groupby per question.
+#
+# Works on raw rows and on pre-aggregated frames alike: when a frame has
+# '<metric>_sum' / '<metric>_n' (and 'rows') columns — like the aggregate
+# cube cells — those are used as weights, so means stay exact.
+Spec = namedtuple('Spec', ['dim', 'metric', 'reducer'])
+
+REDUCERS = ('sum', 'mean', 'count', 'max', 'min')
+
+
+class GroupResult:
+
+    def __init__(self, spec, labels, values, counts):
+        self.spec   = spec
+        self.labels = labels
+        self.values = values
+        self.counts = counts
+
+    def _observed(self):
+        return (self.counts > 0) & ~np.isnan(self.values.astype(float))
+
+    @property
+    def argmax(self):
+        mask = self._observed()
+        if not mask.any():
+            return None
+        return int(np.where(mask, self.values, -np.inf).argmax())
+
+    @property
+    def argmin(self):
+        mask = self._observed()
+        if not mask.any():
+            return None
+        return int(np.where(mask, self.values, np.inf).argmin())
+
+    @property
+    def best(self):
+        i = self.argmax
+        return None if i is None else self.labels[i]
+
+    @property
+    def best_value(self):
+        i = self.argmax
+        return np.nan if i is None else self.values[i]
+
+    @property
+    def worst(self):
+        i = self.argmin
+        return None if i is None else self.labels[i]
+
+    @property
+    def worst_value(self):
+        i = self.argmin
+        return np.nan if i is None else self.values[i]
+
+    def to_series(self):
+        mask = self.counts > 0
+        index = pd.Index(self.labels[mask], name=self.spec.dim)
+        return pd.Series(self.values[mask], index=index, name=self.spec.metric)
+
+
+# ── Encoding: categorical codes when available, sorted factorize otherwise ──
+def encode(col):
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy(), np.asarray(col.cat.categories)
+    codes, labels = pd.factorize(col, sort=True)
+    return codes, np.asarray(labels)
+
+
+def metric_weights(df, metric):
+    if f'{metric}_sum' in df.columns:
+        return (df[f'{metric}_sum'].to_numpy(dtype=float),
+                df[f'{metric}_n'].to_numpy(dtype=float))
+    values = df[metric].to_numpy(dtype=float)
+    present = ~np.isnan(values)
+    return np.where(present, values, 0.0), present.astype(float)
+
+
+def is_integer_metric(df, metric):
+    col = df[f'{metric}_sum'] if f'{metric}_sum' in df.columns else df[metric]
+    return pd.api.types.is_integer_dtype(col.dtype)
+
+
+def group_reduce(df, specs):
+    results = []
+    encoded = {}
+    kernels = {}
+
+    for spec in specs:
+        if spec.reducer not in REDUCERS:
+            raise ValueError(f"Unknown reducer: {spec.reducer}")
+
+        if spec.dim not in encoded:
+            codes, labels = encode(df[spec.dim])
+            valid = codes >= 0
+            rows = df['rows'].to_numpy(dtype=float)[valid] if 'rows' in df.columns else None
+            encoded[spec.dim] = (codes[valid], labels, valid, rows)
+        codes, labels, valid, rows = encoded[spec.dim]
+        k = len(labels)
+
+        row_counts = np.bincount(codes, weights=rows, minlength=k)
+
+        if spec.reducer == 'count' and spec.metric is None:
+            results.append(GroupResult(spec, labels, row_counts.astype(np.int64), row_counts))
+            continue
+
+        key = (spec.dim, spec.metric)
+        if key not in kernels:
+            sums, present = metric_weights(df, spec.metric)
+            kernels[key] = (np.bincount(codes, weights=sums[valid], minlength=k),
+                            np.bincount(codes, weights=present[valid], minlength=k))
+        sums, counts = kernels[key]
+
+        if spec.reducer == 'sum':
+            values = sums
+            if is_integer_metric(df, spec.metric):
+                values = np.rint(sums).astype(np.int64)
+        elif spec.reducer == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = np.where(counts > 0, sums / np.where(counts > 0, counts, 1), np.nan)
+        elif spec.reducer == 'count':
+            values = counts.astype(np.int64)
+        else:
+            if f'{spec.metric}_sum' in df.columns:
+                raise ValueError(f"'{spec.reducer}' needs raw rows, not pre-aggregated cells")
+            raw = df[spec.metric].to_numpy(dtype=float)[valid]
+            keep = ~np.isnan(raw)
+            fill = -np.inf if spec.reducer == 'max' else np.inf
+            values = np.full(k, fill)
+            ufunc = np.maximum if spec.reducer == 'max' else np.minimum
+            ufunc.at(values, codes[keep], raw[keep])
+            values[counts == 0] = np.nan
+
+        results.append(GroupResult(spec, labels, values, counts))
+
+    return results
+
+
+# ── Combined code over several dimensions (used to build the cube) ──
+def combine_codes(df, dims):
+    combined = np.zeros(len(df), dtype=np.int64)
+    all_labels = []
+    for dim in dims:
+        codes, labels = encode(df[dim])
+        # NaN keys get their own slot at the end so no rows are dropped
+        codes = np.where(codes < 0, len(labels), codes).astype(np.int64)
+        combined = combined * (len(labels) + 1) + codes
+        all_labels.append(labels)
+    return combined, all_labels
+
+
+def decode_codes(combined, all_labels):
+    columns = []
+    for labels in reversed(all_labels):
+        radix = len(labels) + 1
+        codes = combined % radix
+        combined = combined // radix
+        if (codes < len(labels)).all():
+            columns.append(labels[codes])
+            continue
+        padded = np.empty(radix, dtype=object)
+        padded[:-1] = labels
+        padded[-1] = np.nan
+        columns.append(padded[codes])
+    return list(reversed(columns))
@@ -0,0 +1,254 @@
+import os
+import re
+import hashlib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+from modules.dataset import prepare_dataset
+from modules.session_store import get_dataset, put_dataset
+
+# ==============================
+# Streaming Upload Ingest
+# ==============================
+# Reads an uploaded CSV / Parquet in record batches instead of one
+# pd.read_csv call: the required columns get an explicit schema (CSV) or
+# are cast to it batch by batch (Parquet), CTR and Month are derived batch
+# by batch, progress is reported as batches arrive and the accumulated size
+# is checked against a memory ceiling.
+#
+# The other CSV columns are typed from the first block. When a later block
+# does not fit that guess, the file is read again with those columns as
+# text and each is made numeric afterwards if all its values are, as
+# pd.read_csv would have typed it.
+REQUIRED_COLUMNS = {
+    'Company':       pa.string(),
+    'Channel_Used':  pa.string(),
+    'Campaign_Goal': pa.string(),
+    'Clicks':        pa.int64(),
+    'Impressions':   pa.int64(),
+    'ROI':           pa.float64(),
+}
+DATE_FORMATS = ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S']
+# day/month order is never guessed: see parse_dates()
+SLASH_DATE_FORMATS = ['%m/%d/%Y', '%d/%m/%Y']
+
+CSV_BLOCK_SIZE    = 8 * 1024 ** 2
+PARQUET_BATCH_ROWS = 128_000
+MEMORY_LIMIT_MB   = int(os.environ.get('UPLOAD_MEMORY_LIMIT_MB', '2048'))
+
+
+class MissingColumnsError(ValueError):
+
+    def __init__(self, missing):
+        super().__init__(f"Missing columns: {missing}")
+        self.missing = missing
+
+
+class MemoryLimitError(ValueError):
+    pass
+
+
+class ColumnTypeError(ValueError):
+
+    def __init__(self, column, expected, error):
+        super().__init__(f"Column {column!r} is not {expected}: {error}")
+        self.column = column
+
+
+class AmbiguousDatesError(ValueError):
+    pass
+
+
+# ── Parquet carries its own types: the required columns are cast to the
+#    same schema a CSV is read with ──
+def _cast_required(batch):
+    columns = batch.columns
+    for name, expected in REQUIRED_COLUMNS.items():
+        i = batch.schema.get_field_index(name)
+        if i < 0 or columns[i].type == expected:
+            continue
+        try:
+            columns[i] = pc.cast(columns[i], expected)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ColumnTypeError(name, expected, e) from e
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+
+def _open(file, name, text_columns=()):
+    if name.lower().endswith('.csv'):
+        column_types = {c: pa.string() for c in text_columns}
+        column_types.update(REQUIRED_COLUMNS)
+        reader = pv.open_csv(
+            file,
+            read_options=pv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+            convert_options=pv.ConvertOptions(
+                column_types=column_types,
+                timestamp_parsers=DATE_FORMATS,
+            ),
+        )
+        return reader.schema, iter(reader), None
+
+    parquet = pq.ParquetFile(file)
+    return (parquet.schema_arrow,
+            (_cast_required(b) for b in parquet.iter_batches(batch_size=PARQUET_BATCH_ROWS)),
+            parquet.metadata.num_rows)
+
+
+# ── A required CSV column that does not convert to its type ──
+def _column_error(error, schema):
+    match = re.search(r'CSV column #(\d+)', str(error))
+    if match is None or int(match.group(1)) >= len(schema.names):
+        return error
+    name = schema.names[int(match.group(1))]
+    if name not in REQUIRED_COLUMNS:
+        return error
+    return ColumnTypeError(name, REQUIRED_COLUMNS[name], error)
+
+
+# ── Columns read as text after a failed guess: int64, else float64, else
+#    text, over the whole column; empty cells are missing values ──
+def _type_text(table, names):
+    for name in names:
+        i = table.schema.get_field_index(name)
+        if i < 0:
+            continue
+        text = table.column(i)
+        text = pc.if_else(pc.equal(text, ''), pa.scalar(None, pa.string()), text)
+        for kind in (pa.int64(), pa.float64()):
+            try:
+                table = table.set_column(i, name, pc.cast(text, kind))
+                break
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                continue
+    return table
+
+
+# ── Derived columns, computed on each batch as it arrives ──
+def _derive(batch):
+    table = pa.Table.from_batches([batch])
+    names = table.column_names
+
+    if 'CTR' not in names:
+        clicks = pc.cast(table['Clicks'], pa.float64())
+        ctr = pc.round(pc.multiply(pc.divide(clicks, table['Impressions']), 100.0), 2)
+        table = table.append_column('CTR', ctr)
+
+    if 'Date' in names and pa.types.is_date(table.schema.field('Date').type):
+        table = table.set_column(names.index('Date'), 'Date',
+                                 pc.cast(table['Date'], pa.timestamp('ns')))
+
+    if 'Date' in names and pa.types.is_timestamp(table.schema.field('Date').type):
+        month = pc.cast(pc.month(table['Date']), pa.int8())
+        if 'Month' in names:
+            table = table.set_column(names.index('Month'), 'Month', month)
+        else:
+            table = table.append_column('Month', month)
+    return table
+
+
+def _read_batches(file, batches, size, total_rows, progress, memory_limit_mb):
+    limit  = memory_limit_mb * 1024 ** 2
+    tables = []
+    rows   = 0
+    nbytes = 0
+    for batch in batches:
+        table = _derive(batch)
+        rows   += table.num_rows
+        nbytes += table.nbytes
+        if nbytes > limit:
+            raise MemoryLimitError(
+                f"Upload needs more than {memory_limit_mb:,} MB in memory "
+                f"(read {rows:,} rows so far)"
+            )
+        tables.append(table)
+
+        if progress is not None:
+            if total_rows:
+                done = rows / total_rows
+            elif size and hasattr(file, 'tell'):
+                done = file.tell() / size
+            else:
+                done = 0.0
+            progress(min(done, 1.0), rows)
+    return tables
+
+
+def read_upload(file, name, size=None, progress=None, memory_limit_mb=MEMORY_LIMIT_MB):
+    schema, batches, total_rows = _open(file, name)
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in schema.names]
+    if missing:
+        raise MissingColumnsError(missing)
+
+    text_columns = []
+    try:
+        tables = _read_batches(file, batches, size, total_rows, progress, memory_limit_mb)
+    except pa.ArrowInvalid as e:
+        if not name.lower().endswith('.csv'):
+            raise
+        # a later block did not fit the types guessed from the first one
+        error = _column_error(e, schema)
+        if error is not e:
+            raise error from e
+        text_columns = [c for c in schema.names if c not in REQUIRED_COLUMNS]
+        file.seek(0)
+        schema, batches, _ = _open(file, name, text_columns)
+        try:
+            tables = _read_batches(file, batches, size, total_rows, progress, memory_limit_mb)
+        except pa.ArrowInvalid as e:
+            raise _column_error(e, schema) from e
+
+    if not tables:
+        return schema.empty_table().to_pandas()
+
+    # strings land as categoricals and arrow buffers are released as the
+    # pandas columns are built, so there is only ever one full copy
+    table = pa.concat_tables(tables, promote_options='default')
+    del tables
+    table = _type_text(table, text_columns)
+    return table.to_pandas(strings_to_categorical=True, self_destruct=True)
+
+
+# ── Dates the streaming parser left as text. m/d/Y and d/m/Y are both
+#    tried on every distinct value: a column that reads in full either way,
+#    with different dates, is rejected rather than guessed ──
+def parse_dates(col):
+    col  = col.astype('category')
+    text = pd.Series(col.cat.categories.astype(str))
+    parsed   = [pd.to_datetime(text, format=f, errors='coerce') for f in SLASH_DATE_FORMATS]
+    complete = [dates for dates in parsed if dates.notna().all()]
+    if len(complete) == 2 and not complete[0].equals(complete[1]):
+        sample = text[complete[0] != complete[1]].iloc[0]
+        raise AmbiguousDatesError(
+            f"Dates like {sample!r} read both as month/day and day/month; use YYYY-MM-DD"
+        )
+    dates = complete[0] if complete else pd.to_datetime(text)
+
+    # codes of missing values are -1: the NaT appended last
+    values = np.append(dates.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT', 'ns'))
+    return pd.Series(values[col.cat.codes.to_numpy()], index=col.index)
+
+
+# ==============================
+# Content-hash Upload Cache
+# ==============================
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def load_upload(file, name, key, size=None, progress=None):
+    # parsed uploads are shared by all sessions, in memory or spilled to disk
+    cached = get_dataset(key)
+    if cached is not None:
+        return cached
+
+    df = read_upload(file, name, size=size, progress=progress)
+    # dates in a format the streaming parser did not recognise
+    if 'Date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Date']):
+        df['Date'] = parse_dates(df['Date'])
+        df['Month'] = df['Date'].dt.month
+    df = prepare_dataset(df)
+    return put_dataset(key, df)
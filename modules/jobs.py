@@ -0,0 +1,82 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from modules.cache import LRUCache
+
+# ==============================
+# Background Job Queue
+# ==============================
+# Slow work (PDF reports) runs on a small shared worker pool instead of the
+# script thread, so the page stays interactive. A session keeps only the job
+# id and polls it on later reruns; submitting a key that already has a
+# queued, running or finished job returns that job instead of a new one.
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_HISTORY = int(os.environ.get('JOB_HISTORY', '256'))
+
+# how long a page with an unfinished job waits before checking it again
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', '0.5'))
+
+_pool  = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='job')
+_lock  = threading.Lock()
+_JOBS  = LRUCache(maxsize=JOB_HISTORY)
+_BY_KEY = {}
+
+
+class Job:
+
+    def __init__(self, key, label=None):
+        self.id        = uuid.uuid4().hex
+        self.key       = key
+        self.label     = label
+        self.submitted = time.time()
+        self.started   = None
+        self.finished  = None
+        self.future    = None
+
+    @property
+    def status(self):
+        if self.future.done():
+            return 'failed' if self.future.exception() is not None else 'done'
+        return 'running' if self.started is not None else 'queued'
+
+    @property
+    def error(self):
+        return self.future.exception() if self.future.done() else None
+
+    def result(self):
+        return self.future.result() if self.status == 'done' else None
+
+    @property
+    def seconds(self):
+        end = self.finished or time.time()
+        return end - (self.started or self.submitted)
+
+    def _run(self, fn, args, kwargs):
+        self.started = time.time()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.finished = time.time()
+
+
+def submit_job(key, fn, *args, label=None, **kwargs):
+    with _lock:
+        job = _JOBS.get(_BY_KEY.get(key))
+        # coalesce with a live or finished job; a failed one is retried
+        if job is not None and job.status != 'failed':
+            return job.id
+
+        job = Job(key, label)
+        job.future = _pool.submit(job._run, fn, args, kwargs)
+        _JOBS.put(job.id, job)
+        _BY_KEY[key] = job.id
+        # forget keys whose job fell out of the history
+        for old in [k for k, job_id in _BY_KEY.items() if job_id not in _JOBS]:
+            del _BY_KEY[old]
+        return job.id
+
+
+def get_job(job_id):
+    return _JOBS.get(job_id) if job_id is not None else None
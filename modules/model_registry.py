@@ -0,0 +1,81 @@
+import os
+import pickle
+import threading
+import time
+from modules.perf import timed
+
+# ==============================
+# Model Registry
+# ==============================
+# The Random Forest, its feature list and the label encoders are loaded once
+# per process and shared by every session. Each access only stats the three
+# files; when any of them changes on disk a new bundle is loaded off to the
+# side and swapped in under the lock, so readers never see a half-loaded
+# model.
+MODEL_PATH    = 'models/campaign_model.pkl'
+FEATURES_PATH = 'models/features.pkl'
+ENCODERS_PATH = 'models/encoders.pkl'
+
+_lock   = threading.Lock()
+_bundle = None
+
+
+class ModelBundle:
+
+    def __init__(self, model, features, encoders, mtimes, load_seconds, size_bytes, version):
+        self.model        = model
+        self.features     = features
+        self.encoders     = encoders
+        self.mtimes       = mtimes
+        self.load_seconds = load_seconds
+        self.size_bytes   = size_bytes
+        self.version      = version
+
+
+def _mtimes():
+    return tuple(os.stat(p).st_mtime_ns for p in (MODEL_PATH, FEATURES_PATH, ENCODERS_PATH))
+
+
+# ── Approximate resident size: tree arrays for forests, pickle size otherwise ──
+def _estimate_size(obj):
+    estimators = getattr(obj, 'estimators_', None)
+    if estimators is not None:
+        total = 0
+        for est in estimators:
+            state = est.tree_.__getstate__()
+            total += state['nodes'].nbytes + state['values'].nbytes
+        return total
+    return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+@timed('model.load')
+def _load(mtimes, version):
+    import joblib
+
+    start = time.perf_counter()
+    model = joblib.load(MODEL_PATH)
+    with open(FEATURES_PATH, 'rb') as f:
+        features = pickle.load(f)
+    with open(ENCODERS_PATH, 'rb') as f:
+        encoders = pickle.load(f)
+    elapsed = time.perf_counter() - start
+
+    size = _estimate_size(model) + _estimate_size(features) + _estimate_size(encoders)
+    return ModelBundle(model, features, encoders, mtimes, elapsed, size, version)
+
+
+def get_model_bundle():
+    global _bundle
+    mtimes = _mtimes()
+    bundle = _bundle
+    if bundle is not None and bundle.mtimes == mtimes:
+        return bundle
+
+    with _lock:
+        if _bundle is not None and _bundle.mtimes == _mtimes():
+            return _bundle
+        version = _bundle.version + 1 if _bundle is not None else 1
+        # mtimes are taken before reading, so a write that lands mid-load
+        # is picked up by the next call
+        _bundle = _load(mtimes, version)
+        return _bundle
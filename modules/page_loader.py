@@ -0,0 +1,58 @@
+import sys
+import time
+import threading
+import importlib
+import pandas as pd
+
+# ==============================
+# Lazy Page Loader
+# ==============================
+# Page modules, and the heavy libraries behind them, are imported the first
+# time that page is rendered instead of on every cold start. Each first
+# import is timed, so the cost of a page's dependencies shows up in the
+# import-time breakdown.
+PAGES = {
+    'overview': ('modules.overview',    'show_overview',    ['plotly.express']),
+    'client':   ('modules.client_view', 'show_client_view', ['plotly.express', 'plotly.graph_objects']),
+    'ai':       ('modules.ai_insights', 'show_ai_insights', ['plotly.express', 'plotly.graph_objects']),
+    'upload':   ('modules.data_upload', 'show_data_upload', ['pyarrow.csv']),
+    'explorer': ('modules.explorer',    'show_explorer',    []),
+}
+
+_lock    = threading.Lock()
+_TIMINGS = []
+
+
+# ── First import of a module, timed; later calls are a dict lookup ──
+def timed_import(name, page=None):
+    module = sys.modules.get(name)
+    # a module another session is still importing is already in sys.modules;
+    # import_module waits for it to finish
+    initializing = getattr(getattr(module, '__spec__', None), '_initializing', False)
+    if module is not None and not initializing:
+        return module
+    started = time.perf_counter()
+    module  = importlib.import_module(name)
+    seconds = time.perf_counter() - started
+    if not initializing:
+        with _lock:
+            _TIMINGS.append((page, name, seconds))
+    return module
+
+
+def load_page(page):
+    module, function, dependencies = PAGES[page]
+    for name in dependencies:
+        timed_import(name, page)
+    return getattr(timed_import(module, page), function)
+
+
+# Seconds are inclusive: a page module's time excludes the dependencies
+# imported before it, but includes anything else it pulls in.
+def import_report():
+    with _lock:
+        rows = list(_TIMINGS)
+    report = pd.DataFrame(rows, columns=['Page', 'Module', 'Seconds'])
+    report['Page']    = report['Page'].fillna('-')
+    report['Seconds'] = report['Seconds'].round(3)
+    return report
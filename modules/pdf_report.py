@@ -5,20 +5,58 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER
 import io
+import os
+import threading
 from datetime import datetime
+from modules.aggregates import get_cube
+from modules.cache import LRUCache
+from modules.dataset import dataset_fingerprint
+from modules.groupby_engine import Spec
+from modules.forecast import get_forecasts
+from modules.perf import timed
 
-def generate_pdf(df, client_name, lang="en"):
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4,
-                            topMargin=0.6*inch, bottomMargin=0.6*inch)
-    story = []
-    styles = getSampleStyleSheet()
+# ── Colors (matching logo) ──
+PINK     = colors.HexColor('#E91E8C')
+ORANGE   = colors.HexColor('#FF6B35')
+PURPLE   = colors.HexColor('#9C27B0')
+LIGHT_ROW = colors.HexColor('#FDF0F8')
+
+# ==============================
+# Report Cache
+# ==============================
+# Finished PDFs keyed by (client, lang, dataset fingerprint, day), bounded
+# by count and total size. The day is part of the key because the report
+# prints its generation date.
+PDF_CACHE_ENTRIES = int(os.environ.get('PDF_CACHE_ENTRIES', '64'))
+PDF_CACHE_MB      = int(os.environ.get('PDF_CACHE_MB', '64'))
+
+_PDFS = LRUCache(maxsize=PDF_CACHE_ENTRIES, maxbytes=PDF_CACHE_MB * 1024 ** 2, sizeof=len)
+
+_styles = None
+_styles_lock = threading.Lock()
+
+
+def report_key(df, client_name, lang="en"):
+    return (client_name, lang, dataset_fingerprint(df), datetime.now().date())
+
+
+@timed('pdf.generate')
+def generate_pdf(df, client_name, lang="en", cube=None):
+    key = report_key(df, client_name, lang)
+    return _PDFS.get_or_build(key, lambda: render_pdf(df, client_name, lang, cube))
+
+
+# ── Paragraph styles, built once per process and shared (read-only) ──
+def get_styles():
+    global _styles
+    with _styles_lock:
+        if _styles is None:
+            _styles = _build_styles()
+        return _styles
 
-    # ── Colors (matching logo) ──
-    PINK     = colors.HexColor('#E91E8C')
-    ORANGE   = colors.HexColor('#FF6B35')
-    PURPLE   = colors.HexColor('#9C27B0')
-    LIGHT_ROW = colors.HexColor('#FDF0F8')
+
+def _build_styles():
+    styles = getSampleStyleSheet()
 
     # ── Title Style ──
     title_style = ParagraphStyle(
@@ -58,6 +96,85 @@ def generate_pdf(df, client_name, lang="en"):
         textColor=colors.HexColor('#1A0A2E')
     )
 
+    # one recommendation style per line color
+    rec_styles = {}
+    for color in (PINK, ORANGE, PURPLE):
+        color_hex = color.hexval()
+        if len(color_hex) == 7:
+            color_hex = color_hex[1:]
+        rec_styles[color_hex] = ParagraphStyle(
+            f'Rec_{color_hex}',
+            parent=rec_style,
+            textColor=color,
+            fontSize=11,
+            leftIndent=12,
+            spaceAfter=4
+        )
+
+    footer_style = ParagraphStyle(
+        'Footer', parent=styles['Normal'],
+        fontSize=9, textColor=colors.HexColor('#9988BB'),
+        alignment=TA_CENTER
+    )
+
+    # ── Table styles ──
+    divider_style = TableStyle([
+        ('LINEBELOW', (0, 0), (-1, -1), 2, PINK),
+        ('TOPPADDING', (0, 0), (-1, -1), 0),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+    ])
+
+    kpi_table_style = TableStyle([
+        # Header row
+        ('BACKGROUND',    (0, 0), (-1, 0),  PINK),
+        ('TEXTCOLOR',     (0, 0), (-1, 0),  colors.white),
+        ('FONTNAME',      (0, 0), (-1, 0),  'Helvetica-Bold'),
+        ('FONTSIZE',      (0, 0), (-1, 0),  12),
+        # Data rows
+        ('ROWBACKGROUNDS',(0, 1), (-1, -1), [colors.white, LIGHT_ROW]),
+        ('FONTSIZE',      (0, 1), (-1, -1), 10),
+        ('TEXTCOLOR',     (0, 1), (-1, -1), colors.HexColor('#1A0A2E')),
+        # All cells
+        ('ALIGN',         (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN',        (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING',    (0, 0), (-1, -1), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 9),
+        ('GRID',          (0, 0), (-1, -1), 0.5, colors.HexColor('#E0C0D8')),
+    ])
+
+    rec_table_style = TableStyle([
+        ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, LIGHT_ROW]),
+        ('TOPPADDING',    (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ('LEFTPADDING',   (0, 0), (-1, -1), 12),
+        ('RIGHTPADDING',  (0, 0), (-1, -1), 12),
+        ('GRID',          (0, 0), (-1, -1), 0.3, colors.HexColor('#E0C0D8')),
+    ])
+
+    return {
+        'title':     title_style,
+        'subtitle':  subtitle_style,
+        'section':   section_style,
+        'rec':       rec_styles,
+        'footer':    footer_style,
+        'divider':   divider_style,
+        'kpi_table': kpi_table_style,
+        'rec_table': rec_table_style,
+    }
+
+
+def render_pdf(df, client_name, lang="en", cube=None):
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4,
+                            topMargin=0.6*inch, bottomMargin=0.6*inch)
+    story = []
+
+    styles         = get_styles()
+    title_style    = styles['title']
+    subtitle_style = styles['subtitle']
+    section_style  = styles['section']
+    footer_style   = styles['footer']
+
     # ── Header ──
     story.append(Paragraph("AI-Marketing-Predictor", title_style))
     story.append(Paragraph(
@@ -68,11 +185,7 @@ def generate_pdf(df, client_name, lang="en"):
     # ── Divider line ──
     divider_data = [['']]
     divider = Table(divider_data, colWidths=[6.5*inch])
-    divider.setStyle(TableStyle([
-        ('LINEBELOW', (0, 0), (-1, -1), 2, PINK),
-        ('TOPPADDING', (0, 0), (-1, -1), 0),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-    ]))
+    divider.setStyle(styles['divider'])
     story.append(divider)
     story.append(Spacer(1, 0.2*inch))
 
@@ -90,43 +203,43 @@ def generate_pdf(df, client_name, lang="en"):
     story.append(Paragraph(kpi_title, section_style))
     story.append(Spacer(1, 0.1*inch))
 
+    # ── Aggregates: the caller's cube if it has one, else the client rows ──
+    if cube is None:
+        cube = get_cube(df)
+    kpis = cube.kpis(company=client_name)
+
     kpi_data = [
         ["Metric", "Value"],
-        ["Total Clicks",          f"{df['Clicks'].sum():,}"],
-        ["Total Impressions",     f"{df['Impressions'].sum():,}"],
-        ["Average ROI",           f"{df['ROI'].mean():.2f}x"],
-        ["Average CTR",           f"{df['CTR'].mean():.2f}%"],
-        ["Avg Acquisition Cost",  f"${df['Acquisition_Cost'].mean():,.2f}"],
-        ["Avg Conversion Rate",   f"{df['Conversion_Rate'].mean():.2%}"],
+        ["Total Clicks",          f"{kpis['Clicks']:,}"],
+        ["Total Impressions",     f"{kpis['Impressions']:,}"],
+        ["Average ROI",           f"{kpis['ROI']:.2f}x"],
+        ["Average CTR",           f"{kpis['CTR']:.2f}%"],
+        ["Avg Acquisition Cost",  f"${kpis['Acquisition_Cost']:,.2f}"],
+        ["Avg Conversion Rate",   f"{kpis['Conversion_Rate']:.2%}"],
     ]
 
     table = Table(kpi_data, colWidths=[3.25*inch, 3.25*inch])
-    table.setStyle(TableStyle([
-        # Header row
-        ('BACKGROUND',    (0, 0), (-1, 0),  PINK),
-        ('TEXTCOLOR',     (0, 0), (-1, 0),  colors.white),
-        ('FONTNAME',      (0, 0), (-1, 0),  'Helvetica-Bold'),
-        ('FONTSIZE',      (0, 0), (-1, 0),  12),
-        # Data rows
-        ('ROWBACKGROUNDS',(0, 1), (-1, -1), [colors.white, LIGHT_ROW]),
-        ('FONTSIZE',      (0, 1), (-1, -1), 10),
-        ('TEXTCOLOR',     (0, 1), (-1, -1), colors.HexColor('#1A0A2E')),
-        # All cells
-        ('ALIGN',         (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN',        (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING',    (0, 0), (-1, -1), 9),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 9),
-        ('GRID',          (0, 0), (-1, -1), 0.5, colors.HexColor('#E0C0D8')),
-    ]))
+    table.setStyle(styles['kpi_table'])
     story.append(table)
     story.append(Spacer(1, 0.3*inch))
 
     # ── AI Recommendations ──
-    best_platform = df.groupby('Channel_Used')['ROI'].mean().idxmax()
-    best_roi      = df.groupby('Channel_Used')['ROI'].mean().max()
-    best_goal     = df.groupby('Campaign_Goal')['ROI'].mean().idxmax()
-    best_segment  = df.groupby('Customer_Segment')['Conversion_Rate'].mean().idxmax()
-    best_month    = df.groupby('Month')['ROI'].mean().idxmax()
+    platform, goal, segment, month = cube.rank([
+        Spec('Channel_Used',     'ROI',             'mean'),
+        Spec('Campaign_Goal',    'ROI',             'mean'),
+        Spec('Customer_Segment', 'Conversion_Rate', 'mean'),
+        Spec('Month',            'ROI',             'mean'),
+    ], company=client_name)
+    best_platform = platform.best
+    best_roi      = platform.best_value
+    best_goal     = goal.best
+    best_segment  = segment.best
+    best_month    = month.best
+
+    # next calendar month of the client's own damped-trend ROI series
+    forecasts  = get_forecasts(df, cube)
+    next_month = forecasts.next_months(1)
+    next_roi   = forecasts.predict(client_name, horizon=1)
 
     platform_title = "AI Recommendations" if lang == "en" else "توصيات الذكاء الاصطناعي"
     story.append(Paragraph(platform_title, section_style))
@@ -138,8 +251,12 @@ def generate_pdf(df, client_name, lang="en"):
         (ORANGE, f"🎯  Best Campaign Goal: {best_goal}"),
         (PURPLE, f"👥  Best Customer Segment: {best_segment}"),
         (PINK,   f"📅  Best Month for Campaigns: Month {best_month}"),
-        (ORANGE, f"📈  Next Month ROI Prediction: {df['ROI'].mean() * 1.05:.2f}x  (+5% expected growth)"),
     ]
+    # no dated ROI series for this client: no prediction line at all
+    if next_roi is not None and next_month:
+        recommendations.append(
+            (ORANGE, f"📈  Next Month ({next_month[0]}) ROI Prediction: {next_roi[0]:.2f}x  (damped-trend forecast)")
+        )
 
     # إنشاء جدول بدون استخدام <font> tag
     rec_table_data = []
@@ -152,27 +269,11 @@ def generate_pdf(df, client_name, lang="en"):
         # إنشاء نص مع رمز ● ملون
         formatted_text = f"●  {text}"
         
-        # إنشاء Paragraph مع اللون المطلوب
-        rec_style_temp = ParagraphStyle(
-            f'Rec_{color_hex}',
-            parent=rec_style,
-            textColor=color,
-            fontSize=11,
-            leftIndent=12,
-            spaceAfter=4
-        )
-        
-        rec_table_data.append([Paragraph(formatted_text, rec_style_temp)])
+        # Paragraph بالستايل الجاهز للون ده
+        rec_table_data.append([Paragraph(formatted_text, styles['rec'][color_hex])])
 
     rec_table = Table(rec_table_data, colWidths=[6.5*inch])
-    rec_table.setStyle(TableStyle([
-        ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, LIGHT_ROW]),
-        ('TOPPADDING',    (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('LEFTPADDING',   (0, 0), (-1, -1), 12),
-        ('RIGHTPADDING',  (0, 0), (-1, -1), 12),
-        ('GRID',          (0, 0), (-1, -1), 0.3, colors.HexColor('#E0C0D8')),
-    ]))
+    rec_table.setStyle(styles['rec_table'])
     story.append(rec_table)
     story.append(Spacer(1, 0.4*inch))
 
@@ -180,11 +281,6 @@ def generate_pdf(df, client_name, lang="en"):
     story.append(divider)
     story.append(Spacer(1, 0.1*inch))
 
-    footer_style = ParagraphStyle(
-        'Footer', parent=styles['Normal'],
-        fontSize=9, textColor=colors.HexColor('#9988BB'),
-        alignment=TA_CENTER
-    )
     story.append(Paragraph(
         "AI-Marketing-Predictor  |  Built by <b>ENG. Shadya Dief</b>  |  "
         "linkedin.com/in/shadya-dief-ml  |  github.com/Shadyadief",
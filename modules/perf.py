@@ -0,0 +1,227 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+import numpy as np
+import pandas as pd
+
+# ==============================
+# Hot-path Instrumentation
+# ==============================
+# Named timing spans and counters, kept per process. Every span keeps its
+# last PERF_SAMPLES durations for percentiles, plus all-time call counts
+# and totals. Spans and counters that happen on a script thread between
+# start_rerun() and finish_rerun() are also collected for that rerun; work
+# on other threads (PDF jobs) only shows in the process totals.
+#
+# With PERF_EXPORT set, every finished rerun is written out: a *.prom path
+# is rewritten as a Prometheus text snapshot (for a textfile collector),
+# any other path gets one JSON line per rerun appended.
+PERF_EXPORT  = os.environ.get('PERF_EXPORT', '')
+PERF_SAMPLES = int(os.environ.get('PERF_SAMPLES', '1024'))
+
+# Prometheus: <PREFIX>_span_seconds{span=...} and <PREFIX>_<counter>_total
+PROM_PREFIX = 'marketing_app'
+QUANTILES   = [0.5, 0.95]
+
+_lock      = threading.Lock()
+_export    = threading.Lock()
+_SAMPLES   = {}   # span → deque of recent seconds
+_TOTALS    = {}   # span → [calls, seconds]
+_COUNTERS  = {}   # counter → total
+_local     = threading.local()
+
+
+class Rerun:
+
+    def __init__(self):
+        self.started  = time.perf_counter()
+        self.spans    = {}
+        self.counters = {}
+
+
+def _record(name, seconds):
+    with _lock:
+        samples = _SAMPLES.get(name)
+        if samples is None:
+            samples = _SAMPLES[name] = deque(maxlen=PERF_SAMPLES)
+            _TOTALS[name] = [0, 0.0]
+        samples.append(seconds)
+        totals = _TOTALS[name]
+        totals[0] += 1
+        totals[1] += seconds
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is not None:
+        rerun.spans[name] = rerun.spans.get(name, 0.0) + seconds
+
+
+@contextmanager
+def span(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - started)
+
+
+def timed(name):
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, n=1):
+    with _lock:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + n
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is not None:
+        rerun.counters[name] = rerun.counters.get(name, 0) + n
+
+
+# ── Consecutive sections of a page as spans <prefix>.<name>: each mark
+#    ends the section before it, done() ends the last one ──
+class Sections:
+
+    def __init__(self, prefix):
+        self.prefix  = prefix
+        self.name    = None
+        self.started = None
+
+    def __call__(self, name):
+        self.done()
+        self.name    = name
+        self.started = time.perf_counter()
+
+    def done(self):
+        if self.name is not None:
+            _record(f"{self.prefix}.{self.name}", time.perf_counter() - self.started)
+            self.name = None
+
+
+# ==============================
+# Reruns
+# ==============================
+# Bytes sent are the serialized size of every message the script thread
+# hands to its session. Streamlit has no public hook for outgoing messages,
+# so the private ScriptRunContext._enqueue callback of the pinned Streamlit
+# (1.32, requirements.txt) is wrapped, once per context; the wrapper counts
+# against whichever rerun is current. On any other version, or a context
+# without that callback, bytes_sent is simply not counted.
+SENT_HOOK_VERSIONS = ('1.32.',)
+
+
+def _count_sent(ctx):
+    import streamlit
+    if not streamlit.__version__.startswith(SENT_HOOK_VERSIONS):
+        return
+    enqueue = getattr(ctx, '_enqueue', None)
+    if not callable(enqueue) or getattr(enqueue, 'counts_bytes', False):
+        return
+
+    def counted(msg):
+        count('bytes_sent', msg.ByteSize())
+        return enqueue(msg)
+
+    counted.counts_bytes = True
+    ctx._enqueue = counted
+
+
+def start_rerun():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        _count_sent(ctx)
+    # a rerun cut short (st.rerun, stop) is never finished and is dropped here
+    _local.rerun = Rerun()
+
+
+def finish_rerun(page=None):
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is None:
+        return None
+    _local.rerun = None
+    seconds = time.perf_counter() - rerun.started
+    _record('rerun', seconds)
+    count('reruns')
+
+    record = {
+        'time':     round(time.time(), 3),
+        'page':     page,
+        'ms':       round(seconds * 1000, 2),
+        'spans':    {name: round(s * 1000, 2) for name, s in rerun.spans.items()},
+        'counters': rerun.counters,
+    }
+    if PERF_EXPORT:
+        export(record, PERF_EXPORT)
+    return record
+
+
+# ==============================
+# Reports and Export
+# ==============================
+def _snapshot():
+    with _lock:
+        samples  = {name: np.array(values) for name, values in _SAMPLES.items()}
+        totals   = {name: tuple(values) for name, values in _TOTALS.items()}
+        counters = dict(_COUNTERS)
+    return samples, totals, counters
+
+
+def perf_report():
+    samples, totals, _ = _snapshot()
+    rows = [
+        (name, totals[name][0],
+         np.percentile(values, 50) * 1000, np.percentile(values, 95) * 1000,
+         totals[name][1])
+        for name, values in samples.items()
+    ]
+    report = pd.DataFrame(rows, columns=['Span', 'Calls', 'p50 ms', 'p95 ms', 'Total s'])
+    report = report.sort_values('Total s', ascending=False, ignore_index=True)
+    return report.round({'p50 ms': 2, 'p95 ms': 2, 'Total s': 3})
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text():
+    samples, totals, counters = _snapshot()
+    metric = f"{PROM_PREFIX}_span_seconds"
+    lines = [
+        f"# HELP {metric} Time spent in each instrumented span.",
+        f"# TYPE {metric} summary",
+    ]
+    for name, values in sorted(samples.items()):
+        label = _label(name)
+        for q in QUANTILES:
+            lines.append(f'{metric}{{span="{label}",quantile="{q}"}} {np.quantile(values, q):.6f}')
+        lines.append(f'{metric}_sum{{span="{label}"}} {totals[name][1]:.6f}')
+        lines.append(f'{metric}_count{{span="{label}"}} {totals[name][0]}')
+    for name, total in sorted(counters.items()):
+        counter = f"{PROM_PREFIX}_{name}_total"
+        lines.append(f"# TYPE {counter} counter")
+        lines.append(f"{counter} {total}")
+    return '\n'.join(lines) + '\n'
+
+
+def export(record, path):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with _export:
+        if path.endswith('.prom'):
+            tmp = f"{path}.tmp"
+            with open(tmp, 'w') as f:
+                f.write(prometheus_text())
+            os.replace(tmp, path)
+        else:
+            with open(path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
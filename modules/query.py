@@ -0,0 +1,155 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from modules.aggregates import CUBE_DIMS, SUM_METRICS, MEAN_METRICS
+from modules.store import open_store, reading, stored_ids
+from modules.perf import count
+
+# ==============================
+# Query Loader (projection + predicate pushdown)
+# ==============================
+# Pages ask for the columns they render and the rows they need (Company,
+# date range, channel). Columns are projected at the Parquet column-chunk
+# level and filters are pushed down to row-group statistics of the base
+# file and to the Company / YearMonth partitions of the upload store, so a
+# page reads only what it shows. The statistics only skip row groups when
+# the file is sorted by Company and Date in bounded row groups, the layout
+# optimize_layout() writes.
+BASE_PATH = 'data/campaigns_clean.parquet'
+
+CUBE_COLUMNS = CUBE_DIMS + SUM_METRICS + MEAN_METRICS
+
+PAGE_COLUMNS = {
+    'overview': CUBE_COLUMNS,
+    'client':   CUBE_COLUMNS + ['Campaign_ID', 'Target_Audience', 'Location', 'Language',
+                                'Engagement_Score', 'Duration'],
+    'ai':       CUBE_COLUMNS + ['Target_Audience', 'Location', 'Language',
+                                'Engagement_Score', 'Duration'],
+    'explorer': ['Campaign_ID', 'Company', 'Date', 'Channel_Used', 'Campaign_Goal',
+                 'Customer_Segment', 'Target_Audience', 'Location', 'Language', 'Duration',
+                 'Clicks', 'Impressions', 'CTR', 'Conversion_Rate', 'ROI',
+                 'Acquisition_Cost', 'Engagement_Score'],
+}
+
+# what the explorer's filter widgets are built from, when its rows are
+# loaded separately
+EXPLORER_FILTER_COLUMNS = ['Company', 'Date', 'ROI', 'Channel_Used', 'Campaign_Goal', 'Customer_Segment']
+
+ROW_GROUP_SIZE = 16_000
+
+
+def _resolve_columns(columns, schema_names):
+    if columns is None:
+        return None
+    wanted = list(dict.fromkeys(columns))
+    # derived columns fall back to their sources when the file lacks them
+    if 'Month' in wanted and 'Month' not in schema_names:
+        wanted += ['Date']
+    if 'CTR' in wanted and 'CTR' not in schema_names:
+        wanted += ['Clicks', 'Impressions']
+    return [c for c in dict.fromkeys(wanted) if c in schema_names]
+
+
+def row_filter(company=None, date_range=None, channel=None, partitioned=False):
+    expr = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    if company is not None:
+        expr = both(expr, ds.field('Company') == company)
+    if channel is not None:
+        channels = [channel] if isinstance(channel, str) else list(channel)
+        expr = both(expr, ds.field('Channel_Used').isin(channels))
+    if date_range is not None:
+        # whole days, both ends inclusive
+        start, end = (pd.Timestamp(d).normalize() for d in date_range)
+        stop = end + pd.Timedelta(days=1)
+        expr = both(expr, (ds.field('Date') >= pa.scalar(start, pa.timestamp('ns')))
+                          & (ds.field('Date') < pa.scalar(stop, pa.timestamp('ns'))))
+        if partitioned:
+            expr = both(expr, (ds.field('YearMonth') >= start.strftime('%Y-%m'))
+                              & (ds.field('YearMonth') <= end.strftime('%Y-%m')))
+    return expr
+
+
+def _scan(dataset, columns, company, date_range, channel, partitioned=False):
+    names = dataset.schema.names
+    if date_range is not None and 'Date' not in names:
+        return None
+    if channel is not None and 'Channel_Used' not in names:
+        return None
+    cols = _resolve_columns(columns, names)
+    if cols is not None and company is not None and 'Company' not in cols and 'Company' in names:
+        cols = cols + ['Company']
+    expr = row_filter(company, date_range, channel, partitioned)
+    table = dataset.to_table(columns=cols, filter=expr)
+    count('rows_scanned', table.num_rows)
+    return table
+
+
+def query_campaigns(columns=None, company=None, date_range=None, channel=None, base_path=BASE_PATH):
+    if columns is not None and 'Campaign_ID' not in columns:
+        # needed to overlay stored uploads on the base rows; dropped afterwards
+        read_columns = list(columns) + ['Campaign_ID']
+    else:
+        read_columns = columns
+
+    base = _scan(ds.dataset(base_path, format='parquet'), read_columns, company, date_range, channel)
+    df = base.to_pandas() if base is not None else pd.DataFrame()
+
+    with reading():
+        replaced = stored_ids() if 'Campaign_ID' in df.columns else None
+        store = open_store()
+        stored = None
+        if store is not None:
+            stored = _scan(store, read_columns, company, date_range, channel, partitioned=True)
+
+    # a stored upload replaces the base row with the same Campaign_ID, even
+    # when it was re-uploaded under another client or falls outside the filter
+    if replaced is not None:
+        df = df[~df['Campaign_ID'].isin(replaced.to_numpy())]
+    if stored is not None and stored.num_rows:
+        stored = stored.to_pandas()
+        stored = stored.drop(columns=[c for c in ['YearMonth'] if c in stored.columns])
+        df = pd.concat([df, stored], ignore_index=True)
+
+    if columns is not None and 'Campaign_ID' not in columns and 'Campaign_ID' in df.columns:
+        df = df.drop(columns=['Campaign_ID'])
+    return df
+
+
+# ── Rewrite the base file sorted by Company and Date in small row groups,
+#    so Company / date filters can skip most of it. A row group never spans
+#    two clients, so its Date statistics are one client's range. ──
+def _company_runs(table):
+    if 'Company' not in table.column_names:
+        return [(0, table.num_rows)]
+    codes, _ = pd.factorize(table.column('Company').to_pandas())
+    edges = np.flatnonzero(np.diff(codes)) + 1
+    bounds = [0] + edges.tolist() + [table.num_rows]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def optimize_layout(path=BASE_PATH, row_group_size=ROW_GROUP_SIZE):
+    table = pq.read_table(path)
+    keys = [(c, 'ascending') for c in ('Company', 'Date') if c in table.column_names]
+    table = table.sort_by(keys)
+    tmp = f"{path}.tmp"
+    with pq.ParquetWriter(tmp, table.schema) as writer:
+        for start, stop in _company_runs(table):
+            writer.write_table(table.slice(start, stop - start), row_group_size=row_group_size)
+    os.replace(tmp, path)
+    return pq.ParquetFile(path).metadata.num_row_groups
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['--optimize']:
+        groups = optimize_layout()
+        print(f"{BASE_PATH}: rewritten sorted by Company, Date into {groups} row groups")
+    else:
+        print("usage: python -m modules.query --optimize")
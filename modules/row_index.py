@@ -0,0 +1,116 @@
+import os
+import numpy as np
+import pandas as pd
+from modules.cache import LRUCache
+from modules.dataset import dataset_fingerprint, get_company_index
+from modules.perf import count
+
+# ==============================
+# Presorted Row Index
+# ==============================
+# Sorting, filtering and paging of the raw campaign rows for the explorer
+# page. Every sortable column gets one stable argsort per dataset and
+# direction; a (filters, sort) combination is resolved once to the array of
+# matching row positions in display order. Turning a page is then a slice
+# of that array plus a take() of page_size rows, whatever the dataset size.
+#
+# Filters are hashable tuples of (column, op, value):
+#   ('Channel_Used', 'in', ('Facebook', 'Instagram'))
+#   ('ROI', 'between', (1.0, 5.0))          — both ends inclusive
+ROW_INDEX_MB = int(os.environ.get('ROW_INDEX_MB', '256'))
+
+_ORDERS  = LRUCache(maxsize=64, maxbytes=ROW_INDEX_MB * 1024 ** 2 // 2,
+                    sizeof=lambda a: a.nbytes)
+_RESULTS = LRUCache(maxsize=64, maxbytes=ROW_INDEX_MB * 1024 ** 2 // 2,
+                    sizeof=lambda a: a.nbytes)
+_CHOICES = LRUCache(maxsize=64)
+
+
+def _positions_dtype(n):
+    return np.int32 if n < 2 ** 31 else np.int64
+
+
+# ── Rank of every row in a column: dense codes in sorted order, missing
+#    values get the highest rank so they sort last either way ──
+def _ranks(col):
+    if isinstance(col.dtype, pd.CategoricalDtype) and col.cat.categories.is_monotonic_increasing:
+        codes, size = col.cat.codes.to_numpy(), len(col.cat.categories)
+    else:
+        codes, labels = pd.factorize(col, sort=True)
+        size = len(labels)
+    return np.where(codes < 0, size, codes), size
+
+
+def sort_order(df, column, descending=False):
+    key = (dataset_fingerprint(df), column, descending)
+
+    def build():
+        ranks, size = _ranks(df[column])
+        if descending:
+            ranks = np.where(ranks == size, size, size - 1 - ranks)
+        order = np.argsort(ranks, kind='stable').astype(_positions_dtype(len(df)))
+        order.setflags(write=False)
+        return order
+
+    return _ORDERS.get_or_build(key, build)
+
+
+def filter_mask(df, filters):
+    count('rows_scanned', len(df))
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in filters:
+        if column == 'Company' and op == 'in' and df.attrs.get('sorted_by') == 'Company':
+            # rows of a client are one contiguous range of the sorted frame
+            offsets = get_company_index(df).offsets
+            company = np.zeros(len(df), dtype=bool)
+            for name in value:
+                start, stop = offsets.get(name, (0, 0))
+                company[start:stop] = True
+            mask &= company
+        elif op == 'in':
+            mask &= df[column].isin(list(value)).to_numpy()
+        elif op == 'between':
+            low, high = value
+            mask &= df[column].between(low, high).to_numpy()
+        else:
+            raise ValueError(f"unknown filter op: {op!r}")
+    return mask
+
+
+def _resolve(df, filters, sort, descending):
+    mask = filter_mask(df, filters) if filters else None
+    if sort is None:
+        positions = np.flatnonzero(mask) if mask is not None else np.arange(len(df))
+        positions = positions.astype(_positions_dtype(len(df)))
+    else:
+        order = sort_order(df, sort, descending)
+        positions = order[mask[order]] if mask is not None else order
+    positions.setflags(write=False)
+    return positions
+
+
+def query_rows(df, filters=(), sort=None, descending=False):
+    key = (dataset_fingerprint(df), tuple(filters), sort, descending)
+    return _RESULTS.get_or_build(key, lambda: _resolve(df, tuple(filters), sort, descending))
+
+
+def page_rows(df, positions, page, page_size):
+    start = page * page_size
+    return df.take(positions[start:start + page_size])
+
+
+# ── Filter choices: categories / sorted distinct values, and value ranges ──
+def column_values(df, column):
+    def build():
+        col = df[column]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            return col.cat.categories.tolist()
+        return sorted(col.dropna().unique().tolist())
+    return _CHOICES.get_or_build((dataset_fingerprint(df), 'values', column), build)
+
+
+def column_range(df, column):
+    def build():
+        col = df[column]
+        return col.min(), col.max()
+    return _CHOICES.get_or_build((dataset_fingerprint(df), 'range', column), build)
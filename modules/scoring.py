@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from modules.cache import LRUCache
+from modules.dataset import dataset_fingerprint
+from modules.groupby_engine import Spec, group_reduce
+from modules.perf import count
+
+# ==============================
+# Batch Scoring
+# ==============================
+# Scores every campaign of a dataset with the Random Forest and caches the
+# success probabilities per (dataset fingerprint, model version), so pages
+# can show them per campaign, per client and per channel without rescoring
+# on every rerun.
+CHUNK_SIZE = 50_000
+N_JOBS     = -1
+
+_SCORES = LRUCache(maxsize=4)
+
+
+# ── Label-encode with the training encoders; unseen labels become -1 ──
+def _encode_column(col, encoder):
+    return pd.Categorical(col, categories=encoder.classes_).codes
+
+
+def _duration_days(df):
+    if 'Duration_Days' in df.columns:
+        return df['Duration_Days'].to_numpy()
+    col = df['Duration']
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        days = pd.Series(col.cat.categories).str.extract(r'(\d+)')[0].astype(float).to_numpy()
+        codes = col.cat.codes.to_numpy()
+        return np.where(codes >= 0, days[codes], np.nan)
+    return col.astype(str).str.extract(r'(\d+)')[0].astype(float).to_numpy()
+
+
+def build_feature_matrix(df, features, encoders):
+    X = np.empty((len(df), len(features)), dtype=np.float32)
+    for j, name in enumerate(features):
+        if name in encoders:
+            X[:, j] = _encode_column(df[name], encoders[name])
+        elif name == 'Duration_Days':
+            X[:, j] = _duration_days(df)
+        else:
+            X[:, j] = df[name].to_numpy(dtype=np.float32)
+    return X
+
+
+def missing_features(df, features):
+    missing = []
+    for name in features:
+        if name == 'Duration_Days':
+            if 'Duration_Days' not in df.columns and 'Duration' not in df.columns:
+                missing.append('Duration')
+        elif name not in df.columns:
+            missing.append(name)
+    return missing
+
+
+def _positive_column(model):
+    classes = list(getattr(model, 'classes_', [0, 1]))
+    return classes.index(1) if 1 in classes else len(classes) - 1
+
+
+def score_campaigns(df, bundle, chunk_size=CHUNK_SIZE, n_jobs=N_JOBS):
+    from joblib import parallel_backend
+
+    missing = missing_features(df, bundle.features)
+    if missing:
+        raise KeyError(f"Columns needed for scoring are missing: {missing}")
+
+    count('rows_scanned', len(df))
+    positive = _positive_column(bundle.model)
+    proba = np.empty(len(df), dtype=np.float32)
+    # chunks bound the feature matrix; trees are scored in parallel threads
+    with parallel_backend('threading', n_jobs=n_jobs):
+        for start in range(0, len(df), chunk_size):
+            chunk = df.iloc[start:start + chunk_size]
+            X = build_feature_matrix(chunk, bundle.features, bundle.encoders)
+            X = pd.DataFrame(X, columns=bundle.features, copy=False)
+            proba[start:start + len(chunk)] = bundle.model.predict_proba(X)[:, positive]
+    return pd.Series(proba, index=df.index, name='Success_Probability')
+
+
+def get_scores(df, bundle):
+    key = (dataset_fingerprint(df), bundle.version)
+    return _SCORES.get_or_build(key, lambda: score_campaigns(df, bundle))
+
+
+# ── Mean success probability per dimension value ──
+def success_by(df, scores, dim):
+    frame = pd.DataFrame({dim: df[dim].values, 'Success_Probability': scores.to_numpy()})
+    result, = group_reduce(frame, [Spec(dim, 'Success_Probability', 'mean')])
+    return result.to_series().reset_index()
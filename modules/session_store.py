@@ -0,0 +1,110 @@
+import os
+import glob
+from modules.cache import LRUCache
+from modules.base_dataset import write_frame, read_frame
+
+# ==============================
+# Spill-to-disk Upload Datasets
+# ==============================
+# Parsed uploads live in one process-wide store keyed by content hash. The
+# most recently used ones stay in memory under a global budget; the rest are
+# spilled to Arrow files under SPILL_DIR and mapped back in on access.
+# Sessions only keep a DatasetHandle, never the frame itself.
+#
+# The cache keeps returning an evicted entry until its spill file is
+# written, so a dataset is always in one of the two places. A file mapped
+# back in is kept: evicting that dataset again only marks it as recent. The
+# files are capped at SPILL_DISK_MB: past that the least recently spilled
+# are dropped, and their sessions fall back to the base dataset.
+SPILL_DIR = os.environ.get('SESSION_SPILL_DIR', 'data/.sessions')
+
+# in-memory budget, shared by all sessions
+UPLOAD_CACHE_ENTRIES = int(os.environ.get('UPLOAD_CACHE_ENTRIES', '8'))
+UPLOAD_CACHE_MB      = int(os.environ.get('UPLOAD_CACHE_MB', '1024'))
+SPILL_DISK_MB        = int(os.environ.get('SPILL_DISK_MB', '4096'))
+
+
+def _spill_path(key):
+    return os.path.join(SPILL_DIR, f"{key}.arrow")
+
+
+def _remove(path):
+    # mapped files can be unlinked safely; readers keep their mapping
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# ── Oldest spill files first, until the rest fit in SPILL_DISK_MB ──
+def _trim_spills(keep):
+    files = []
+    for path in glob.glob(os.path.join(SPILL_DIR, '*.arrow')):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append((stat.st_mtime_ns, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= SPILL_DISK_MB * 1024 ** 2:
+            break
+        if path != keep:
+            _remove(path)
+            total -= size
+
+
+# runs after the cache released its lock; until it returns, sessions asking
+# for this dataset still get the frame in memory
+def _spill(key, df):
+    path = _spill_path(key)
+    if os.path.exists(path):
+        try:
+            os.utime(path)
+            return
+        except OSError:
+            pass
+    os.makedirs(SPILL_DIR, exist_ok=True)
+    write_frame(df, path)
+    _trim_spills(keep=path)
+
+
+_RESIDENT = LRUCache(
+    maxsize=UPLOAD_CACHE_ENTRIES,
+    maxbytes=UPLOAD_CACHE_MB * 1024 ** 2,
+    sizeof=lambda df: int(df.memory_usage(index=True, deep=True).sum()),
+    on_evict=_spill,
+)
+
+
+def put_dataset(key, df):
+    return _RESIDENT.put(key, df)
+
+
+def get_dataset(key):
+    df = _RESIDENT.get(key)
+    if df is not None:
+        return df
+    try:
+        # two sessions mapping the same file in at once is harmless
+        df = read_frame(_spill_path(key))
+    except OSError:
+        return None
+    return _RESIDENT.put(key, df)
+
+
+# ── What session_state holds instead of the DataFrame ──
+class DatasetHandle:
+
+    def __init__(self, key, name, rows):
+        self.key  = key
+        self.name = name
+        self.rows = rows
+
+    # None once the dataset is neither in memory nor on disk any more
+    @property
+    def df(self):
+        return get_dataset(self.key)
+
+    def __repr__(self):
+        return f"DatasetHandle({self.name!r}, rows={self.rows:,}, key={self.key[:8]})"
@@ -0,0 +1,325 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote, unquote
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from modules.cache import LRUCache
+from modules.perf import count
+
+# ==============================
+# Partitioned Dataset Store
+# ==============================
+# Uploaded client data is appended to an on-disk Parquet dataset laid out
+# as STORE_DIR/Company=<name>/YearMonth=<YYYY-MM>/part-0.parquet (hive
+# style, values URI-encoded). Appending rewrites the partitions the batch
+# touches, deduplicating on Campaign_ID (the newest row wins): a campaign
+# whose Date or Company changed is also dropped from the partition it was
+# stored in before. Readers scan the dataset with partition pruning.
+#
+# Every partition file is written in one canonical schema (int64, float64,
+# string, timestamp[ns]): an upload's compacted widths are not the next
+# one's, and a dataset takes its schema from the first file it finds.
+#
+# The manifest lists the content hashes of the uploads, newest last; only
+# an upload identical to the latest one is skipped, so re-uploading an
+# older file makes its rows the newest again.
+STORE_DIR      = os.environ.get('DATA_STORE_DIR', 'data/store')
+PARTITION_COLS = ['Company', 'YearMonth']
+MANIFEST       = '_appended.json'
+
+# explicit string keys, so a company called "2024" is not read back as int
+PARTITIONING = ds.partitioning(
+    pa.schema([('Company', pa.string()), ('YearMonth', pa.string())]),
+    flavor='hive',
+)
+
+_IDS  = LRUCache(maxsize=2)
+
+
+class MissingCompanyError(ValueError):
+
+    def __init__(self, rows):
+        super().__init__(f"{rows:,} rows have no Company; every row needs one to be stored")
+        self.rows = rows
+
+
+# ── Any number of readers, or one writer. A waiting writer holds off new
+#    readers, so a steady stream of scans cannot starve an upload; the
+#    lock is not re-entrant ──
+class _ReadWriteLock:
+
+    def __init__(self):
+        self._cond    = threading.Condition()
+        self._readers = 0
+        self._writer  = False
+        self._waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+_lock = _ReadWriteLock()
+
+
+def _year_month(df):
+    if 'Date' not in df.columns:
+        return pd.Series('unknown', index=df.index)
+    dates = pd.to_datetime(df['Date'])
+    return dates.dt.strftime('%Y-%m').fillna('unknown')
+
+
+def _partition_dir(company, year_month):
+    return os.path.join(
+        STORE_DIR,
+        f"Company={quote(str(company), safe='')}",
+        f"YearMonth={quote(str(year_month), safe='')}",
+    )
+
+
+def _read_manifest():
+    path = os.path.join(STORE_DIR, MANIFEST)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_atomic(table, path):
+    # dot-prefixed, so dataset discovery never picks up a half-written file
+    folder, name = os.path.split(path)
+    tmp = os.path.join(folder, f".{name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+# ── One schema for every partition file, whatever widths the upload was
+#    compacted to; the pandas metadata goes too, it records those widths.
+#    An all-null column has no type of its own and is stored as strings ──
+def _canonical(table):
+    fields = []
+    for field in table.schema:
+        kind = field.type
+        if pa.types.is_dictionary(kind):
+            kind = kind.value_type
+        if pa.types.is_integer(kind):
+            kind = pa.int64()
+        elif pa.types.is_floating(kind):
+            kind = pa.float64()
+        elif pa.types.is_string(kind) or pa.types.is_large_string(kind) or pa.types.is_null(kind):
+            kind = pa.string()
+        elif pa.types.is_timestamp(kind):
+            kind = pa.timestamp('ns', kind.tz)
+        fields.append(pa.field(field.name, kind))
+    return table.replace_schema_metadata(None).cast(pa.schema(fields))
+
+
+# newest row per Campaign_ID; rows without one are distinct campaigns
+def _dedupe(df):
+    ids = df['Campaign_ID']
+    return df[~ids.duplicated(keep='last') | ids.isna()]
+
+
+# ids: every Campaign_ID of the upload, wherever it lands; their stored
+# versions are superseded even when the new one goes to another partition
+def _merge(existing, batch, ids=None):
+    if existing is None:
+        merged = batch
+    else:
+        if ids is not None and 'Campaign_ID' in existing.columns:
+            existing = existing[~existing['Campaign_ID'].isin(ids)]
+        merged = pd.concat([existing, batch], ignore_index=True)
+    if 'Campaign_ID' in merged.columns:
+        merged = _dedupe(merged).reset_index(drop=True)
+    return merged
+
+
+# ── Drop rows re-uploaded into another partition from the partitions the
+#    upload does not write to (_merge covers the others); only their
+#    Campaign_ID column is read ──
+def _drop_superseded(ids, targets):
+    for path, (key, _, _) in partition_files().items():
+        if key in targets or 'Campaign_ID' not in pq.read_schema(path).names:
+            continue
+        stored = pq.read_table(path, columns=['Campaign_ID']).column(0).to_pandas()
+        superseded = stored.isin(ids)
+        if not superseded.any():
+            continue
+        if superseded.all():
+            os.remove(path)
+            if not os.listdir(os.path.dirname(path)):
+                os.rmdir(os.path.dirname(path))
+        else:
+            kept = pq.read_table(path).filter(pa.array(~superseded.to_numpy()))
+            _write_atomic(_canonical(kept), path)
+
+
+# ── Append one upload; the same content as the latest upload is skipped.
+#    Rows without a Company have no partition: the upload is rejected ──
+def append_upload(df, key=None):
+    if 'Company' in df.columns:
+        # CSV reads an empty cell as an empty string
+        names = df['Company'].astype('string').str.strip()
+        missing = int(names.isna().sum() + names.eq('').sum())
+        if missing:
+            raise MissingCompanyError(missing)
+
+    with _lock.write():
+        manifest = _read_manifest()
+        if key is not None and manifest and manifest[-1] == key:
+            return 0
+
+        os.makedirs(STORE_DIR, exist_ok=True)
+        batch = df.copy()
+        batch['YearMonth'] = _year_month(batch).to_numpy()
+        ids = None
+        if 'Campaign_ID' in batch.columns:
+            batch = _dedupe(batch)
+            ids = batch['Campaign_ID'].dropna().unique()
+            targets = {(str(c), str(ym)) for c, ym in batch[PARTITION_COLS].drop_duplicates().itertuples(index=False)}
+            _drop_superseded(ids, targets)
+        written = 0
+        for (company, year_month), part in batch.groupby(PARTITION_COLS, observed=True, sort=False):
+            folder = _partition_dir(company, year_month)
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, 'part-0.parquet')
+
+            part = part.drop(columns=PARTITION_COLS)
+            for name in part.columns:
+                # plain values on disk; the dictionary is rebuilt on load
+                if isinstance(part[name].dtype, pd.CategoricalDtype):
+                    part[name] = part[name].astype(part[name].cat.categories.dtype)
+            existing = pq.read_table(path).to_pandas() if os.path.exists(path) else None
+            merged = _merge(existing, part, ids)
+            _write_atomic(_canonical(pa.Table.from_pandas(merged, preserve_index=False)), path)
+            written += len(part)
+
+        if key is not None:
+            manifest = [k for k in manifest if k != key] + [key]
+            with open(os.path.join(STORE_DIR, MANIFEST), 'w') as f:
+                json.dump(manifest, f)
+        return written
+
+
+# ── Change token: lets st.cache_data reload once the store changes ──
+def store_version():
+    if not os.path.isdir(STORE_DIR):
+        return None
+    files, latest = 0, 0
+    for root, _, names in os.walk(STORE_DIR):
+        for name in names:
+            if name.endswith('.parquet'):
+                files += 1
+                latest = max(latest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    return (files, latest)
+
+
+# ── Readers share the lock writers take alone: Parquet discovery records
+#    file sizes, so a partition replaced between discovery and scan reads
+#    truncated, but scans never block each other ──
+@contextmanager
+def reading():
+    with _lock.read():
+        yield
+
+
+def open_store():
+    if store_version() is None:
+        return None
+    return ds.dataset(STORE_DIR, format='parquet', partitioning=PARTITIONING)
+
+
+# ── Every stored Campaign_ID, read once per store version: an upload can
+#    replace base rows of any client, so readers need all of them.
+#    Call inside reading(), with the scan the IDs are applied to ──
+def stored_ids():
+    version = store_version()
+    if version is None:
+        return None
+
+    def build():
+        dataset = open_store()
+        if 'Campaign_ID' not in dataset.schema.names:
+            return None
+        ids = dataset.to_table(columns=['Campaign_ID']).column(0).combine_chunks()
+        count('rows_scanned', len(ids))
+        return ids
+
+    return _IDS.get_or_build(version, build)
+
+
+# ── Scan with partition pruning on Company / YearMonth ──
+def scan_store(columns=None, company=None, year_months=None):
+    expr = None
+    if company is not None:
+        expr = ds.field('Company') == company
+    if year_months is not None:
+        months = ds.field('YearMonth').isin(list(year_months))
+        expr = months if expr is None else expr & months
+    with reading():
+        dataset = open_store()
+        if dataset is None:
+            return None
+        table = dataset.to_table(columns=columns, filter=expr)
+    count('rows_scanned', table.num_rows)
+    return table.to_pandas()
+
+
+def store_partitions(company=None):
+    expr = None if company is None else ds.field('Company') == company
+    parts = []
+    with reading():
+        dataset = open_store()
+        if dataset is None:
+            return []
+        for fragment in dataset.get_fragments(filter=expr):
+            keys = ds.get_partition_keys(fragment.partition_expression)
+            parts.append((keys.get('Company'), keys.get('YearMonth'), fragment.count_rows()))
+    return parts
+
+
+# ── Partition files with their change stamp, without opening them ──
+def partition_files():
+    files = {}
+    if not os.path.isdir(STORE_DIR):
+        return files
+    for root, _, names in os.walk(STORE_DIR):
+        parts = dict(p.split('=', 1) for p in os.path.relpath(root, STORE_DIR).split(os.sep) if '=' in p)
+        if set(parts) != set(PARTITION_COLS):
+            continue
+        for name in names:
+            if name.endswith('.parquet') and not name.startswith('.'):
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                key  = (unquote(parts['Company']), unquote(parts['YearMonth']))
+                files[path] = (key, stat.st_mtime_ns, stat.st_size)
+    return files
@@ -0,0 +1,369 @@
+import os
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from modules.cache import LRUCache
+from modules.aggregates import AggregateCube, CUBE_DIMS, SUM_METRICS, MEAN_METRICS, build_cells, merge_cells, put_cube
+from modules.cube_ledger import CubeLedger, PARTITION_DIM, partition_cells
+from modules.dataset import prepare_dataset, dataset_fingerprint, COMPACT_SCHEMA, CATEGORY_MAX_RATIO
+from modules.base_dataset import get_base_dataset, source_token
+from modules.query import query_campaigns, BASE_PATH, PAGE_COLUMNS
+from modules.store import open_store, reading, partition_files, stored_ids
+from modules.scoring import score_campaigns
+from modules.perf import count
+
+# ==============================
+# Out-of-core Streaming Aggregation
+# ==============================
+# For datasets too large to hold as one frame, the cube ledger is built by
+# scanning the Parquet files in record batches: every batch is reduced to
+# partial cells per (Company, YearMonth), and the partials are merged as
+# they pile up, so memory is bounded by the batch size and the cube, never
+# by the rows. The batches hold the rows query_campaigns() would load (base
+# rows replaced by a stored upload are skipped, then the store is scanned),
+# prepared the way prepare_dataset() prepares them, so every KPI, chart and
+# forecast is the in-memory one.
+#
+# Pages then get aggregate-only views: zero-row frames whose cube comes from
+# the ledger. A single client's rows (Client View, its PDF, the explorer,
+# with its date range and channels) are still read with pushdown, and AI
+# Insights' success probabilities are scored batch by batch on one more scan.
+#
+# Compacting one client's rows alone would pick other types than compacting
+# the whole dataset (narrower integers, fewer categories), so client views
+# are cast to the types the in-memory dataset has, taken from one scan of
+# every column the first time a client's rows are read.
+#
+# Used when the base file's uncompressed size is above OUT_OF_CORE_MB;
+# 0 (the default) keeps the dataset in memory.
+OUT_OF_CORE_MB    = int(os.environ.get('OUT_OF_CORE_MB', '0'))
+STREAM_BATCH_ROWS = int(os.environ.get('STREAM_BATCH_ROWS', '262144'))
+
+# partial cells are folded together every MERGE_EVERY batches
+MERGE_EVERY = 4
+
+LEDGER_COLUMNS  = CUBE_DIMS + SUM_METRICS + MEAN_METRICS + ['Date']
+SUCCESS_DIMS    = ['Channel_Used', 'Company']
+SUCCESS_METRIC  = 'Success_Probability'
+
+_VIEWS   = LRUCache(maxsize=16)
+_SIZES   = LRUCache(maxsize=4)
+_SUCCESS = LRUCache(maxsize=4)
+_lock    = threading.Lock()
+_current = None
+
+
+class StreamedDataset:
+
+    out_of_core = True
+
+    def __init__(self, token, ledger, num_rows, schema):
+        self.token       = token
+        self.ledger      = ledger
+        self.files       = ledger.files
+        self.fingerprint = ledger.fingerprint
+        self.num_rows    = num_rows
+        self.schema      = schema
+        self.clients     = sorted(ledger.partials['Company'].dropna().unique().tolist())
+        self._dtypes      = None
+        self._dtypes_lock = threading.Lock()
+
+    def cube(self, company=None):
+        return self.ledger.cube(company)
+
+    def dtypes(self):
+        if self._dtypes is None:
+            with self._dtypes_lock:
+                if self._dtypes is None:
+                    self._dtypes = stream_dtypes(self.schema.names, self.num_rows, BASE_PATH)
+        return self._dtypes
+
+    def view(self, columns=None, company=None, date_range=None, channel=None):
+        key = (self.token, None if columns is None else tuple(columns), company, date_range, channel)
+        return _VIEWS.get_or_build(key, lambda: self._build_view(columns, company, date_range, channel))
+
+    def _build_view(self, columns, company, date_range=None, channel=None):
+        filtered = date_range is not None or channel is not None
+        if company is not None:
+            # one client's rows, read with pushdown
+            df = prepare_dataset(query_campaigns(columns, company=company, date_range=date_range,
+                                                 channel=channel, base_path=BASE_PATH), compact=False)
+            if columns is not None:
+                # the requested columns in their order, as the in-memory views
+                df = df[[c for c in dict.fromkeys(columns) if c in df.columns]]
+            if COMPACT_SCHEMA:
+                df = conform_dtypes(df, self.dtypes())
+        else:
+            names = [c for c in dict.fromkeys(columns or self.schema.names) if c in self.schema.names]
+            df = self.schema.empty_table().select(names).to_pandas()
+            h = hashlib.blake2b(digest_size=16)
+            h.update(repr((self.fingerprint, list(df.columns), None)).encode())
+            df.attrs['fingerprint']       = h.hexdigest()
+            df.attrs['fingerprint_shape'] = df.shape
+            df.attrs['out_of_core']       = True
+
+        # the ledger's cube only matches unfiltered rows
+        if not filtered and all(c in df.columns for c in self.ledger.dims + self.ledger.metrics):
+            put_cube(df, self.cube(company))
+        return df
+
+
+# ==============================
+# Record Batches
+# ==============================
+# The base file is read one row group at a time (a dataset scanner reads
+# ahead across the whole file); the store's small partition files are
+# scanned as a dataset.
+def _names(columns, schema):
+    return [c for c in columns if c in schema.names]
+
+
+# ── The per-row part of prepare_dataset(): derived CTR / Month, CTR width ──
+def _prepare_batch(batch):
+    count('rows_scanned', batch.num_rows)
+    df = batch.to_pandas()
+    if 'CTR' not in df.columns and 'Clicks' in df.columns and 'Impressions' in df.columns:
+        df['CTR'] = (df['Clicks'] / df['Impressions'] * 100).round(2)
+        if COMPACT_SCHEMA:
+            df['CTR'] = df['CTR'].astype(np.float32)
+    if 'Month' not in df.columns and 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date'])
+        df['Month'] = df['Date'].dt.month
+    return df
+
+
+def stream_batches(columns, base_path=BASE_PATH):
+    base = pq.ParquetFile(base_path)
+    schema = base.schema_arrow
+    replaced = None
+    with reading():
+        ids = stored_ids() if 'Campaign_ID' in schema.names else None
+    if ids is not None and len(ids):
+        replaced = ids.cast(schema.field('Campaign_ID').type, safe=False)
+
+    names = _names(columns, schema)
+    read  = names + ['Campaign_ID'] if replaced is not None and 'Campaign_ID' not in names else names
+    for batch in base.iter_batches(batch_size=STREAM_BATCH_ROWS, columns=read):
+        if replaced is not None:
+            # a stored upload replaces the base row with the same Campaign_ID
+            batch = batch.filter(pc.invert(pc.is_in(batch.column('Campaign_ID'), value_set=replaced)))
+            batch = batch.select(names)
+        if batch.num_rows:
+            yield _prepare_batch(batch)
+
+    with reading():
+        store = open_store()
+        if store is not None:
+            scanner = store.scanner(columns=_names(columns, store.schema), batch_size=STREAM_BATCH_ROWS,
+                                    batch_readahead=1, fragment_readahead=1)
+            for batch in scanner.to_batches():
+                if batch.num_rows:
+                    yield _prepare_batch(batch)
+
+
+# ── Cells of every batch, merged every MERGE_EVERY batches ──
+def _fold(frames, reduce, dims, metrics):
+    pending = []
+    for df in frames:
+        pending.append(reduce(df))
+        if len(pending) >= MERGE_EVERY:
+            pending = [merge_cells(pending, dims, metrics)]
+    return merge_cells(pending, dims, metrics) if pending else None
+
+
+# ==============================
+# Streamed Column Types
+# ==============================
+# What compact_dataset() would make of each whole column, from per-batch
+# summaries: the value range of integers, whether floats round-trip through
+# float32, and the distinct values of strings, kept only while there are
+# few enough of them to become a categorical.
+def _summarise(col, limit):
+    if pd.api.types.is_object_dtype(col.dtype) or pd.api.types.is_string_dtype(col.dtype):
+        values = set(col.dropna().unique().tolist())
+        return {'kind': 'text', 'values': values if len(values) <= limit else None}
+    if pd.api.types.is_bool_dtype(col.dtype) or not pd.api.types.is_numeric_dtype(col.dtype):
+        return {'kind': 'keep', 'dtype': col.dtype}
+    if col.dtype == np.float32:
+        return {'kind': 'float32'}
+    values = col.to_numpy()
+    present = values[~np.isnan(values)] if pd.api.types.is_float_dtype(col.dtype) else values
+    return {
+        'kind':  'int' if pd.api.types.is_integer_dtype(col.dtype) else 'float',
+        'lo':    present.min() if len(present) else None,
+        'hi':    present.max() if len(present) else None,
+        'f32':   np.array_equal(values.astype(np.float32).astype(np.float64), values.astype(np.float64),
+                                equal_nan=True),
+    }
+
+
+def _combine(a, b, limit):
+    if a['kind'] != b['kind']:
+        # integers of one batch, floats (nulls) of another: floats overall
+        if {a['kind'], b['kind']} == {'int', 'float'}:
+            a, b = dict(a, kind='float'), dict(b, kind='float')
+        else:
+            return {'kind': 'keep', 'dtype': np.dtype(object)}
+    if a['kind'] == 'text':
+        if a['values'] is None or b['values'] is None:
+            return {'kind': 'text', 'values': None}
+        values = a['values'] | b['values']
+        return {'kind': 'text', 'values': values if len(values) <= limit else None}
+    if a['kind'] in ('int', 'float'):
+        bounds = [v for v in (a['lo'], b['lo'], a['hi'], b['hi']) if v is not None]
+        return {'kind': a['kind'], 'lo': min(bounds, default=None), 'hi': max(bounds, default=None),
+                'f32': a['f32'] and b['f32']}
+    return a
+
+
+def _dtype(summary):
+    kind = summary['kind']
+    if kind == 'text':
+        if summary['values'] is None:
+            return np.dtype(object)
+        return pd.CategoricalDtype(pd.Index(list(summary['values'])).sort_values())
+    if kind == 'int':
+        if summary['lo'] is None:
+            return np.dtype(np.int64)
+        return pd.to_numeric(pd.Series([summary['lo'], summary['hi']]), downcast='integer').dtype
+    if kind == 'float':
+        return np.dtype(np.float32 if summary['f32'] else np.float64)
+    if kind == 'float32':
+        return np.dtype(np.float32)
+    return summary['dtype']
+
+
+def stream_dtypes(columns, rows, base_path=BASE_PATH):
+    limit = max(1, rows * CATEGORY_MAX_RATIO)
+    summaries = {}
+    for df in stream_batches(columns, base_path):
+        for name in df.columns:
+            summary = _summarise(df[name], limit)
+            summaries[name] = summary if name not in summaries else _combine(summaries[name], summary, limit)
+    return {name: _dtype(summary) for name, summary in summaries.items()}
+
+
+def conform_dtypes(df, dtypes):
+    out = {}
+    for name in df.columns:
+        col, dtype = df[name], dtypes.get(name)
+        if dtype is not None and col.dtype != dtype:
+            if isinstance(dtype, pd.CategoricalDtype) and isinstance(col.dtype, pd.CategoricalDtype):
+                col = col.astype(object)
+            col = col.astype(dtype)
+        out[name] = col
+    conformed = pd.DataFrame(out, index=df.index)
+    conformed.attrs.update(df.attrs)
+    conformed.attrs.pop('fingerprint', None)
+    dataset_fingerprint(conformed)
+    return conformed
+
+
+# ==============================
+# Streamed Ledger
+# ==============================
+# the cube layout of the prepared frame: CTR and Month are derived when missing
+def _layout(schema):
+    names = set(schema.names)
+    if {'Clicks', 'Impressions'} <= names:
+        names.add('CTR')
+    if 'Date' in names:
+        names.add('Month')
+    dims    = [d for d in CUBE_DIMS if d in names]
+    metrics = [m for m in SUM_METRICS + MEAN_METRICS if m in names]
+    return dims, metrics
+
+
+def stream_ledger(fingerprint, files, schema, base_path=BASE_PATH):
+    dims, metrics = _layout(schema)
+    rows = 0
+
+    def reduce(df):
+        nonlocal rows
+        rows += len(df)
+        return partition_cells(df, dims, metrics)
+
+    partials = _fold(stream_batches(LEDGER_COLUMNS, base_path), reduce, dims + [PARTITION_DIM], metrics)
+    if partials is None:
+        return None, 0
+    return CubeLedger(fingerprint, partials, dims, metrics, files), rows
+
+
+def _schema(base_path=BASE_PATH):
+    schema = pq.read_schema(base_path)
+    with reading():
+        store = open_store()
+        if store is not None:
+            extra = [f for f in store.schema if f.name not in schema.names and f.name != 'YearMonth']
+            for field in extra:
+                schema = schema.append(field)
+    return schema
+
+
+# ── The streamed dataset, rebuilt when the base file or store changes;
+#    None when the data has no Company / Date to build a ledger from ──
+def get_streamed_dataset():
+    global _current
+    token = source_token()
+    if _current is not None and _current.token == token:
+        return _current
+
+    with _lock:
+        if _current is not None and _current.token == token:
+            return _current
+        schema = _schema(BASE_PATH)
+        if 'Company' not in schema.names or 'Date' not in schema.names:
+            return None
+        files = partition_files()
+        fingerprint = hashlib.blake2b(repr(('streamed', token)).encode(), digest_size=16).hexdigest()
+        ledger, rows = stream_ledger(fingerprint, files, schema, BASE_PATH)
+        if ledger is None:
+            return None
+        _current = StreamedDataset(token, ledger, rows, schema)
+        _VIEWS.clear()
+        return _current
+
+
+# ── Decoded size of the base file, from its Parquet footer ──
+def uncompressed_mb(path=BASE_PATH):
+    stat = os.stat(path)
+
+    def build():
+        meta = pq.ParquetFile(path).metadata
+        return sum(meta.row_group(i).total_byte_size for i in range(meta.num_row_groups)) / 1024 ** 2
+
+    return _SIZES.get_or_build((os.path.abspath(path), stat.st_mtime_ns, stat.st_size), build)
+
+
+def get_dataset():
+    if OUT_OF_CORE_MB and uncompressed_mb(BASE_PATH) > OUT_OF_CORE_MB:
+        dataset = get_streamed_dataset()
+        if dataset is not None:
+            return dataset
+    return get_base_dataset()
+
+
+# ==============================
+# Streamed Success Probabilities
+# ==============================
+# Every batch is scored and reduced to probability sums and counts per
+# Company × Channel; the roll-ups are success_by() of the whole dataset.
+def streamed_success(bundle):
+    dataset = get_streamed_dataset()
+
+    def build():
+        dims = [d for d in SUCCESS_DIMS if d in dataset.schema.names]
+
+        def reduce(df):
+            frame = pd.DataFrame({d: df[d] for d in dims})
+            frame[SUCCESS_METRIC] = score_campaigns(df, bundle).to_numpy()
+            return build_cells(frame, dims, [SUCCESS_METRIC])
+
+        cells = _fold(stream_batches(PAGE_COLUMNS['ai'], BASE_PATH), reduce, dims, [SUCCESS_METRIC])
+        cube = AggregateCube(cells, dims, [SUCCESS_METRIC])
+        return {dim: cube.by(dim)[[dim, SUCCESS_METRIC]] for dim in dims}
+
+    return _SUCCESS.get_or_build((dataset.fingerprint, bundle.version), build)
@@ -0,0 +1,474 @@
+import os
+import re
+from modules.cache import LRUCache
+from modules.translator import get_text
+
+# ==============================
+# Theme Palette & Render Bundle
+# ==============================
+# One palette per theme, shared by app.py, the pages and the figure cache.
+# The page CSS and the HTML card templates are compiled once per
+# (theme, lang): theme colors and translated labels are substituted and the
+# markup is minified up front, so a rerun only fills in the data values.
+STYLE_PATH = 'assets/style.css'
+
+PALETTES = {
+    'dark': {
+        'template':     "plotly_dark",
+        'bg_color':     "rgba(0,0,0,0)",
+        'accent':       "#E91E8C",
+        'accent2':      "#FF6B35",
+        'accent3':      "#9C27B0",
+        'text_color':   "#FFFFFF",
+        'subtext':      "#9988BB",
+        'card_bg':      "rgba(233,30,140,0.06)",
+        'border':       "rgba(233,30,140,0.2)",
+        'glass_card':   "rgba(255,255,255,0.04)",
+        'glass_border': "rgba(233,30,140,0.2)",
+        'app_bg':       "linear-gradient(135deg,#0D0520 0%,#12062A 60%,#0D0520 100%)",
+        'block_bg':     "rgba(18,6,42,0.55)",
+        'sidebar_bg':   "rgba(10,3,24,0.75)",
+    },
+    'light': {
+        'template':     "plotly_white",
+        'bg_color':     "rgba(255,255,255,0.6)",
+        'accent':       "#C2185B",
+        'accent2':      "#E64A19",
+        'accent3':      "#7B1FA2",
+        'text_color':   "#1A0A2E",
+        'subtext':      "#6A4080",
+        'card_bg':      "rgba(194,24,91,0.05)",
+        'border':       "rgba(194,24,91,0.2)",
+        'glass_card':   "rgba(255,255,255,0.55)",
+        'glass_border': "rgba(233,30,140,0.25)",
+        'app_bg':       "linear-gradient(135deg,#F5EEF8 0%,#EDE0F5 100%)",
+        'block_bg':     "rgba(240,232,248,0.55)",
+        'sidebar_bg':   "rgba(220,200,240,0.65)",
+    },
+}
+
+# order the pages unpack their theme settings in
+PAGE_VARS = ('template', 'bg_color', 'accent', 'accent2', 'accent3',
+             'text_color', 'subtext', 'card_bg', 'border')
+
+
+def get_palette(theme):
+    return PALETTES['dark'] if theme == 'dark' else PALETTES['light']
+
+
+def theme_vars(theme):
+    palette = get_palette(theme)
+    return tuple(palette[name] for name in PAGE_VARS)
+
+
+# ==============================
+# Page CSS
+# ==============================
+FORCE_SIDEBAR_CSS = """
+[data-testid="stSidebar"] {
+    display: block !important;
+    visibility: visible !important;
+    transform: none !important;
+    z-index: 99998 !important;
+    min-width: 240px !important;
+}
+
+[data-testid="collapsedControl"] {
+    display: flex !important;
+    visibility: visible !important;
+    opacity: 1 !important;
+    background: linear-gradient(135deg, #E91E8C, #9C27B0) !important;
+    border-radius: 0 12px 12px 0 !important;
+    border: none !important;
+    width: 30px !important;
+    height: 60px !important;
+    position: fixed !important;
+    left: 0 !important;
+    top: 50% !important;
+    transform: translateY(-50%) !important;
+    z-index: 999999 !important;
+    align-items: center !important;
+    justify-content: center !important;
+    box-shadow: 4px 0 20px rgba(233,30,140,0.6) !important;
+    cursor: pointer !important;
+}
+
+[data-testid="collapsedControl"] svg {
+    fill: white !important;
+    color: white !important;
+    display: block !important;
+    width: 16px !important;
+    height: 16px !important;
+}
+
+button[kind="header"] {
+    display: flex !important;
+    visibility: visible !important;
+    opacity: 1 !important;
+}
+
+@media screen and (max-width: 768px) {
+    [data-testid="stFileUploader"] {
+        padding: 16px 12px !important;
+    }
+    [data-testid="stFileUploader"] > div {
+        font-size: 0.82rem !important;
+    }
+}
+"""
+
+THEME_CSS = """
+.stApp {{
+    background: {app_bg} !important;
+    color: {text_color} !important;
+}}
+
+.block-container {{
+    background: {block_bg} !important;
+}}
+
+[data-testid="stSidebar"] {{
+    background: {sidebar_bg} !important;
+}}
+
+[data-testid="stMetricValue"] {{
+    background: linear-gradient(135deg, {accent2}, {accent});
+    -webkit-background-clip: text !important;
+    -webkit-text-fill-color: transparent !important;
+    background-clip: text !important;
+}}
+
+[data-testid="stMetricLabel"] {{
+    color: {subtext} !important;
+}}
+
+[data-testid="collapsedControl"] {{
+    background: linear-gradient(135deg, {accent}, {accent3}) !important;
+}}
+
+.stButton > button {{
+    background: linear-gradient(135deg, {accent} 0%, {accent3} 100%) !important;
+}}
+"""
+
+_BUNDLE = LRUCache(maxsize=128)
+
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    return css.replace(': ', ':').replace(';}', '}').strip()
+
+
+def minify_html(html):
+    return re.sub(r'>\s+<', '><', re.sub(r'\s+', ' ', html)).strip()
+
+
+# ── The whole <style> block of a theme: style.css, the sidebar rules and
+#    the theme colors. Recompiled only when style.css changes ──
+def page_css(theme):
+    mtime = os.path.getmtime(STYLE_PATH) if os.path.exists(STYLE_PATH) else None
+    key   = ('css', theme, mtime)
+    css   = _BUNDLE.get(key)
+    if css is None:
+        base = ''
+        if mtime is not None:
+            with open(STYLE_PATH) as f:
+                base = f.read()
+        css = _BUNDLE.put(key, '<style>' + minify_css(
+            base + FORCE_SIDEBAR_CSS + THEME_CSS.format(**get_palette(theme))
+        ) + '</style>')
+    return css
+
+
+# ==============================
+# HTML Card Templates
+# ==============================
+# Theme colors are {name}, translated labels {t[key]}; {{field}} stays a
+# placeholder for the data filled in on every rerun.
+TEMPLATES = {
+    # ── Sidebar ──
+    'sidebar.logo': """
+        <div style='text-align:center; padding:16px 0;'>
+            <span style='font-family:Syne,sans-serif; font-size:1.3rem;
+                         font-weight:800;
+                         background:linear-gradient(135deg,{accent2},{accent});
+                         -webkit-background-clip:text;
+                         -webkit-text-fill-color:transparent;'>AI-Marketing</span>
+            <span style='font-family:Syne,sans-serif; font-size:0.9rem; color:{subtext};
+                         display:block; letter-spacing:5px;'>PREDICTOR</span>
+        </div>""",
+
+    'sidebar.label': """
+        <p style='color:{subtext}; font-size:0.70rem; text-transform:uppercase;
+                  letter-spacing:2px; margin:0 0 {{gap}}px 0;'>{{icon}} {{label}}</p>""",
+
+    'sidebar.stats': """
+        <div style='background:{glass_card}; backdrop-filter:blur(12px);
+                    border:1px solid {glass_border}; border-radius:14px;
+                    padding:16px; margin-bottom:12px;'>
+            <p style='color:{subtext}; font-size:0.68rem; text-transform:uppercase;
+                      letter-spacing:2px; margin:0 0 10px 0;'>
+                &#128225; {t[live_stats]}
+            </p>
+            <p style='font-size:1.4rem; font-weight:800; font-family:Syne,sans-serif;
+                      margin:0; line-height:1;
+                      background:linear-gradient(135deg,{accent2},{accent});
+                      -webkit-background-clip:text; -webkit-text-fill-color:transparent;'>
+                {{rows:,}}
+            </p>
+            <p style='color:{subtext}; font-size:0.70rem; margin:2px 0 12px 0;'>
+                {t[total_records]}
+            </p>
+            <p style='font-size:1.4rem; font-weight:800; font-family:Syne,sans-serif;
+                      margin:0; line-height:1;
+                      background:linear-gradient(135deg,{accent},{accent3});
+                      -webkit-background-clip:text; -webkit-text-fill-color:transparent;'>
+                {{clients}}
+            </p>
+            <p style='color:{subtext}; font-size:0.70rem; margin:2px 0 0 0;'>
+                {t[active_clients]}
+            </p>
+        </div>""",
+
+    'sidebar.owner': """
+        <div style='background:{glass_card}; backdrop-filter:blur(12px);
+                    border:1px solid {glass_border}; border-top:2px solid {accent};
+                    border-radius:14px; padding:14px; margin-bottom:12px;'>
+            <p style='color:{subtext}; font-size:0.66rem; text-transform:uppercase;
+                      letter-spacing:2px; margin:0 0 6px 0;'>
+                &#128100; {t[owner]}
+            </p>
+            <p style='font-size:0.92rem; font-weight:700;
+                      font-family:Syne,sans-serif; margin:0;
+                      background:linear-gradient(135deg,{accent2},{accent});
+                      -webkit-background-clip:text; -webkit-text-fill-color:transparent;'>
+                ENG. Shadya Dief
+            </p>
+        </div>""",
+
+    'sidebar.social': """
+        <div style='background:{glass_card}; backdrop-filter:blur(12px);
+                    border:1px solid {glass_border}; border-radius:14px; padding:14px;'>
+            <p style='color:{subtext}; font-size:0.66rem; text-transform:uppercase;
+                      letter-spacing:2px; margin:0 0 10px 0;'>
+                &#128279; {t[follow_us]}
+            </p>
+            <a href='https://www.linkedin.com/in/shadya-dief-ml/'
+               target='_blank'
+               style='display:flex; align-items:center; gap:10px;
+                      text-decoration:none; padding:8px 10px;
+                      border-radius:10px; margin-bottom:8px;
+                      background:rgba(233,30,140,0.06);
+                      border:1px solid rgba(233,30,140,0.2);'>
+                <span style='font-size:1.2rem;'>&#128101;</span>
+                <div>
+                    <p style='margin:0; font-size:0.80rem; font-weight:700;
+                              color:{text_color};'>Shadya Dief</p>
+                    <p style='margin:0; font-size:0.68rem; color:{subtext};'>LinkedIn</p>
+                </div>
+            </a>
+            <a href='https://github.com/Shadyadief/AI-Marketing-Predictor/tree/main'
+               target='_blank'
+               style='display:flex; align-items:center; gap:10px;
+                      text-decoration:none; padding:8px 10px;
+                      border-radius:10px;
+                      background:rgba(156,39,176,0.08);
+                      border:1px solid rgba(156,39,176,0.25);'>
+                <span style='font-size:1.2rem;'>&#128736;</span>
+                <div>
+                    <p style='margin:0; font-size:0.80rem; font-weight:700;
+                              color:{accent3};'>AI-Marketing-Predictor</p>
+                    <p style='margin:0; font-size:0.68rem; color:{subtext};'>GitHub</p>
+                </div>
+            </a>
+        </div>""",
+
+    'sidebar.footer': """
+        <div style='text-align:center; padding:8px 0;'>
+            <p style='color:{subtext}; font-size:0.62rem; margin:0; letter-spacing:1px;'>
+                BUILT WITH &#10024; BY SHADYA DIEF
+            </p>
+            <p style='font-size:0.72rem; font-weight:700;
+                      font-family:Syne,sans-serif; margin:3px 0 0 0;
+                      background:linear-gradient(135deg,{accent2},{accent},{accent3});
+                      -webkit-background-clip:text; -webkit-text-fill-color:transparent;'>
+                AI-Marketing-Predictor
+            </p>
+        </div>""",
+
+    # ── Pages ──
+    'banner': """
+        <div style='background:linear-gradient(135deg, rgba(233,30,140,0.08), rgba(156,39,176,0.06));
+                    border:1px solid {border};
+                    border-radius:16px; padding:22px 28px; margin-bottom:24px;
+                    backdrop-filter:blur(12px);'>
+            <h1 style='font-family:Syne,sans-serif; font-size:1.8rem; font-weight:800;
+                       background:linear-gradient(135deg, {accent2}, {accent}, {accent3});
+                       -webkit-background-clip:text; -webkit-text-fill-color:transparent;
+                       background-clip:text; margin:0;'>
+                {{icon}} {{title}}
+            </h1>
+            <p style='color:{accent}; font-size:0.78rem; letter-spacing:2px;
+                      text-transform:uppercase; margin:4px 0 0 0;'>
+                {{subtitle}}
+            </p>
+        </div>""",
+
+    'section': """
+        <p style='color:{accent}; font-size:0.75rem; text-transform:uppercase;
+                  letter-spacing:2px; font-weight:700;'>{{label}}</p>""",
+
+    'section.block': """
+        <p style='color:{accent}; font-size:0.75rem; text-transform:uppercase;
+                  letter-spacing:2px; font-weight:700; {{margin}};'>
+            {{label}}
+        </p>""",
+
+    'divider': "<hr style='border-color:{border}; opacity:0.5;'>",
+
+    'divider.solid': "<hr style='border-color:{border};'>",
+
+    'note': """
+        <div style='background:{card_bg}; border:1px solid {border};
+                    border-radius:12px; padding:14px 18px; margin-bottom:20px;'>
+            <p style='color:{subtext}; font-size:0.82rem; margin:0;'>
+                {{text}}
+            </p>
+        </div>""",
+
+    'stat.card': """
+        <div style='background:{card_bg}; border:1px solid {border};
+                    border-top:3px solid {{color}};
+                    border-radius:12px; padding:16px; text-align:center;'>
+            <p style='color:{subtext}; font-size:0.68rem; text-transform:uppercase;
+                      letter-spacing:1.5px; margin:0 0 6px 0;'>{{label}}</p>
+            <p style='color:{{color}}; font-size:1.0rem; font-weight:800;
+                      font-family:Syne,sans-serif; margin:0;'>{{icon}} {{value}}</p>
+        </div>""",
+
+    'stat.summary': """
+        <div style='background:{card_bg}; border:1px solid {border};
+                    border-top:3px solid {{color}};
+                    border-radius:12px; padding:14px; text-align:center;
+                    backdrop-filter:blur(8px);'>
+            <p style='font-size:1.4rem; margin:0 0 4px 0;'>{{icon}}</p>
+            <p style='color:{{color}}; font-size:1rem; font-weight:800;
+                      font-family:Syne,sans-serif; margin:0;'>{{value}}</p>
+            <p style='color:{subtext}; font-size:0.65rem; text-transform:uppercase;
+                      letter-spacing:1px; margin:3px 0 0 0;'>{{label}}</p>
+        </div>""",
+
+    'client.header': """
+        <div style='background:linear-gradient(135deg, {card_bg}, rgba(0,0,0,0));
+                    border:1px solid {border}; border-left:4px solid {accent};
+                    border-radius:14px; padding:18px 24px; margin-bottom:20px;
+                    backdrop-filter:blur(10px);'>
+            <h2 style='font-family:Syne,sans-serif; font-size:1.4rem; font-weight:800;
+                       color:{text_color}; margin:0;'>📊 {{client}}</h2>
+            <p style='color:{subtext}; font-size:0.75rem; margin:4px 0 0 0;
+                      letter-spacing:1px;'>
+                {{rows:,}} campaigns &nbsp;|&nbsp;
+                {{platforms}} platforms &nbsp;|&nbsp;
+                {{goals}} goals
+            </p>
+        </div>""",
+
+    'client.pdf_info': """
+        <div style='padding:12px 16px; background:{card_bg};
+                    border:1px solid {border}; border-radius:10px;'>
+            <p style='color:{subtext}; font-size:0.78rem; margin:0;'>
+                📄 Generate a professional PDF report with KPIs, AI recommendations,
+                and campaign insights for <strong style='color:{accent};'>{{client}}</strong>
+            </p>
+        </div>""",
+
+    'ai.recommendation': """
+        <div style='background:{card_bg}; border:1px solid {border};
+                    border-left:4px solid {{color}};
+                    border-radius:14px; padding:16px 18px; margin-bottom:12px;
+                    backdrop-filter:blur(10px);'>
+            <div style='display:flex; align-items:flex-start; gap:12px;'>
+                <span style='font-size:1.4rem; line-height:1.2;'>{{icon}}</span>
+                <div>
+                    <p style='color:{text_color}; font-size:0.88rem; font-weight:700;
+                              font-family:Syne,sans-serif; margin:0 0 4px 0;'>
+                        {{title}}
+                    </p>
+                    <p style='color:{subtext}; font-size:0.76rem;
+                              margin:0; line-height:1.5;'>
+                        {{desc}}
+                    </p>
+                </div>
+            </div>
+        </div>""",
+
+    'ai.forecast': """
+        <div style='background:{card_bg}; border:1px solid {border};
+                    border-radius:14px; padding:18px;'>
+            <p style='color:{subtext}; font-size:0.68rem; text-transform:uppercase;
+                      letter-spacing:1.5px; margin:0 0 14px 0;'>
+                📊 Forecast
+            </p>
+            <p style='color:{subtext}; font-size:0.70rem; margin:0 0 4px 0;'>
+                {{months[0]}}
+            </p>
+            <p style='color:{accent}; font-size:1.2rem; font-weight:800;
+                      font-family:Syne,sans-serif; margin:0 0 12px 0;'>
+                {{rois[0]}}x
+            </p>
+            <p style='color:{subtext}; font-size:0.70rem; margin:0 0 4px 0;'>
+                {{months[1]}}
+            </p>
+            <p style='color:{accent}; font-size:1.2rem; font-weight:800;
+                      font-family:Syne,sans-serif; margin:0 0 12px 0;'>
+                {{rois[1]}}x
+            </p>
+            <p style='color:{subtext}; font-size:0.70rem; margin:0 0 4px 0;'>
+                {{months[2]}}
+            </p>
+            <p style='color:{accent}; font-size:1.2rem; font-weight:800;
+                      font-family:Syne,sans-serif; margin:0 0 16px 0;'>
+                {{rois[2]}}x
+            </p>
+            <div style='background:rgba(233,30,140,0.08);
+                        border-radius:8px; padding:10px;'>
+                <p style='color:{accent}; font-size:0.70rem;
+                          margin:0; text-align:center;'>
+                    Damped trend · φ {{phi:.2f}}
+                </p>
+            </div>
+        </div>""",
+
+    'upload.loaded': """
+        <div style='background:rgba(233,30,140,0.08); border:1px solid {border};
+                    border-radius:10px; padding:12px 16px; margin-bottom:12px;'>
+            <p style='color:{accent}; font-size:0.88rem; font-weight:700; margin:0;'>
+                ✅ الملف اتحمل! &nbsp; <span style='color:{subtext}'>{{rows:,}} صف</span>
+            </p>
+        </div>""",
+}
+
+
+class _Labels:
+
+    def __init__(self, lang):
+        self.lang = lang
+
+    def __getitem__(self, key):
+        return get_text(key, self.lang)
+
+
+def compile_template(name, theme, lang="en"):
+    key = (name, theme, lang)
+    compiled = _BUNDLE.get(key)
+    if compiled is None:
+        compiled = _BUNDLE.put(key, minify_html(
+            TEMPLATES[name].format(t=_Labels(lang), **get_palette(theme))
+        ))
+    return compiled
+
+
+def render(name, theme, lang="en", **values):
+    return compile_template(name, theme, lang).format(**values)
@@ -31,6 +31,15 @@ TRANSLATIONS = {
         "active_clients":       "العملاء النشطين",
         "owner":                "مهندسة المشروع",
         "follow_us":            "تابعنا",
+        "memory_usage":         "استهلاك الذاكرة",
+        "memory_mapped":        "نسخة واحدة في الذاكرة مشتركة بين كل الجلسات",
+        "import_times":         "أزمنة التحميل",
+        "explorer":             "مستكشف الحملات",
+        "all_clients":          "كل العملاء",
+        "sort_by":              "ترتيب حسب",
+        "rows_per_page":        "عدد الصفوف في الصفحة",
+        "page":                 "صفحة",
+        "no_rows":              "مفيش حملات مطابقة للفلاتر دي",
     },
     "en": {
         "dashboard_title":      "AI-Marketing-Predictor",
@@ -64,6 +73,15 @@ TRANSLATIONS = {
         "active_clients":       "Active Clients",
         "owner":                "Project Engineer",
         "follow_us":            "Follow Us",
+        "memory_usage":         "Memory Usage",
+        "memory_mapped":        "Memory-mapped, shared by all sessions",
+        "import_times":         "Import Times",
+        "explorer":             "Campaign Explorer",
+        "all_clients":          "All Clients",
+        "sort_by":              "Sort By",
+        "rows_per_page":        "Rows per Page",
+        "page":                 "Page",
+        "no_rows":              "No campaigns match these filters",
     }
 }
 
@@ -0,0 +1,122 @@
+import functools
+import numpy as np
+import pandas as pd
+import pytest
+from modules import store, query, base_dataset, cube_ledger
+from modules.aggregates import build_cube
+from modules.cube_ledger import build_ledger, PARTITION_DIM
+from modules.dataset import prepare_dataset
+
+
+def _campaigns(ids, companies, channels, dates, clicks, roi):
+    return pd.DataFrame({
+        'Campaign_ID':   ids,
+        'Company':       companies,
+        'Channel_Used':  channels,
+        'Campaign_Goal': 'Brand Awareness',
+        'Date':          pd.to_datetime(dates),
+        'Clicks':        clicks,
+        'Impressions':   1000,
+        'ROI':           roi,
+    })
+
+
+BASE = _campaigns(
+    [1, 2, 3, 4, 5, 6],
+    ['Acme', 'Acme', 'Acme', 'Globex', 'Globex', 'Initech'],
+    ['Facebook', 'Twitter', 'Facebook', 'Twitter', 'Facebook', 'Twitter'],
+    ['2024-01-05', '2024-01-20', '2024-02-03', '2024-01-11', '2024-03-09', '2024-02-14'],
+    [10, 20, 30, 40, 50, 60],
+    [1.0, 2.0, 3.0, 4.0, np.nan, 6.0],
+)
+
+
+@pytest.fixture(autouse=True)
+def base_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'campaigns.parquet')
+    BASE.to_parquet(path, index=False)
+    monkeypatch.setattr(store, 'STORE_DIR', str(tmp_path / 'store'))
+    monkeypatch.setattr(base_dataset, 'STORE_DIR', str(tmp_path / 'store'))
+    monkeypatch.setattr(base_dataset, 'ARROW_DIR', str(tmp_path / 'arrow'))
+    monkeypatch.setattr(base_dataset, 'BASE_PATH', path)
+    monkeypatch.setattr(base_dataset, 'query_campaigns',
+                        functools.partial(query.query_campaigns, base_path=path))
+    monkeypatch.setattr(base_dataset, '_current', None)
+    base_dataset._VIEWS.clear()
+    return path
+
+
+def _rebuild(path):
+    return prepare_dataset(query.query_campaigns(base_path=path))
+
+
+def _no_query(*args, **kwargs):
+    raise AssertionError("the base file was queried again instead of spliced")
+
+
+def _no_rebuild(dataset):
+    raise AssertionError("the ledger was rebuilt instead of refreshed")
+
+
+# row order within a client follows the store's file layout
+def _assert_same_rows(view, expected):
+    def rows(df):
+        return df[expected.columns].astype(object).sort_values(['Company', 'Campaign_ID'], ignore_index=True)
+    pd.testing.assert_frame_equal(rows(view), rows(expected))
+
+
+def _assert_same_cube(cube, expected):
+    assert cube.kpis() == pytest.approx(expected.kpis(), nan_ok=True)
+    for dim in ['Company', 'Channel_Used']:
+        pd.testing.assert_frame_equal(cube.by(dim), expected.by(dim), check_dtype=False)
+
+
+def test_splice_matches_a_full_rebuild(base_path, monkeypatch):
+    before = base_dataset.get_base_dataset()
+    before.cube()
+    monkeypatch.setattr(base_dataset, 'query_campaigns', _no_query)
+
+    # campaign 2 replaced in place, 4 moved from Globex to Acme, 7 a new client
+    upload = _campaigns([2, 4, 7], ['Acme', 'Acme', 'Hooli'], ['Twitter', 'Facebook', 'Facebook'],
+                        ['2024-01-20', '2024-03-01', '2024-04-02'], [25, 400, 70], [2.5, 9.0, 7.0])
+    store.append_upload(upload, key='a')
+    with monkeypatch.context() as m:
+        m.setattr(cube_ledger, 'build_ledger', _no_rebuild)
+        after = base_dataset.get_base_dataset()
+
+    expected = _rebuild(base_path)
+    view = after.view()
+    assert sorted(view['Campaign_ID'].tolist()) == [1, 2, 3, 4, 5, 6, 7]
+    _assert_same_rows(view, expected)
+    assert after.index.offsets == {'Acme': (0, 4), 'Globex': (4, 5), 'Hooli': (5, 6), 'Initech': (6, 7)}
+    assert after.memory_before == before.memory_before * 7 // 6
+
+    _assert_same_cube(after.cube(), build_cube(expected))
+    rebuilt = build_ledger(after)
+    keys = ['Company', PARTITION_DIM, 'Channel_Used', 'Campaign_Goal', 'Month']
+    pd.testing.assert_frame_equal(after.ledger.partials.sort_values(keys, ignore_index=True),
+                                  rebuilt.partials.sort_values(keys, ignore_index=True),
+                                  check_dtype=False, check_categorical=False)
+
+    acme = after.view(['Campaign_ID', 'ROI'], company='Acme').sort_values('Campaign_ID')
+    assert acme['ROI'].tolist() == [1.0, 2.5, 3.0, 9.0]
+
+
+def test_upload_while_splicing_is_read_again(base_path, monkeypatch):
+    base_dataset.get_base_dataset()
+    store.append_upload(_campaigns([1], ['Acme'], ['Facebook'], ['2024-01-05'], [11], [1.5]), key='a')
+
+    splice = base_dataset._splice
+    late = _campaigns([8], ['Globex'], ['Twitter'], ['2024-05-01'], [80], [8.0])
+
+    def upload_during(previous, files):
+        # lands after the snapshot, once
+        store.append_upload(late, key='b')
+        return splice(previous, files)
+    monkeypatch.setattr(base_dataset, '_splice', upload_during)
+
+    dataset = base_dataset.get_base_dataset()
+    assert dataset.files == store.partition_files()
+    assert dataset.token == base_dataset.source_token()
+    assert 8 in dataset.view()['Campaign_ID'].tolist()
+    _assert_same_rows(dataset.view(), _rebuild(base_path))
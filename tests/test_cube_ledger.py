@@ -0,0 +1,107 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from modules import store, cube_ledger
+from modules.base_dataset import SharedDataset
+from modules.cube_ledger import build_ledger, refresh_ledger, PARTITION_DIM
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, 'STORE_DIR', str(tmp_path / 'store'))
+
+
+def _campaigns(ids, companies, channels, dates, clicks, roi):
+    return pd.DataFrame({
+        'Campaign_ID':  ids,
+        'Company':      companies,
+        'Channel_Used': channels,
+        'Date':         pd.to_datetime(dates),
+        'Clicks':       clicks,
+        'ROI':          roi,
+    })
+
+
+BASE = _campaigns(
+    [1, 2, 3, 4, 5, 6],
+    ['Acme', 'Acme', 'Acme', 'Globex', 'Globex', 'Initech'],
+    ['Facebook', 'Twitter', 'Facebook', 'Twitter', 'Facebook', 'Twitter'],
+    ['2024-01-05', '2024-01-20', '2024-02-03', '2024-01-11', '2024-03-09', '2024-02-14'],
+    [10, 20, 30, 40, 50, 60],
+    [1.0, 2.0, 3.0, 4.0, np.nan, 6.0],
+)
+
+
+# the rows the base dataset holds: base rows minus stored IDs, plus the store
+def _snapshot(rows, token):
+    rows = rows.sort_values('Company', kind='stable', ignore_index=True)
+    return SharedDataset(pa.Table.from_pandas(rows, preserve_index=False), token, None,
+                         store.partition_files())
+
+
+def _overlay(base, upload):
+    kept = base[~base['Campaign_ID'].isin(upload['Campaign_ID'])]
+    return pd.concat([kept, upload], ignore_index=True)
+
+
+def _sorted(partials):
+    keys = ['Company', PARTITION_DIM, 'Channel_Used']
+    return partials.sort_values(keys, ignore_index=True)[sorted(partials.columns)]
+
+
+def _no_rebuild(dataset):
+    raise AssertionError("refresh fell back to a full rebuild")
+
+
+def test_refresh_matches_full_rebuild_and_pandas(monkeypatch):
+    old = _snapshot(BASE, 'old')
+    ledger = build_ledger(old)
+    monkeypatch.setattr(cube_ledger, 'build_ledger', _no_rebuild)
+
+    # a new client month, plus campaign 4 moved from Globex/Jan to Acme/Mar
+    upload = _campaigns([4, 7], ['Acme', 'Acme'], ['Facebook', 'Twitter'],
+                        ['2024-03-01', '2024-04-02'], [400, 70], [9.0, 7.0])
+    store.append_upload(upload, key='a')
+    rows = _overlay(BASE, upload)
+    new = _snapshot(rows, 'new')
+
+    refreshed = refresh_ledger(ledger, old, new)
+    rebuilt = build_ledger(new)
+    pd.testing.assert_frame_equal(_sorted(refreshed.partials), _sorted(rebuilt.partials))
+
+    by_channel = refreshed.cube().by('Channel_Used').set_index('Channel_Used')
+    expected = rows.groupby('Channel_Used').agg(rows=('ROI', 'size'), Clicks=('Clicks', 'sum'),
+                                                ROI=('ROI', 'mean'))
+    assert by_channel['rows'].tolist() == expected['rows'].tolist()
+    assert by_channel['Clicks'].tolist() == expected['Clicks'].tolist()
+    assert by_channel['ROI'].tolist() == pytest.approx(expected['ROI'].tolist())
+
+    acme = refreshed.cube('Acme').kpis('Acme')
+    assert acme['rows'] == (rows['Company'] == 'Acme').sum()
+    assert acme['ROI'] == pytest.approx(rows.loc[rows['Company'] == 'Acme', 'ROI'].mean())
+
+
+def test_unchanged_store_reuses_the_partials():
+    old = _snapshot(BASE, 'old')
+    ledger = build_ledger(old)
+
+    refreshed = refresh_ledger(ledger, old, _snapshot(BASE, 'same'))
+    assert refreshed.partials is ledger.partials
+
+
+def test_partition_removed_after_the_snapshot_rebuilds(monkeypatch):
+    old = _snapshot(BASE, 'old')
+    ledger = build_ledger(old)
+
+    upload = _campaigns([4], ['Acme'], ['Facebook'], ['2024-03-01'], [400], [9.0])
+    store.append_upload(upload, key='a')
+    new = _snapshot(_overlay(BASE, upload), 'new')
+    for path in new.files:
+        os.remove(path)
+
+    rebuilt = []
+    monkeypatch.setattr(cube_ledger, 'build_ledger', lambda dataset: rebuilt.append(dataset) or 'rebuilt')
+    assert refresh_ledger(ledger, old, new) == 'rebuilt'
+    assert rebuilt == [new]
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.aggregates import build_cube
+from modules.forecast import fit_damped_trend, build_forecasts, ALPHAS, BETAS, PHIS
+
+
+# one series at a time, the textbook recursion over the same grid
+def _reference(y):
+    first = int(np.flatnonzero(~np.isnan(y))[0])
+    best = None
+    for alpha in ALPHAS:
+        for beta in BETAS:
+            for phi in PHIS:
+                level, trend, sse = y[first], 0.0, 0.0
+                for value in y[first + 1:]:
+                    predicted = level + phi * trend
+                    error = 0.0 if np.isnan(value) else value - predicted
+                    sse += error ** 2
+                    level = predicted + alpha * error
+                    trend = phi * trend + alpha * beta * error
+                if best is None or sse < best[0]:
+                    best = (sse, level, trend, alpha, beta, phi)
+    return best[1:]
+
+
+def test_batched_fit_matches_one_series_at_a_time():
+    rng = np.random.default_rng(7)
+    Y = np.vstack([
+        3.0 + 0.1 * np.arange(12) + rng.normal(0, 0.2, 12),
+        5.0 - 0.2 * np.arange(12) + rng.normal(0, 0.1, 12),
+        rng.normal(2.0, 0.5, 12),
+    ])
+    # a late start and a gap
+    Y[1, :3] = np.nan
+    Y[2, 6] = np.nan
+
+    level, trend, alpha, beta, phi = fit_damped_trend(Y)
+    for i, y in enumerate(Y):
+        assert (level[i], trend[i], alpha[i], beta[i], phi[i]) == pytest.approx(_reference(y))
+
+
+def test_constant_series_forecasts_itself_and_empty_series_nothing():
+    Y = np.array([[2.5] * 6, [np.nan] * 6])
+    level, trend, *_ = fit_damped_trend(Y)
+
+    assert level[0] == pytest.approx(2.5)
+    assert trend[0] == pytest.approx(0.0)
+    assert np.isnan(level[1])
+
+
+def test_history_is_the_pandas_monthly_mean():
+    rng = np.random.default_rng(3)
+    n = 400
+    df = pd.DataFrame({
+        'Company':      rng.choice(['Acme', 'Globex'], n),
+        'Channel_Used': rng.choice(['Facebook', 'Twitter'], n),
+        'Date':         pd.Timestamp('2023-11-01') + pd.to_timedelta(rng.integers(0, 150, n), unit='D'),
+        'ROI':          rng.gamma(2.0, 1.5, n),
+    })
+    # no campaigns in January: a gap, not a missing month
+    df = df[df['Date'].dt.month != 1]
+    forecasts = build_forecasts(build_cube(df))
+
+    monthly = df.groupby(df['Date'].dt.strftime('%Y-%m'))['ROI'].mean()
+    history = forecasts.history()
+    assert history['YearMonth'].tolist() == ['2023-11', '2023-12', '2024-01', '2024-02', '2024-03']
+    assert history['ROI'].dropna().tolist() == pytest.approx(monthly.tolist())
+    assert np.isnan(history['ROI'][2])
+    assert forecasts.next_months(2) == ['2024-04', '2024-05']
+
+    acme = df[(df['Company'] == 'Acme') & (df['Channel_Used'] == 'Twitter')]
+    expected = acme.groupby(acme['Date'].dt.strftime('%Y-%m'))['ROI'].mean()
+    assert forecasts.history('Acme', 'Twitter')['ROI'].dropna().tolist() == pytest.approx(expected.tolist())
+
+    # predict() continues the fitted level along the damped trend
+    params = forecasts.params()
+    level, trend, *_ = fit_damped_trend(history['ROI'].to_numpy()[None, :])
+    steps = np.cumsum(params['phi'] ** np.arange(1, 4))
+    assert forecasts.predict() == pytest.approx(level[0] + steps * trend[0])
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.groupby_engine import Spec, group_reduce, combine_codes, decode_codes
+
+
+def _campaigns():
+    return pd.DataFrame({
+        'Channel_Used': ['Facebook', 'Twitter', 'Facebook', None, 'Instagram', 'Twitter', 'Facebook'],
+        'Campaign_Goal': pd.Categorical(['Sales', 'Sales', 'Brand', 'Brand', None, 'Sales', 'Brand']),
+        'ROI':          [1.5, 2.0, np.nan, 4.0, 3.5, 0.5, 2.5],
+        'Clicks':       [10, 20, 30, 40, 50, 60, 70],
+    })
+
+
+def _by_label(series):
+    return {label: float(value) for label, value in series.items()}
+
+
+def _plain(values):
+    return [None if pd.isna(v) else v for v in values]
+
+
+@pytest.mark.parametrize('reducer', ['sum', 'mean', 'count', 'max', 'min'])
+@pytest.mark.parametrize('dim', ['Channel_Used', 'Campaign_Goal'])
+def test_group_reduce_matches_pandas(dim, reducer):
+    df = _campaigns()
+    result, = group_reduce(df, [Spec(dim, 'ROI', reducer)])
+
+    expected = getattr(df.groupby(dim, observed=True)['ROI'], reducer)()
+    assert _by_label(result.to_series()) == pytest.approx(_by_label(expected), nan_ok=True)
+
+
+def test_group_reduce_row_counts_match_pandas():
+    df = _campaigns()
+    counted, clicks = group_reduce(df, [Spec('Channel_Used', None, 'count'),
+                                        Spec('Channel_Used', 'Clicks', 'sum')])
+
+    grouped = df.groupby('Channel_Used')
+    assert counted.to_series().tolist() == grouped.size().tolist()
+    assert clicks.to_series().tolist() == grouped['Clicks'].sum().tolist()
+    assert clicks.values.dtype == np.int64
+
+
+def test_group_reduce_means_of_cells_are_row_means():
+    df = _campaigns()
+    cells = df.groupby(['Channel_Used', 'Campaign_Goal'], observed=True).agg(
+        ROI_sum=('ROI', 'sum'), ROI_n=('ROI', 'count'), rows=('ROI', 'size'),
+    ).reset_index()
+    mean, rows = group_reduce(cells, [Spec('Channel_Used', 'ROI', 'mean'),
+                                      Spec('Channel_Used', None, 'count')])
+
+    rows_with_goal = df.dropna(subset=['Campaign_Goal'])
+    expected = rows_with_goal.groupby('Channel_Used')['ROI'].mean()
+    assert _by_label(mean.to_series()) == pytest.approx(_by_label(expected))
+    assert rows.to_series().tolist() == rows_with_goal.groupby('Channel_Used').size().tolist()
+
+
+def test_group_reduce_best_and_worst():
+    result, = group_reduce(_campaigns(), [Spec('Channel_Used', 'ROI', 'mean')])
+
+    assert result.best == 'Instagram'
+    assert result.worst == 'Twitter'
+    assert result.best_value == pytest.approx(3.5)
+
+
+def test_group_reduce_rejects_unknown_reducers_and_extremes_of_cells():
+    df = _campaigns()
+    with pytest.raises(ValueError):
+        group_reduce(df, [Spec('Channel_Used', 'ROI', 'median')])
+
+    cells = pd.DataFrame({'Channel_Used': ['Facebook'], 'ROI_sum': [4.0], 'ROI_n': [2], 'rows': [2]})
+    with pytest.raises(ValueError):
+        group_reduce(cells, [Spec('Channel_Used', 'ROI', 'max')])
+
+
+def test_combine_codes_groups_like_pandas_keeping_missing_keys():
+    df = _campaigns()
+    dims = ['Channel_Used', 'Campaign_Goal']
+    combined, labels = combine_codes(df, dims)
+
+    # one code per distinct key pair, missing values included
+    expected = df.groupby(dims, dropna=False, observed=True).ngroups
+    assert len(np.unique(combined)) == expected
+
+    channels, goals = decode_codes(combined, labels)
+    assert _plain(channels) == _plain(df['Channel_Used'])
+    assert _plain(goals) == _plain(df['Campaign_Goal'])
@@ -0,0 +1,78 @@
+import io
+import pandas as pd
+import pytest
+from modules import ingest
+from modules.ingest import parse_dates, read_upload, AmbiguousDatesError, ColumnTypeError
+
+
+def test_month_first_dates():
+    col = pd.Series(['01/31/2024', '02/05/2024', None, '01/31/2024'])
+    expected = pd.to_datetime(col, format='%m/%d/%Y')
+
+    pd.testing.assert_series_equal(parse_dates(col), expected)
+
+
+def test_day_first_dates():
+    col = pd.Series(['31/01/2024', '05/02/2024', '13/12/2023'])
+    expected = pd.to_datetime(col, format='%d/%m/%Y')
+
+    pd.testing.assert_series_equal(parse_dates(col), expected)
+
+
+def test_dates_readable_both_ways_are_rejected():
+    col = pd.Series(['01/02/2024', '03/04/2024', '12/11/2024'])
+
+    with pytest.raises(AmbiguousDatesError, match='01/02/2024'):
+        parse_dates(col)
+
+
+def test_dates_equal_both_ways_are_accepted():
+    col = pd.Series(['01/01/2024', '07/07/2024'])
+    expected = pd.to_datetime(col, format='%m/%d/%Y')
+
+    pd.testing.assert_series_equal(parse_dates(col), expected)
+
+
+def test_other_formats_fall_back_to_pandas():
+    col = pd.Series(['2024-01-05 10:30', '2024-03-01 08:00', None], index=[10, 11, 12])
+    expected = pd.to_datetime(col)
+
+    pd.testing.assert_series_equal(parse_dates(col), expected)
+
+
+def _upload_csv(rows, note):
+    df = pd.DataFrame({
+        'Company':       'Acme',
+        'Channel_Used':  'Facebook',
+        'Campaign_Goal': 'Brand Awareness',
+        'Clicks':        range(rows),
+        'Impressions':   1000,
+        'ROI':           2.5,
+        'Date':          '2024-01-05',
+        'Spend':         [float(i) if i % 7 else None for i in range(rows)],
+        'Note':          note,
+    })
+    return df, io.BytesIO(df.to_csv(index=False).encode())
+
+
+def test_column_guessed_wrong_from_the_first_block(monkeypatch):
+    monkeypatch.setattr(ingest, 'CSV_BLOCK_SIZE', 4096)
+    note = [str(i) for i in range(2000)] + ['abc']
+    expected, file = _upload_csv(len(note), note)
+
+    df = read_upload(file, 'campaigns.csv')
+    assert df['Note'].astype(str).tolist() == note
+    assert df['Clicks'].tolist() == expected['Clicks'].tolist()
+    assert df['Spend'].dtype == 'float64'
+    pd.testing.assert_series_equal(df['Spend'], expected['Spend'])
+
+
+def test_required_column_that_does_not_convert(monkeypatch):
+    monkeypatch.setattr(ingest, 'CSV_BLOCK_SIZE', 4096)
+    df, _ = _upload_csv(2000, 'x')
+    df['Clicks'] = df['Clicks'].astype(object)
+    df.loc[1999, 'Clicks'] = 'many'
+    file = io.BytesIO(df.to_csv(index=False).encode())
+
+    with pytest.raises(ColumnTypeError, match='Clicks'):
+        read_upload(file, 'campaigns.csv')
@@ -0,0 +1,102 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from modules import jobs
+from modules.cache import LRUCache
+
+
+@pytest.fixture(autouse=True)
+def pool(monkeypatch):
+    # one worker, so a second job waits in the queue
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(jobs, '_pool', pool)
+    monkeypatch.setattr(jobs, '_JOBS', LRUCache(maxsize=8))
+    monkeypatch.setattr(jobs, '_BY_KEY', {})
+    yield pool
+    pool.shutdown(wait=True)
+
+
+class Blocking:
+
+    def __init__(self, result=None, error=None):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls   = 0
+        self.result  = result
+        self.error   = error
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        self.args = (args, kwargs)
+        self.started.set()
+        assert self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _wait(job_id):
+    jobs.get_job(job_id).future.exception(timeout=5)
+    return jobs.get_job(job_id)
+
+
+def test_status_goes_queued_running_done():
+    first, second = Blocking('a'), Blocking(b'pdf')
+    first_id = jobs.submit_job('first', first)
+    second_id = jobs.submit_job('second', second, 'Acme', lang='en', label='Acme report')
+
+    assert first.started.wait(5)
+    assert jobs.get_job(first_id).status == 'running'
+    assert jobs.get_job(second_id).status == 'queued'
+    assert jobs.get_job(second_id).result() is None
+
+    first.release.set()
+    assert second.started.wait(5)
+    assert _wait(first_id).status == 'done'
+    assert jobs.get_job(second_id).status == 'running'
+
+    second.release.set()
+    job = _wait(second_id)
+    assert job.status == 'done'
+    assert job.result() == b'pdf'
+    assert job.label == 'Acme report'
+    assert second.args == (('Acme',), {'lang': 'en'})
+    assert job.seconds >= 0
+
+
+def test_same_key_is_coalesced():
+    work = Blocking('report')
+    job_id = jobs.submit_job('acme-en', work)
+    assert work.started.wait(5)
+
+    # while running, and once finished
+    assert jobs.submit_job('acme-en', work) == job_id
+    work.release.set()
+    _wait(job_id)
+    assert jobs.submit_job('acme-en', work) == job_id
+    assert work.calls == 1
+
+    other = Blocking()
+    other.release.set()
+    assert jobs.submit_job('globex-en', other) != job_id
+
+
+def test_failed_job_is_retried():
+    failing = Blocking(error=RuntimeError('no fonts'))
+    failing.release.set()
+    failed_id = jobs.submit_job('acme-en', failing)
+    job = _wait(failed_id)
+    assert job.status == 'failed'
+    assert str(job.error) == 'no fonts'
+    assert job.result() is None
+
+    retry = Blocking('report')
+    retry.release.set()
+    retried_id = jobs.submit_job('acme-en', retry)
+    assert retried_id != failed_id
+    assert _wait(retried_id).result() == 'report'
+
+
+def test_unknown_job():
+    assert jobs.get_job(None) is None
+    assert jobs.get_job('missing') is None
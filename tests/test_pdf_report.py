@@ -0,0 +1,62 @@
+from datetime import datetime
+import pytest
+from benchmarks.generate import generate_chunk
+from modules import pdf_report
+from modules.cache import LRUCache
+from modules.dataset import prepare_dataset
+
+
+@pytest.fixture(autouse=True)
+def renders(monkeypatch):
+    monkeypatch.setattr(pdf_report, '_PDFS', LRUCache(maxsize=8))
+    calls = []
+    render = pdf_report.render_pdf
+
+    def counted(*args, **kwargs):
+        calls.append(args[1:3])
+        return render(*args, **kwargs)
+    monkeypatch.setattr(pdf_report, 'render_pdf', counted)
+    return calls
+
+
+def _client(roi_change=0.0):
+    raw = generate_chunk(0, 300, clients=2)
+    raw['ROI'] += roi_change
+    df = prepare_dataset(raw)
+    client = df['Company'].iloc[0]
+    return df[df['Company'] == client].reset_index(drop=True), client
+
+
+def test_same_report_is_rendered_once(renders):
+    df, client = _client()
+    pdf = pdf_report.generate_pdf(df, client, 'en')
+    assert pdf.startswith(b'%PDF')
+
+    assert pdf_report.generate_pdf(df, client, 'en') is pdf
+    # an equal frame loaded again has the same fingerprint
+    assert pdf_report.generate_pdf(_client()[0], client, 'en') is pdf
+    assert renders == [(client, 'en')]
+
+    pdf_report.generate_pdf(df, client, 'ar')
+    assert renders == [(client, 'en'), (client, 'ar')]
+
+
+def test_changed_data_or_day_is_a_new_report(renders, monkeypatch):
+    df, client = _client()
+    key = pdf_report.report_key(df, client, 'en')
+
+    # a frame is fingerprinted when it is loaded, so changed data is a new load
+    changed, _ = _client(roi_change=1.0)
+    assert pdf_report.report_key(changed, client, 'en') != key
+    assert pdf_report.report_key(df, 'Someone else', 'en') != key
+
+    class Tomorrow(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2099, 1, 2, 9, 0)
+    monkeypatch.setattr(pdf_report, 'datetime', Tomorrow)
+    assert pdf_report.report_key(df, client, 'en') != key
+
+    pdf_report.generate_pdf(df, client, 'en')
+    pdf_report.generate_pdf(changed, client, 'en')
+    assert len(renders) == 2
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import store
+from modules.query import query_campaigns, optimize_layout
+
+
+def _campaigns(ids, companies, channels, dates, roi):
+    return pd.DataFrame({
+        'Campaign_ID':  ids,
+        'Company':      companies,
+        'Channel_Used': channels,
+        'Date':         pd.to_datetime(dates, format='ISO8601'),
+        'ROI':          roi,
+    })
+
+
+BASE = _campaigns(
+    [1, 2, 3, 4, 5, 6],
+    ['Acme', 'Acme', 'Acme', 'Globex', 'Globex', 'Initech'],
+    ['Facebook', 'Twitter', 'Instagram', 'Twitter', 'Facebook', 'Twitter'],
+    ['2024-01-05', '2024-01-31 18:30', '2024-02-01', '2024-01-11', '2024-03-09', '2024-02-14'],
+    [1.0, 2.0, 3.0, 4.0, np.nan, 6.0],
+)
+
+
+@pytest.fixture(autouse=True)
+def base_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, 'STORE_DIR', str(tmp_path / 'store'))
+    path = str(tmp_path / 'campaigns.parquet')
+    BASE.to_parquet(path, index=False)
+    # row groups of two rows, so statistics can skip some
+    optimize_layout(path, row_group_size=2)
+    return path
+
+
+def _sorted(df):
+    return df.sort_values('Campaign_ID', ignore_index=True)
+
+
+def test_filters_match_pandas(base_path):
+    date_range = (pd.Timestamp('2024-01-10'), pd.Timestamp('2024-01-31'))
+    channels = ['Twitter', 'Instagram']
+
+    loaded = query_campaigns(['Company', 'ROI'], date_range=date_range, channel=channels, base_path=base_path)
+    dates = BASE['Date'].dt.normalize()
+    expected = BASE[dates.between(*date_range) & BASE['Channel_Used'].isin(channels)]
+    assert sorted(loaded.columns) == ['Company', 'ROI']
+    assert sorted(loaded['ROI'].tolist()) == sorted(expected['ROI'].tolist()) == [2.0, 4.0]
+
+    acme = query_campaigns(company='Acme', channel='Facebook', base_path=base_path)
+    pd.testing.assert_frame_equal(_sorted(acme), _sorted(BASE[(BASE['Company'] == 'Acme')
+                                                               & (BASE['Channel_Used'] == 'Facebook')]))
+
+
+def test_stored_ids_replace_base_rows(base_path):
+    # 2 is replaced in place, 4 moves to another month outside the filter
+    upload = _campaigns([2, 4], ['Acme', 'Globex'], ['Twitter', 'Twitter'],
+                        ['2024-01-20', '2024-04-02'], [9.0, 8.0])
+    store.append_upload(upload, key='a')
+
+    january = query_campaigns(['Campaign_ID', 'ROI'], date_range=('2024-01-01', '2024-01-31'),
+                              base_path=base_path)
+    assert _sorted(january)['Campaign_ID'].tolist() == [1, 2]
+    assert _sorted(january)['ROI'].tolist() == [1.0, 9.0]
+
+    everything = _sorted(query_campaigns(base_path=base_path))
+    assert everything['Campaign_ID'].tolist() == [1, 2, 3, 4, 5, 6]
+    assert everything['ROI'].tolist()[:4] == [1.0, 9.0, 3.0, 8.0]
+
+    # the projection drops the Campaign_ID read for the overlay
+    assert list(query_campaigns(['ROI'], base_path=base_path).columns) == ['ROI']
+
+
+def test_filter_on_a_missing_column_matches_nothing(tmp_path):
+    path = str(tmp_path / 'undated.parquet')
+    BASE.drop(columns=['Date', 'Channel_Used']).to_parquet(path, index=False)
+
+    assert query_campaigns(date_range=('2024-01-01', '2024-12-31'), base_path=path).empty
+    assert query_campaigns(channel='Twitter', base_path=path).empty
+    assert len(query_campaigns(company='Acme', base_path=path)) == 3
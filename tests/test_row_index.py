@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.row_index import query_rows, page_rows, column_values, column_range
+
+
+def _campaigns():
+    return pd.DataFrame({
+        'Campaign_ID':  np.arange(1, 11),
+        'Company':      ['Acme', 'Globex', 'Acme', 'Initech', 'Globex',
+                         'Acme', 'Initech', 'Globex', 'Acme', 'Initech'],
+        'Channel_Used': pd.Categorical(['Facebook', 'Twitter', 'Instagram', 'Facebook', None,
+                                        'Twitter', 'Facebook', 'Instagram', 'Twitter', 'Facebook']),
+        'ROI':          [2.5, 1.0, np.nan, 4.0, 2.5, 0.5, 3.0, np.nan, 5.5, 2.5],
+    })
+
+
+# sorted by client with the attr prepare_dataset sets, as the explorer gets it
+def _by_company():
+    df = _campaigns().sort_values('Company', kind='stable', ignore_index=True)
+    df.attrs['sorted_by'] = 'Company'
+    return df
+
+
+def _ids(df, positions):
+    return df['Campaign_ID'].to_numpy()[positions].tolist()
+
+
+def test_in_and_between_filters_match_pandas():
+    df = _campaigns()
+    filters = (('Channel_Used', 'in', ('Facebook', 'Twitter')), ('ROI', 'between', (1.0, 4.0)))
+
+    expected = df[df['Channel_Used'].isin(['Facebook', 'Twitter']) & df['ROI'].between(1.0, 4.0)]
+    assert _ids(df, query_rows(df, filters)) == expected['Campaign_ID'].tolist()
+
+
+def test_company_filter_on_sorted_frame_matches_pandas():
+    df = _by_company()
+    filters = (('Company', 'in', ('Globex', 'Acme', 'Unknown')),)
+
+    expected = df[df['Company'].isin(['Globex', 'Acme'])]
+    assert _ids(df, query_rows(df, filters)) == expected['Campaign_ID'].tolist()
+    assert query_rows(df, (('Company', 'in', ('Unknown',)),)).size == 0
+
+
+@pytest.mark.parametrize('descending', [False, True])
+@pytest.mark.parametrize('column', ['ROI', 'Channel_Used', 'Company'])
+def test_sort_matches_pandas_with_missing_last(column, descending):
+    df = _campaigns()
+    filters = (('ROI', 'between', (0.0, 5.0)),) if column != 'ROI' else ()
+
+    rows = df[df['ROI'].between(0.0, 5.0)] if filters else df
+    expected = rows.sort_values(column, ascending=not descending, kind='stable', na_position='last')
+    assert _ids(df, query_rows(df, filters, column, descending)) == expected['Campaign_ID'].tolist()
+
+
+def test_pages_are_slices_of_the_sorted_rows():
+    df = _campaigns()
+    positions = query_rows(df, (), 'ROI', True)
+    expected = df.sort_values('ROI', ascending=False, kind='stable', na_position='last')
+
+    pages = [page_rows(df, positions, page, 4) for page in range(3)]
+    assert [len(p) for p in pages] == [4, 4, 2]
+    pd.testing.assert_frame_equal(pd.concat(pages), expected)
+    assert page_rows(df, positions, 3, 4).empty
+
+
+def test_filter_choices_match_pandas():
+    df = _campaigns()
+
+    assert column_values(df, 'Company') == sorted(df['Company'].unique())
+    assert column_values(df, 'Channel_Used') == df['Channel_Used'].cat.categories.tolist()
+    assert column_range(df, 'ROI') == (df['ROI'].min(), df['ROI'].max())
+
+
+def test_unknown_filter_op_is_rejected():
+    with pytest.raises(ValueError):
+        query_rows(_campaigns(), (('ROI', 'above', 1.0),))
@@ -0,0 +1,65 @@
+import os
+import glob
+import numpy as np
+import pandas as pd
+import pytest
+from modules import session_store
+from modules.cache import LRUCache
+from modules.session_store import put_dataset, get_dataset, DatasetHandle
+
+
+def _upload(seed, rows=2_000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Campaign_ID': np.arange(rows),
+        'Company':     pd.Categorical(np.array(['Acme', 'Globex'])[rng.integers(0, 2, rows)]),
+        'Date':        np.datetime64('2024-01-01') + rng.integers(0, 90, rows).astype('timedelta64[D]'),
+        'ROI':         rng.random(rows),
+    })
+
+
+def _spilled():
+    return sorted(os.path.basename(p) for p in glob.glob(os.path.join(session_store.SPILL_DIR, '*.arrow')))
+
+
+@pytest.fixture(autouse=True)
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_store, 'SPILL_DIR', str(tmp_path / 'sessions'))
+    # room for one upload in memory
+    resident = LRUCache(maxsize=8, maxbytes=int(_upload(0).memory_usage(deep=True).sum() * 1.5),
+                        sizeof=session_store._RESIDENT.sizeof, on_evict=session_store._spill)
+    monkeypatch.setattr(session_store, '_RESIDENT', resident)
+    return resident
+
+
+def test_evicted_upload_is_spilled_and_mapped_back(spill_dir):
+    first = put_dataset('a', _upload(1))
+    assert _spilled() == []
+
+    put_dataset('b', _upload(2))
+    assert 'a' not in spill_dir
+    assert _spilled() == ['a.arrow']
+
+    handle = DatasetHandle('a', 'first.csv', len(first))
+    mapped = handle.df
+    assert mapped.attrs.get('memory_mapped')
+    pd.testing.assert_frame_equal(mapped, first)
+    # mapping it back in pushed 'b' out in turn
+    assert _spilled() == ['a.arrow', 'b.arrow']
+    pd.testing.assert_frame_equal(get_dataset('b'), _upload(2))
+
+
+def test_spill_files_stay_under_the_disk_limit(monkeypatch):
+    put_dataset('a', _upload(1))
+    put_dataset('b', _upload(2))
+    size = os.path.getsize(os.path.join(session_store.SPILL_DIR, 'a.arrow'))
+    monkeypatch.setattr(session_store, 'SPILL_DISK_MB', size * 2.5 / 1024 ** 2)
+
+    for key, seed in [('c', 3), ('d', 4), ('e', 5)]:
+        put_dataset(key, _upload(seed))
+        assert len(_spilled()) <= 2
+
+    # the oldest spills went first; their handles find nothing any more
+    assert _spilled() == ['c.arrow', 'd.arrow']
+    assert DatasetHandle('a', 'first.csv', 0).df is None
+    assert get_dataset('e') is not None
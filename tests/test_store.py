@@ -0,0 +1,109 @@
+import pandas as pd
+import pytest
+from modules import store
+
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, 'STORE_DIR', str(tmp_path / 'store'))
+
+
+def _campaigns(ids, dates, roi):
+    return pd.DataFrame({
+        'Campaign_ID': ids,
+        'Company':     'Acme',
+        'Date':        pd.to_datetime(dates),
+        'ROI':         roi,
+    })
+
+
+def test_reupload_moves_campaign_to_new_month():
+    store.append_upload(_campaigns([1, 2], ['2024-01-05', '2024-01-20'], [1.0, 2.0]), key='a')
+    store.append_upload(_campaigns([2], ['2024-03-02'], [5.0]), key='b')
+
+    stored = store.scan_store().sort_values('Campaign_ID', ignore_index=True)
+    assert stored['Campaign_ID'].tolist() == [1, 2]
+    assert stored['ROI'].tolist() == [1.0, 5.0]
+    assert stored['YearMonth'].tolist() == ['2024-01', '2024-03']
+
+
+def test_reupload_empties_old_partition():
+    store.append_upload(_campaigns([1], ['2024-01-05'], [1.0]), key='a')
+    store.append_upload(_campaigns([1], ['2024-02-05'], [3.0]), key='b')
+
+    assert store.store_partitions() == [('Acme', '2024-02', 1)]
+
+
+def test_reupload_swaps_campaigns_between_written_months():
+    store.append_upload(_campaigns([1, 2], ['2024-01-05', '2024-02-05'], [1.0, 2.0]), key='a')
+    store.append_upload(_campaigns([1, 2], ['2024-02-10', '2024-01-10'], [3.0, 4.0]), key='b')
+
+    stored = store.scan_store().sort_values('Campaign_ID', ignore_index=True)
+    assert stored['ROI'].tolist() == [3.0, 4.0]
+    assert stored['YearMonth'].tolist() == ['2024-02', '2024-01']
+
+
+def test_duplicate_ids_within_one_upload_keep_last():
+    store.append_upload(_campaigns([7, 7], ['2024-01-05', '2024-02-05'], [1.0, 2.0]))
+
+    stored = store.scan_store()
+    assert len(stored) == 1
+    assert stored['ROI'].tolist() == [2.0]
+
+
+def test_same_upload_is_stored_once():
+    df = _campaigns([1, 2], ['2024-01-05', '2024-01-20'], [1.0, 2.0])
+    assert store.append_upload(df, key='a') == 2
+    assert store.append_upload(df, key='a') == 0
+    assert len(store.scan_store()) == 2
+
+
+def test_older_upload_again_wins_over_newer():
+    a = _campaigns([1], ['2024-01-05'], [1.0])
+    b = _campaigns([1], ['2024-01-05'], [2.0])
+    store.append_upload(a, key='a')
+    store.append_upload(b, key='b')
+    assert store.append_upload(a, key='a') == 1
+
+    assert store.scan_store()['ROI'].tolist() == [1.0]
+
+
+def test_rows_without_company_are_rejected():
+    missing = _campaigns([1, 2], ['2024-01-05', '2024-01-20'], [1.0, 2.0])
+    missing.loc[1, 'Company'] = None
+    # what a CSV gives for an empty cell
+    blank = _campaigns([1, 2], ['2024-01-05', '2024-01-20'], [1.0, 2.0])
+    blank.loc[1, 'Company'] = ''
+
+    for df in (missing, blank):
+        with pytest.raises(store.MissingCompanyError):
+            store.append_upload(df)
+    assert store.scan_store() is None
+
+
+def test_partitions_of_different_widths_scan_together():
+    acme = _campaigns([1], ['2024-01-05'], [1.0])
+    acme['Clicks'] = pd.Series([120], dtype='int16')
+    acme['CTR'] = pd.Series([0.5], dtype='float32')
+    zeta = _campaigns([2], ['2024-01-05'], [2.0])
+    zeta['Company'] = 'Zeta Corp'
+    zeta['Clicks'] = pd.Series([33003], dtype='int32')
+    zeta['CTR'] = pd.Series([0.25], dtype='float64')
+    store.append_upload(acme, key='a')
+    store.append_upload(zeta, key='b')
+
+    with store.reading():
+        assert len(store.stored_ids()) == 2
+    stored = store.scan_store().sort_values('Campaign_ID', ignore_index=True)
+    assert stored['Clicks'].tolist() == [120, 33003]
+    assert stored['CTR'].tolist() == [0.5, 0.25]
+
+
+def test_rows_without_campaign_id_are_all_kept():
+    df = _campaigns([1.0, None, None], ['2024-01-05', '2024-01-10', '2024-01-20'], [1.0, 2.0, 3.0])
+    store.append_upload(df, key='a')
+    store.append_upload(_campaigns([5.0, None], ['2024-01-25', '2024-01-28'], [4.0, 5.0]), key='b')
+
+    stored = store.scan_store()
+    assert len(stored) == 5
+    assert sorted(stored['ROI'].tolist()) == [1.0, 2.0, 3.0, 4.0, 5.0]
@@ -0,0 +1,112 @@
+import functools
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder
+from modules import store, query, base_dataset, streaming
+from modules.forecast import build_forecasts
+from modules.model_registry import ModelBundle
+from modules.query import PAGE_COLUMNS
+from modules.scoring import score_campaigns, success_by
+
+
+def _campaigns(n, seed):
+    rng = np.random.default_rng(seed)
+    companies = np.array(['Acme', 'Globex', 'Initech'])[rng.integers(0, 3, n)]
+    return pd.DataFrame({
+        'Campaign_ID':      np.arange(n) + seed * 10_000,
+        'Company':          companies,
+        'Channel_Used':     np.array(['Facebook', 'Twitter', 'Instagram'])[rng.integers(0, 3, n)],
+        'Campaign_Goal':    np.array(['Brand Awareness', 'Increase Sales'])[rng.integers(0, 2, n)],
+        'Customer_Segment': 'Technology',
+        'Date':             np.datetime64('2023-01-01') + rng.integers(0, 400, n).astype('timedelta64[D]'),
+        # Acme's clicks fit in int16, the others' do not
+        'Clicks':           np.where(companies == 'Acme', rng.integers(0, 1_000, n), rng.integers(0, 90_000, n)),
+        'Impressions':      rng.integers(100_000, 200_000, n),
+        'ROI':              np.where(rng.random(n) < 0.1, np.nan, rng.random(n).round(2) * 8),
+        'Conversion_Rate':  rng.random(n) / 10,
+        'Acquisition_Cost': rng.random(n) * 10_000,
+    })
+
+
+BASE = _campaigns(600, 0)
+
+
+@pytest.fixture(autouse=True)
+def base_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'campaigns.parquet')
+    BASE.to_parquet(path, index=False, row_group_size=100)
+    monkeypatch.setattr(store, 'STORE_DIR', str(tmp_path / 'store'))
+    monkeypatch.setattr(base_dataset, 'STORE_DIR', str(tmp_path / 'store'))
+    monkeypatch.setattr(base_dataset, 'ARROW_DIR', str(tmp_path / 'arrow'))
+    monkeypatch.setattr(base_dataset, 'BASE_PATH', path)
+    monkeypatch.setattr(base_dataset, 'query_campaigns',
+                        functools.partial(query.query_campaigns, base_path=path))
+    monkeypatch.setattr(base_dataset, '_current', None)
+    monkeypatch.setattr(streaming, 'BASE_PATH', path)
+    monkeypatch.setattr(streaming, '_current', None)
+    # any file is "larger than RAM"; batches and merges run many times
+    monkeypatch.setattr(streaming, 'OUT_OF_CORE_MB', 1e-6)
+    monkeypatch.setattr(streaming, 'STREAM_BATCH_ROWS', 64)
+    base_dataset._VIEWS.clear()
+    streaming._VIEWS.clear()
+
+    upload = _campaigns(40, 1)
+    upload.loc[:9, 'Campaign_ID'] = BASE['Campaign_ID'].iloc[:10].to_numpy()
+    store.append_upload(upload, key='a')
+    return path
+
+
+def _bundle():
+    encoder = LabelEncoder().fit(['Facebook', 'Instagram', 'Twitter'])
+    X = pd.DataFrame({'Channel_Used': encoder.transform(BASE['Channel_Used']), 'Clicks': BASE['Clicks']},
+                     dtype=np.float32)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, BASE['ROI'].fillna(0) > 4)
+    return ModelBundle(model, ['Channel_Used', 'Clicks'], {'Channel_Used': encoder}, {}, 0.0, 0, 'test')
+
+
+def test_streamed_aggregates_match_in_memory():
+    streamed = streaming.get_dataset()
+    assert streamed.out_of_core
+    memory = base_dataset.get_base_dataset()
+    assert streamed.num_rows == memory.num_rows == 630
+    assert streamed.clients == memory.clients
+
+    for company in [None, 'Acme']:
+        assert streamed.cube(company).kpis(company) == pytest.approx(memory.cube(company).kpis(company),
+                                                                     nan_ok=True)
+        for dim in ['Company', 'Channel_Used', 'Campaign_Goal', 'Month']:
+            pd.testing.assert_frame_equal(streamed.cube(company).by(dim, company),
+                                          memory.cube(company).by(dim, company), check_dtype=False)
+
+    pd.testing.assert_frame_equal(build_forecasts(streamed.cube()).table(3),
+                                  build_forecasts(memory.cube()).table(3))
+
+
+def test_streamed_client_views_match_in_memory():
+    streamed = streaming.get_dataset()
+    memory = base_dataset.get_base_dataset()
+
+    for company in streamed.clients:
+        for date_range, channel in [(None, None), ((pd.Timestamp('2023-03-01'), pd.Timestamp('2023-08-31')),
+                                                   ('Facebook', 'Twitter'))]:
+            rows = streamed.view(PAGE_COLUMNS['client'], company, date_range, channel)
+            expected = memory.view(PAGE_COLUMNS['client'], company, date_range, channel)
+            assert list(rows.columns) == list(expected.columns)
+            assert rows.dtypes.to_dict() == expected.dtypes.to_dict()
+            pd.testing.assert_frame_equal(rows.sort_values('Campaign_ID', ignore_index=True),
+                                          expected.sort_values('Campaign_ID', ignore_index=True))
+
+
+def test_streamed_success_matches_in_memory():
+    bundle = _bundle()
+    streamed_by = streaming.streamed_success(bundle)
+
+    df = base_dataset.get_base_dataset().view(PAGE_COLUMNS['ai'])
+    scores = score_campaigns(df, bundle)
+    for dim in ['Channel_Used', 'Company']:
+        expected = success_by(df, scores, dim)
+        assert streamed_by[dim][dim].astype(str).tolist() == expected[dim].astype(str).tolist()
+        assert streamed_by[dim]['Success_Probability'].tolist() == \
+            pytest.approx(expected['Success_Probability'].tolist(), rel=1e-5)